@@ -4,6 +4,7 @@ from django.apps import AppConfig
 
 import core_main_app.permissions.discover as discover
 from core_main_app.components.data.models import Data
+from core_main_app.settings import DATA_TEXT_INDEX_WEIGHTS
 from core_main_app.utils.databases.mongoengine_database import init_text_index
 
 
@@ -20,4 +21,4 @@ class InitApp(AppConfig):
         """
         discover.init_rules(self.apps)
         discover.create_public_workspace()
-        init_text_index(Data)
+        init_text_index(Data, DATA_TEXT_INDEX_WEIGHTS)
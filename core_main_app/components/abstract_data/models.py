@@ -1,8 +1,10 @@
 """ Abstract Data model
 """
+from collections import defaultdict
 from io import BytesIO
 
 from django_mongoengine import fields, Document
+from mongoengine.connection import get_db
 
 from core_main_app.commons.regex import NOT_EMPTY_OR_WHITESPACES
 from core_main_app.settings import GRIDFS_DATA_COLLECTION, SEARCHABLE_DATA_OCCURRENCES_LIMIT
@@ -49,6 +51,66 @@ class AbstractData(Document):
         """
         self._xml_content = value
 
+    def iter_xml_content(self):
+        """Iterate over the xml content - read chunk by chunk from a saved file, without keeping it in memory.
+
+        Returns:
+
+        """
+        # xml content already in memory (not saved yet, or already read)
+        if self._xml_content is not None:
+            yield self._xml_content
+            return
+
+        # no file to read
+        if self.xml_file is None:
+            return
+        grid_out = self.xml_file.get()
+        if grid_out is None:
+            return
+
+        # read xml file one GridFS chunk at a time
+        for chunk in grid_out:
+            yield chunk
+
+    @staticmethod
+    def prefetch_xml_content(list_data):
+        """ Read the xml files of a list of data with one query per GridFS collection, and set their xml content.
+
+        Args:
+            list_data:
+
+        Returns:
+
+        """
+        # data with a saved xml file not read yet, by GridFS collection
+        data_by_collection = defaultdict(list)
+        for data in list_data:
+            if data._xml_content is None and data.xml_file is not None and data.xml_file.grid_id is not None:
+                data_by_collection[(data.xml_file.db_alias, data.xml_file.collection_name)].append(data)
+
+        for (db_alias, collection_name), collection_list_data in data_by_collection.items():
+            database = get_db(db_alias)
+            list_grid_id = list(set(data.xml_file.grid_id for data in collection_list_data))
+
+            # get length of the files
+            files_length = {file_document['_id']: file_document['length']
+                            for file_document in database[collection_name + '.files'].find(
+                                {'_id': {'$in': list_grid_id}}, {'length': 1})}
+
+            # get chunks of the files
+            files_chunks = defaultdict(list)
+            for chunk in database[collection_name + '.chunks'].find({'files_id': {'$in': list_grid_id}}):
+                files_chunks[chunk['files_id']].append(chunk)
+
+            for data in collection_list_data:
+                grid_id = data.xml_file.grid_id
+                chunks = sorted(files_chunks[grid_id], key=lambda file_chunk: file_chunk['n'])
+                content = b''.join(bytes(chunk['data']) for chunk in chunks)
+                # missing or incomplete file: xml content is read from the file when accessed
+                if grid_id in files_length and len(content) == files_length[grid_id]:
+                    data._xml_content = content
+
     def convert_and_save(self):
         """ Save Data object and convert the xml to dict if needed.
 
@@ -66,13 +128,9 @@ class AbstractData(Document):
         Returns:
 
         """
-        # transform xml content into a dictionary
-        dict_content = xml_utils.raw_xml_to_dict(self.xml_content, xml_utils.post_processor)
-        # if limit on element occurrences is set
-        if SEARCHABLE_DATA_OCCURRENCES_LIMIT is not None:
-            # Remove lists which size exceed the limit size
-            xml_utils.remove_lists_from_xml_dict(dict_content,
-                                                 SEARCHABLE_DATA_OCCURRENCES_LIMIT)
+        # transform xml content into a dictionary, without lists which size exceed the limit size (if set)
+        dict_content = xml_utils.stream_raw_xml_to_dict(self.xml_content, xml_utils.post_processor,
+                                                        SEARCHABLE_DATA_OCCURRENCES_LIMIT)
         # store dictionary
         self.dict_content = dict_content
 
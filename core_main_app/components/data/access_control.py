@@ -1,12 +1,16 @@
 """ Set of functions to define the rules for access control
 """
 
+from bson.dbref import DBRef
+from mongoengine import Document
+
 import core_main_app.permissions.rights as rights
 from core_main_app.components.workspace import api as workspace_api
 from core_main_app.permissions import api as permissions_api
 from core_main_app.settings import CAN_SET_PUBLIC_DATA_TO_PRIVATE, CAN_ANONYMOUS_ACCESS_PUBLIC_DATA
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.labels import get_data_label
+from core_main_app.utils.query.mongo.pipeline import get_pipeline_stage_names, OTHER_COLLECTION_STAGES
 from core_main_app.utils.raw_query.mongo_raw_query import add_access_criteria, \
     add_aggregate_access_criteria
 
@@ -36,10 +40,11 @@ def has_perm_administration(func, *args, **kwargs):
 
         """
     try:
-        if args[0].is_superuser:
-            return func(*args, **kwargs)
+        is_superuser = args[0].is_superuser
     except Exception:
-        pass
+        is_superuser = False
+    if is_superuser:
+        return func(*args, **kwargs)
     raise AccessControlError("The user doesn't have enough rights to access this " + get_data_label() + ".")
 
 
@@ -104,8 +109,8 @@ def _check_can_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    if workspace not in accessible_workspaces:
+    accessible_workspaces = workspace_api.get_all_workspace_ids_with_write_access_by_user(user)
+    if workspace.id not in accessible_workspaces:
         raise AccessControlError("The user does not have the permission to write into this workspace.")
 
 
@@ -119,9 +124,9 @@ def _check_can_read_or_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_write_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    accessible_read_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-    if workspace not in list(accessible_write_workspaces) + list(accessible_read_workspaces):
+    accessible_write_workspaces = workspace_api.get_all_workspace_ids_with_write_access_by_user(user)
+    accessible_read_workspaces = workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
+    if workspace.id not in accessible_write_workspaces and workspace.id not in accessible_read_workspaces:
         raise AccessControlError("The user does not have the permission to write into this workspace.")
 
 
@@ -182,6 +187,25 @@ def can_write_data(func, data, user):
     return func(data, user)
 
 
+def can_write_data_list(func, list_data, user):
+    """ Can write a list of data.
+
+    Args:
+        func:
+        list_data:
+        user:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(list_data, user)
+
+    for data in list_data:
+        check_can_write_data(data, user)
+    return func(list_data, user)
+
+
 def can_read_data(func, data, user):
     """ Can read data.
 
@@ -217,12 +241,66 @@ def can_read_data_query(func, query, user, order_by_field=None):
 
     # update the query
     query = _update_can_read_query(query, user)
-    # get list of data
-    data_list = func(query, user, order_by_field)
-    # TODO: check if necessary because it is time consuming (checking that user has access to list of returned data)
-    # check that user can access the list of data
-    _check_can_read_data_list(data_list, user)
-    return data_list
+    # get list of data: the access criteria restrict the results to the data the user can read, the results are
+    # trusted without checking each data (the list stays a lazy queryset)
+    return func(query, user, order_by_field)
+
+
+def can_read_data_text_query(func, query, text, user, max_results=None):
+    """ Can read a data, given a query and a full text search.
+
+    Args:
+        func:
+        query:
+        text:
+        user:
+        max_results:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(query, text, user, max_results)
+
+    # update the query: the results are restricted to the data the user can read
+    query = _update_can_read_query(query, user)
+    return func(query, text, user, max_results)
+
+
+def can_read_data_facets(func, query, paths, user, max_values=None):
+    """ Can read the facets of data, given a query.
+
+    Args:
+        func:
+        query:
+        paths:
+        user:
+        max_values:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(query, paths, user, max_values)
+
+    # update the query: the facets only count the data the user can read
+    query = _update_can_read_query(query, user)
+    return func(query, paths, user, max_values)
+
+
+def get_read_query(query, user):
+    """ Get the query executed to read data for a user, restricted to the data the user can read.
+
+    Args:
+        query:
+        user:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return query
+    return _update_can_read_query(query, user)
 
 
 def can_read_aggregate_query(func, query, user):
@@ -239,6 +317,12 @@ def can_read_aggregate_query(func, query, user):
     if user.is_superuser:
         return func(query, user)
 
+    # stages reading or writing other collections are not restricted by the access criteria
+    forbidden_stages = get_pipeline_stage_names(query) & set(OTHER_COLLECTION_STAGES)
+    if forbidden_stages:
+        raise AccessControlError("The user doesn't have enough rights to use the stages: {0}.".format(
+            ', '.join(sorted(forbidden_stages))))
+
     # update the query
     query = _update_can_read_aggregate_query(query, user)
     # get list of data
@@ -302,9 +386,9 @@ def check_can_write_data(data, user):
     if data.user_id != str(user.id):
         if hasattr(data, 'workspace') and data.workspace is not None:
             # get list of accessible workspaces
-            accessible_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
+            accessible_workspaces = workspace_api.get_all_workspace_ids_with_write_access_by_user(user)
             # check that accessed data belongs to an accessible workspace
-            if data.workspace not in accessible_workspaces:
+            if data.workspace.id not in accessible_workspaces:
                 raise AccessControlError("The user doesn't have enough rights to access this " + get_data_label() + ".")
         # workspace is not set
         else:
@@ -326,9 +410,9 @@ def _check_can_read_data(data, user):
         # workspace is set
         if hasattr(data, 'workspace') and data.workspace is not None:
             # get list of accessible workspaces
-            accessible_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
+            accessible_workspaces = workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
             # check that accessed data belongs to an accessible workspace
-            if data.workspace not in accessible_workspaces:
+            if data.workspace.id not in accessible_workspaces:
                 raise AccessControlError("The user doesn't have enough rights to access this " + get_data_label() + ".")
         # workspace is not set
         else:
@@ -345,17 +429,35 @@ def _check_can_read_data_list(data_list, user):
     Returns:
 
     """
-    if len(data_list) > 0:
-        # get list of accessible workspaces
-        accessible_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-        # check access is correct
-        for data in data_list:
-            # user is data owner
-            if data.user_id == str(user.id):
-                continue
-            # user is not owner or data not in accessible workspace
-            if data.workspace is None or data.workspace not in accessible_workspaces:
-                raise AccessControlError("The user doesn't have enough rights to access this " + get_data_label() + ".")
+    user_id = str(user.id)
+    accessible_workspaces = None
+    # check access is correct
+    for data in data_list:
+        # user is data owner
+        if data.user_id == user_id:
+            continue
+        # get set of accessible workspace ids
+        if accessible_workspaces is None:
+            accessible_workspaces = workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
+        # user is not owner or data not in accessible workspace
+        workspace_id = _get_workspace_id(data)
+        if workspace_id is None or workspace_id not in accessible_workspaces:
+            raise AccessControlError("The user doesn't have enough rights to access this " + get_data_label() + ".")
+
+
+def _get_workspace_id(data):
+    """ Get the id of the workspace of a data, without loading the workspace.
+
+    Args:
+        data:
+
+    Returns:
+
+    """
+    workspace = data._data.get('workspace', None)
+    if isinstance(workspace, (DBRef, Document)):
+        return workspace.id
+    return workspace
 
 
 def _update_can_read_query(query, user):
@@ -406,7 +508,6 @@ def _get_read_accessible_workspaces_by_user(user):
     else:
         # workspace case
         # list accessible workspaces
-        accessible_workspaces = [workspace.id for workspace in
-                                 workspace_api.get_all_workspaces_with_read_access_by_user(user)]
+        accessible_workspaces = list(workspace_api.get_all_workspace_ids_with_read_access_by_user(user))
 
     return accessible_workspaces
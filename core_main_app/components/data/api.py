@@ -1,18 +1,35 @@
 """ Data API
 """
 import datetime
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 import pytz
 
 from xml_utils.xsd_tree.xsd_tree import XSDTree
 
 from core_main_app.components.data.models import Data
-from core_main_app.utils.xml import validate_xml_data
+from core_main_app.settings import XERCES_VALIDATION, DATA_BULK_UPSERT_THREADS, DATA_BULK_UPSERT_BATCH_SIZE, \
+    QUERY_RESULT_CACHE_MAX_SIZE, DATA_AGGREGATE_ALLOW_DISK_USE, DATA_AGGREGATE_MAX_TIME_MS, \
+    DATA_AGGREGATE_MAX_RESULTS, DATA_AGGREGATE_BATCH_SIZE, DATA_FACET_MAX_VALUES, DATA_CHANGES_PAGE_SIZE
+from core_main_app.utils import events
+from core_main_app.utils.databases import indexes
+from core_main_app.utils.query import result_cache
+from core_main_app.utils.query.mongo.explain import get_execution_summary
+from core_main_app.utils.query.mongo.optimizer import explain_query as explain_regex_criteria
+from core_main_app.utils.query.mongo.pipeline import optimize_pipeline, limit_pipeline_results
+from core_main_app.utils.raw_query.mongo_raw_query import get_position_query
+from core_main_app.utils.xml import validate_xml_data, get_element_paths
+from core_main_app.utils import xml_validation_pool
+from core_main_app.utils.xml_schema_cache import get_template_xml_schema, get_template_cache_key
 from core_main_app.commons import exceptions as exceptions
 from core_main_app.utils.access_control.decorators import access_control
 from core_main_app.components.data.access_control import can_read_data_id, can_read_user, can_write_data, \
     can_read_data_query, can_change_owner, can_read_list_data_id, can_write_data_workspace,\
-    can_read_or_write_data_workspace, has_perm_administration, can_read_aggregate_query
+    can_read_or_write_data_workspace, has_perm_administration, can_read_aggregate_query, can_write_data_list, \
+    get_read_query, can_read_data_facets, can_read_data_text_query
+from core_main_app.components.data_tombstone import api as data_tombstone_api
 from core_main_app.components.workspace import api as workspace_api
 
 
@@ -29,7 +46,11 @@ def assign(data, workspace, user):
 
     """
     data.workspace = workspace
-    return data.save()
+    # readers of the data change: report it in the changes of the data
+    data.last_modification_date = datetime.datetime.now(pytz.utc)
+    data = data.save()
+    events.publish(events.DATA_ASSIGNED, data, user)
+    return data
 
 
 @access_control(can_read_or_write_data_workspace)
@@ -93,8 +114,8 @@ def get_all_accessible_by_user(user):
         Returns: data collection
     """
 
-    read_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-    write_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
+    read_workspaces = workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
+    write_workspaces = workspace_api.get_all_workspace_ids_with_write_access_by_user(user)
     user_accessible_workspaces = list(set().union(read_workspaces, write_workspaces))
 
     accessible_data = Data.get_all_by_list_workspace(user_accessible_workspaces)
@@ -141,9 +162,129 @@ def upsert(data, user):
     if data.xml_content is None:
         raise exceptions.ApiError("Unable to save data: xml_content field is not set.")
 
+    is_new = data.id is None
     data.last_modification_date = datetime.datetime.now(pytz.utc)
     check_xml_file_is_valid(data)
-    return data.convert_and_save()
+    data = data.convert_and_save()
+    events.publish(events.DATA_CREATED if is_new else events.DATA_UPDATED, data, user)
+    return data
+
+
+@access_control(can_write_data_list)
+def bulk_upsert(list_data, user):
+    """ Save or update a list of data.
+
+    Data are grouped by template and validated in parallel, new data are inserted by batches.
+
+    Args:
+        list_data:
+        user:
+
+    Returns:
+        List of errors, in the order of list_data (None if the data was saved).
+
+    """
+    errors = [None] * len(list_data)
+    last_modification_date = datetime.datetime.now(pytz.utc)
+
+    # group data by template
+    indexes_by_template = OrderedDict()
+    for index, data in enumerate(list_data):
+        if data.xml_content is None:
+            errors[index] = "Unable to save data: xml_content field is not set."
+        else:
+            template_id = data.template.id if data.template is not None else None
+            indexes_by_template.setdefault(template_id, []).append(index)
+    indexes = [index for template_indexes in indexes_by_template.values() for index in template_indexes]
+
+    # validate data
+    validation_errors = _get_xml_validation_errors([list_data[index] for index in indexes])
+
+    new_data_indexes = []
+    for index, validation_error in zip(indexes, validation_errors):
+        data = list_data[index]
+        if validation_error is not None:
+            errors[index] = validation_error
+            continue
+
+        data.last_modification_date = last_modification_date
+        try:
+            data.convert_to_dict()
+            data.validate()
+        except Exception as e:
+            errors[index] = e.message
+            continue
+
+        if data.id is None:
+            new_data_indexes.append(index)
+        else:
+            # existing data are updated one by one
+            try:
+                data.convert_to_file()
+                data.save()
+            except Exception as e:
+                errors[index] = e.message
+                continue
+            events.publish(events.DATA_UPDATED, data, user)
+
+    # insert new data by batches
+    for batch_start in range(0, len(new_data_indexes), DATA_BULK_UPSERT_BATCH_SIZE):
+        batch_indexes = []
+        for index in new_data_indexes[batch_start:batch_start + DATA_BULK_UPSERT_BATCH_SIZE]:
+            try:
+                list_data[index].convert_to_file()
+                batch_indexes.append(index)
+            except Exception as e:
+                errors[index] = e.message
+        batch_data = [list_data[index] for index in batch_indexes]
+
+        for index, data, insert_error in zip(batch_indexes, batch_data, Data.insert_many(batch_data)):
+            if insert_error is not None:
+                errors[index] = insert_error
+                # remove the file of the data that could not be inserted
+                data.xml_file.delete()
+            else:
+                events.publish(events.DATA_CREATED, data, user)
+
+    return errors
+
+
+def _get_xml_validation_errors(list_data):
+    """ Validate a list of data in parallel.
+
+    Args:
+        list_data:
+
+    Returns:
+        List of errors, in the order of list_data (None if the data is valid).
+
+    """
+    if len(list_data) == 0:
+        return []
+
+    pool = ThreadPool(max(1, min(DATA_BULK_UPSERT_THREADS, len(list_data))))
+    try:
+        return pool.map(_get_xml_validation_error, list_data)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _get_xml_validation_error(data):
+    """ Validate a data.
+
+    Args:
+        data:
+
+    Returns:
+        None if the data is valid, the error message otherwise.
+
+    """
+    try:
+        check_xml_file_is_valid(data)
+    except Exception as e:
+        return e.message
+    return None
 
 
 def check_xml_file_is_valid(data):
@@ -157,17 +298,34 @@ def check_xml_file_is_valid(data):
     """
     template = data.template
 
+    if not XERCES_VALIDATION and xml_validation_pool.is_enabled():
+        # parse and validate in a worker process, keeping the compiled schema warm in the worker
+        xml_validation_pool.validate_xml_string(data.xml_content, template.content,
+                                                get_template_cache_key(template), template.hash)
+        return True
+
     try:
         xml_tree = XSDTree.build_tree(data.xml_content)
     except Exception as e:
         raise exceptions.XMLError(e.message)
 
-    try:
-        xsd_tree = XSDTree.build_tree(template.content)
-    except Exception as e:
-        raise exceptions.XSDError(e.message)
+    if XERCES_VALIDATION:
+        # validation is done by the Xerces server, the schema can not be compiled locally
+        try:
+            xsd_tree = XSDTree.build_tree(template.content)
+        except Exception as e:
+            raise exceptions.XSDError(e.message)
+
+        error = validate_xml_data(xsd_tree, xml_tree)
+    else:
+        # get the compiled schema from the cache
+        try:
+            xml_schema = get_template_xml_schema(template)
+        except Exception as e:
+            raise exceptions.XSDError(e.message)
+
+        error = xml_schema.validate(xml_tree)
 
-    error = validate_xml_data(xsd_tree, xml_tree)
     if error is not None:
         raise exceptions.XMLError(error)
     else:
@@ -186,9 +344,98 @@ def execute_query(query, user, order_by_field=None):
     Returns:
 
     """
+    if result_cache.is_enabled():
+        # get the ids of the results from the cache, or cache them
+        list_id = result_cache.get_or_set(
+            query, order_by_field,
+            lambda: Data.execute_query(query, order_by_field).limit(QUERY_RESULT_CACHE_MAX_SIZE + 1).scalar('id'))
+        if list_id is not None:
+            return Data.execute_query_in_id_list(query, list_id, order_by_field)
     return Data.execute_query(query, order_by_field)
 
 
+@access_control(can_read_data_text_query)
+def execute_text_query(query, text, user, max_results=None):
+    """Execute a full text search on the Data collection, sorted by relevance.
+
+    Args:
+        query:
+        text: Full text search (see $text).
+        user:
+        max_results: Number of most relevant data returned, all if None.
+
+    Returns:
+        Data sorted by relevance, and True if results were cut to max_results.
+
+    """
+    return Data.execute_text_query(query, text, max_results)
+
+
+def get_changes(user, since=None, position=None, max_changes=DATA_CHANGES_PAGE_SIZE):
+    """Get the changes of the data the user can read: data modified, and data deleted (tombstones), ordered by date
+    (last modification or deletion date) and id.
+
+    Assigning a data to a workspace and changing its owner are changes of the data. A data the user can no longer read
+    (assigned to a workspace the user can not read, given to another owner, workspace deleted) is neither returned
+    nor reported as deleted: harvesters detect lost access by comparing the ids they hold with a full harvest.
+
+    Args:
+        user:
+        since: Date of the first changes returned, all changes if None.
+        position: (date, id) of the last change already read, to resume from.
+        max_changes: Maximum number of changes returned.
+
+    Returns:
+        List of (date, id, data) tuples, data being None for deleted data.
+
+    """
+    data_query = _get_changes_query('last_modification_date', since, position)
+    list_data = Data.execute_query(get_read_query(data_query, user)).exclude('dict_content')\
+        .order_by('last_modification_date', 'id')[:max_changes]
+    tombstone_query = _get_changes_query('deletion_date', since, position)
+    list_tombstones = data_tombstone_api.execute_query(get_read_query(tombstone_query, user))[:max_changes]
+
+    changes = [(data.last_modification_date, data.id, data) for data in list_data] + \
+              [(tombstone.deletion_date, tombstone.id, None) for tombstone in list_tombstones]
+    # data without modification date come first
+    changes.sort(key=lambda change: (change[0] is not None, change[0], change[1]))
+    return changes[:max_changes]
+
+
+@access_control(has_perm_administration)
+def explain_query(user, query, query_user=None, order_by_field=None):
+    """Explain the execution of a query on the Data collection.
+
+    Args:
+        user:
+        query:
+        query_user: User the query is executed for (restricted to the data this user can read), user if None.
+        order_by_field:
+
+    Returns:
+        Dict with the executed query, the report of its regular expressions, the output of the explain command and its
+        summary, and the time spent adding the access criteria to the query.
+
+    """
+    if query_user is None:
+        query_user = user
+
+    # time the access control (results are not checked after executing the query)
+    start_time = time.time()
+    read_query = get_read_query(query, query_user)
+    access_control_time = time.time() - start_time
+
+    explain_output = Data.explain_query(read_query, order_by_field)
+
+    return {
+        'query': read_query,
+        'regex_criteria': explain_regex_criteria(read_query),
+        'summary': get_execution_summary(explain_output),
+        'access_control_time_ms': int(access_control_time * 1000),
+        'explain': explain_output,
+    }
+
+
 @access_control(can_write_data)
 def delete(data, user):
     """ Delete a data.
@@ -201,6 +448,7 @@ def delete(data, user):
 
     """
     data.delete()
+    events.publish(events.DATA_DELETED, data, user)
 
 
 @access_control(can_change_owner)
@@ -216,7 +464,10 @@ def change_owner(data, new_user, user):
     """
     # FIXME: user can transfer data to anybody, too permissive
     data.user_id = str(new_user.id)
+    # readers of the data change: report it in the changes of the data
+    data.last_modification_date = datetime.datetime.now(pytz.utc)
     data.save()
+    events.publish(events.DATA_UPDATED, data, user)
 
 
 def is_data_public(data):
@@ -230,10 +481,25 @@ def is_data_public(data):
     return workspace_api.is_workspace_public(data.workspace) if data.workspace is not None else False
 
 
+def prefetch_xml_content(list_data):
+    """ Read the xml content of a list of data in batch, instead of one file at a time.
+
+    Args:
+        list_data: List of data already accessed by the user.
+
+    Returns:
+
+    """
+    Data.prefetch_xml_content(list_data)
+
+
 @access_control(can_read_aggregate_query)
 def aggregate(pipeline, user):
     """Execute an aggregate on the Data collection.
 
+    The filters of the pipeline are applied as early as possible, and its results are limited. Results are read by
+    batches from a cursor.
+
     Args:
         pipeline:
         user:
@@ -241,4 +507,133 @@ def aggregate(pipeline, user):
     Returns:
 
     """
-    return Data.aggregate(pipeline)
+    return _execute_aggregate(pipeline)
+
+
+@access_control(can_read_data_facets)
+def get_facets(query, paths, user, max_values=None):
+    """Count the data by most frequent values of paths, in the data returned by a query, in a single aggregation.
+
+    Counts are cached with the results of the query (see QUERY_RESULT_CACHE).
+
+    Args:
+        query:
+        paths: Paths in the data (e.g. dict_content.root.element).
+        user:
+        max_values: Number of most frequent values returned by path, DATA_FACET_MAX_VALUES if None.
+
+    Returns:
+        Dict of lists of values with their number of data ({'value': value, 'count': count}), by path.
+
+    """
+    if max_values is None:
+        max_values = DATA_FACET_MAX_VALUES
+    if max_values < 1:
+        raise exceptions.ApiError('The number of values of facets should be positive.')
+
+    def _get_facets():
+        # one sub pipeline per path, named by its position ($facet names can not contain dots)
+        # values are grouped by data first: a value repeated in a data is counted once
+        facets = {str(index): [{'$unwind': '$' + path},
+                               {'$group': {'_id': {'value': '$' + path, 'data': '$_id'}}},
+                               {'$group': {'_id': '$_id.value', 'count': {'$sum': 1}}},
+                               {'$sort': {'count': -1, '_id': 1}},
+                               {'$limit': max_values}]
+                  for index, path in enumerate(paths)}
+        results = list(_execute_aggregate([{'$match': query}, {'$facet': facets}]))
+        counts = results[0] if len(results) > 0 else {}
+        return OrderedDict((path, [{'value': count['_id'], 'count': count['count']}
+                                   for count in counts.get(str(index), [])])
+                           for index, path in enumerate(paths))
+
+    if result_cache.is_enabled():
+        return result_cache.get_or_set_value(query, ['facets', list(paths), max_values], _get_facets)
+    return _get_facets()
+
+
+@access_control(has_perm_administration)
+def get_dict_content_indexes(user):
+    """ Get the indexes on the content of the data, with their usage statistics.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    return indexes.get_dict_content_indexes(Data)
+
+
+@access_control(has_perm_administration)
+def create_dict_content_indexes(user, template, paths):
+    """ Create indexes on the content of the data, for paths of a template.
+
+    Paths are explicit: indexing all the paths of a template would exceed the number of indexes of a collection (64)
+    for most schemas, and slow down every write of data.
+
+    Args:
+        user:
+        template:
+        paths: List of paths of the template to index.
+
+    Returns:
+        List of index names.
+
+    """
+    if not isinstance(paths, list) or len(paths) == 0:
+        raise exceptions.ApiError("A non empty list of paths to index is expected.")
+    template_paths = get_element_paths(template.content)
+    unknown_paths = [path for path in paths if path not in template_paths]
+    if len(unknown_paths) > 0:
+        raise exceptions.ApiError("Paths not found in the template: " + ", ".join(unknown_paths) + ".")
+
+    return indexes.create_dict_content_indexes(Data, paths)
+
+
+@access_control(has_perm_administration)
+def drop_dict_content_index(user, path):
+    """ Drop the index on a path of the content of the data.
+
+    Args:
+        user:
+        path:
+
+    Returns:
+
+    """
+    indexes.drop_dict_content_index(Data, path)
+
+
+def _execute_aggregate(pipeline):
+    """Execute an aggregate on the Data collection, with its filters applied as early as possible and bounded results.
+
+    Args:
+        pipeline:
+
+    Returns:
+
+    """
+    pipeline = limit_pipeline_results(optimize_pipeline(pipeline), DATA_AGGREGATE_MAX_RESULTS)
+    options = {'allowDiskUse': DATA_AGGREGATE_ALLOW_DISK_USE, 'batchSize': DATA_AGGREGATE_BATCH_SIZE}
+    if DATA_AGGREGATE_MAX_TIME_MS is not None:
+        options['maxTimeMS'] = DATA_AGGREGATE_MAX_TIME_MS
+    return Data.aggregate(pipeline, **options)
+
+
+def _get_changes_query(date_field, since, position):
+    """Get the query selecting the changes after a date, or after a position in the changes.
+
+    Args:
+        date_field: Date of the changes.
+        since:
+        position:
+
+    Returns:
+
+    """
+    query = {}
+    if position is not None:
+        query = get_position_query([date_field, '_id'], position)
+    if since is not None:
+        query = {'$and': [query, {date_field: {'$gte': since}}]} if query else {date_field: {'$gte': since}}
+    return query
@@ -1,14 +1,18 @@
 """ Data model
 """
 
+from bson.son import SON
 from django_mongoengine import fields
 from mongoengine import errors as mongoengine_errors
+from pymongo.errors import BulkWriteError
 from mongoengine.queryset.base import NULLIFY
 
 from core_main_app.commons import exceptions
 from core_main_app.components.abstract_data.models import AbstractData
+from core_main_app.components.data_tombstone.models import DataTombstone
 from core_main_app.components.template.models import Template
 from core_main_app.components.workspace.models import Workspace
+from core_main_app.utils.query import result_cache
 
 
 # TODO: Create publication workflow manager
@@ -22,6 +26,11 @@ class Data(AbstractData):
     user_id = fields.StringField()
     workspace = fields.ReferenceField(Workspace, reverse_delete_rule=NULLIFY, blank=True)
 
+    meta = {
+        'indexes': ['user_id', 'workspace', 'template', ('last_modification_date', 'id')],
+        'index_background': True,
+    }
+
     @staticmethod
     def get_all(order_by_field=None):
         """ Get all data.
@@ -102,6 +111,61 @@ class Data(AbstractData):
         """
         return Data.objects(__raw__=query).order_by(order_by_field)
 
+    @staticmethod
+    def explain_query(query, order_by_field=None):
+        """Explain how a query is executed by the database.
+
+        Args:
+            query:
+            order_by_field: Order by field.
+
+        Returns:
+            Output of the explain command, with execution statistics.
+
+        """
+        queryset = Data.objects(__raw__=query).order_by(order_by_field)
+        find_command = SON([('find', Data._get_collection_name()), ('filter', queryset._query)])
+        if queryset._ordering:
+            find_command['sort'] = SON(queryset._ordering)
+        return Data._get_db().command('explain', find_command, verbosity='executionStats')
+
+    @staticmethod
+    def execute_text_query(query, text, max_results=None):
+        """Execute a full text search, sorted by relevance (text score, loaded with the data).
+
+        Args:
+            query:
+            text: Full text search (see $text).
+            max_results: Number of most relevant data returned, all if None.
+
+        Returns:
+            Data sorted by relevance, and True if results were cut to max_results.
+
+        """
+        queryset = Data.objects(__raw__=query).search_text(text).order_by('$text_score')
+        truncated = False
+        if max_results is not None:
+            # restrict the results to the ids of the most relevant data: a limit would be replaced by pagination.
+            # One more id is read to know if some matching data were left out.
+            list_id = list(queryset.limit(max_results + 1).scalar('id'))
+            truncated = len(list_id) > max_results
+            queryset = queryset.filter(pk__in=list_id[:max_results])
+        return queryset, truncated
+
+    @staticmethod
+    def execute_query_in_id_list(query, list_id, order_by_field=None):
+        """Execute a query, restricted to a list of data ids.
+
+        Args:
+            query:
+            list_id:
+            order_by_field: Order by field.
+
+        Returns:
+
+        """
+        return Data.objects(__raw__=query).filter(pk__in=list_id).order_by(order_by_field)
+
     @staticmethod
     def get_all_by_workspace(workspace):
         """ Get all data that belong to the workspace.
@@ -139,13 +203,91 @@ class Data(AbstractData):
         return Data.objects(template__in=list_template).all()
 
     @staticmethod
-    def aggregate(pipeline):
+    def aggregate(pipeline, **kwargs):
         """Execute an aggregate on the Data collection.
 
         Args:
             pipeline:
+            **kwargs: Options of the aggregate command (e.g. allowDiskUse, maxTimeMS, batchSize).
+
+        Returns:
+
+        """
+        return Data.objects.aggregate(*pipeline, **kwargs)
+
+    @staticmethod
+    def insert_many(list_data):
+        """ Insert a list of new data in a single round trip.
+
+        Args:
+            list_data:
+
+        Returns:
+            List of errors, in the order of list_data (None if the data was inserted).
+
+        """
+        if len(list_data) == 0:
+            return []
+
+        errors = [None] * len(list_data)
+        list_documents = [data.to_mongo() for data in list_data]
+        try:
+            Data._get_collection().insert_many(list_documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                errors[write_error['index']] = write_error['errmsg']
+
+        # invalidate cached results of queries on the templates of the data
+        result_cache.invalidate(set(document['template'] for document in list_documents))
+
+        for data, document, error in zip(list_data, list_documents, errors):
+            if error is None:
+                # mark data as saved
+                data.pk = document['_id']
+                data._created = False
+                data._clear_changed_fields()
+
+        return errors
+
+    def save(self, *args, **kwargs):
+        """ Save the data, and invalidate the cached results of queries on its template.
+
+        Args:
+            *args:
+            **kwargs:
+
+        Returns:
+
+        """
+        # moving data to another template changes the results of queries on the previous template
+        template_changed = not self._created and 'template' in self._get_changed_fields()
+        data = super(Data, self).save(*args, **kwargs)
+        result_cache.invalidate(None if template_changed else [self._get_template_id()])
+        return data
+
+    def delete(self, *args, **kwargs):
+        """ Delete the data, record the deletion, and invalidate the cached results of queries on its template.
+
+        Args:
+            *args:
+            **kwargs:
+
+        Returns:
+
+        """
+        data_id = self.id
+        super(Data, self).delete(*args, **kwargs)
+        # record the deletion for incremental harvesting
+        workspace = self._data.get('workspace', None)
+        DataTombstone.create_from_data(data_id, self._get_template_id(), self.user_id,
+                                       getattr(workspace, 'id', workspace))
+        result_cache.invalidate([self._get_template_id()])
+
+    def _get_template_id(self):
+        """ Get the id of the template of the data, without loading the template.
 
         Returns:
 
         """
-        return Data.objects.aggregate(*pipeline)
+        template = self._data.get('template', None)
+        return getattr(template, 'id', template)
@@ -0,0 +1,15 @@
+""" Data tombstone API
+"""
+from core_main_app.components.data_tombstone.models import DataTombstone
+
+
+def execute_query(query):
+    """ Execute a query on the tombstones of the deleted data, ordered by deletion date and id.
+
+    Args:
+        query:
+
+    Returns:
+
+    """
+    return DataTombstone.execute_query(query)
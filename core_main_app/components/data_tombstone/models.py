@@ -0,0 +1,54 @@
+""" Data tombstone model
+"""
+import datetime
+
+import pytz
+from django_mongoengine import fields, Document
+
+
+class DataTombstone(Document):
+    """ Record of a deleted data, with the id of the data, for incremental harvesting
+    """
+    template = fields.ObjectIdField()
+    user_id = fields.StringField()
+    workspace = fields.ObjectIdField(blank=True)
+    deletion_date = fields.DateTimeField()
+
+    meta = {
+        'indexes': [('deletion_date', 'id')],
+        'index_background': True,
+    }
+
+    @staticmethod
+    def create_from_data(data_id, template_id, user_id, workspace_id):
+        """ Record the deletion of a data.
+
+        The owner and the workspace of the data are kept, to restrict the tombstones to the users who could read the
+        data.
+
+        Args:
+            data_id:
+            template_id:
+            user_id:
+            workspace_id:
+
+        Returns:
+
+        """
+        return DataTombstone(id=data_id,
+                             template=template_id,
+                             user_id=user_id,
+                             workspace=workspace_id,
+                             deletion_date=datetime.datetime.now(pytz.utc)).save()
+
+    @staticmethod
+    def execute_query(query):
+        """ Execute a query on the tombstones, ordered by deletion date and id.
+
+        Args:
+            query:
+
+        Returns:
+
+        """
+        return DataTombstone.objects(__raw__=query).order_by('deletion_date', 'id')
@@ -0,0 +1,62 @@
+""" Event API
+"""
+import datetime
+
+import pytz
+
+from core_main_app.components.event.models import Event
+from core_main_app.settings import EVENT_OUTBOX_GAP_TIMEOUT
+
+
+def insert(event):
+    """ Store an event in the outbox.
+
+    Args:
+        event:
+
+    Returns:
+
+    """
+    return event.save()
+
+
+def get_all_after(sequence=None, limit=None):
+    """ Get the events of the outbox stored after an event, in the order of their sequence numbers.
+
+    Sequence numbers are given by a counter of the database, incremented atomically, before the events are stored: an
+    event can be stored after events with greater numbers. The events are returned up to the first missing number, so
+    that consumers resuming after the last returned event do not skip it. A missing number is skipped once the
+    following event is older than EVENT_OUTBOX_GAP_TIMEOUT (the numbered event was not stored, or expired).
+
+    Args:
+        sequence: Sequence number of the last event already read, all events if None.
+        limit: Maximum number of events, all if None.
+
+    Returns:
+        List of events.
+
+    """
+    # dates are compared in naive UTC, as stored in database
+    gap_timeout_date = datetime.datetime.utcnow() - datetime.timedelta(seconds=EVENT_OUTBOX_GAP_TIMEOUT)
+    list_events = []
+    for event in Event.get_all_after(sequence, limit):
+        if sequence is not None and event.sequence != sequence + 1 and _to_naive_utc(event.date) > gap_timeout_date:
+            # a previous event may not be stored yet
+            break
+        list_events.append(event)
+        sequence = event.sequence
+    return list_events
+
+
+def _to_naive_utc(date):
+    """ Convert a date to naive UTC.
+
+    Args:
+        date:
+
+    Returns:
+
+    """
+    if date.tzinfo is not None:
+        return date.astimezone(pytz.utc).replace(tzinfo=None)
+    return date
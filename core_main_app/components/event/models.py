@@ -0,0 +1,40 @@
+""" Event model
+"""
+from django_mongoengine import fields, Document
+
+from core_main_app.settings import EVENT_OUTBOX_TTL
+
+
+class Event(Document):
+    """ Event published by a write, stored in the outbox for the consumers of other processes
+    """
+    event_type = fields.StringField(blank=False)
+    object_id = fields.ObjectIdField(blank=False)
+    template = fields.ObjectIdField(blank=True)
+    workspace = fields.ObjectIdField(blank=True)
+    user_id = fields.StringField(blank=True)
+    date = fields.DateTimeField(blank=False)
+    # number given by a counter of the database, incremented atomically for each event before it is stored
+    sequence = fields.SequenceField()
+
+    meta = {
+        # events are removed from the outbox after EVENT_OUTBOX_TTL seconds
+        'indexes': [{'fields': ['sequence'], 'unique': True},
+                    {'fields': ['date'], 'expireAfterSeconds': EVENT_OUTBOX_TTL} if EVENT_OUTBOX_TTL else 'date'],
+        'index_background': True,
+    }
+
+    @staticmethod
+    def get_all_after(sequence=None, limit=None):
+        """ Get the events stored after an event, in the order of their sequence numbers.
+
+        Args:
+            sequence: Sequence number of the last event already read, all events if None.
+            limit: Maximum number of events, all if None.
+
+        Returns:
+
+        """
+        queryset = Event.objects.all() if sequence is None else Event.objects(sequence__gt=sequence)
+        queryset = queryset.order_by('sequence')
+        return queryset.limit(limit) if limit is not None else queryset
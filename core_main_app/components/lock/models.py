@@ -83,6 +83,11 @@ class DatabaseLockObject(Document):
     user_id = fields.StringField(blank=False)
     lock_date = fields.DateTimeField(blank=False)
 
+    meta = {
+        'indexes': ['object'],
+        'index_background': True,
+    }
+
     @staticmethod
     def get_lock_by_object(object):
         """ Get lock relative to the given object.
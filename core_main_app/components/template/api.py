@@ -3,8 +3,10 @@ Template API
 """
 from core_main_app.commons import exceptions
 from core_main_app.components.template.models import Template
+from core_main_app.utils import events
 from core_main_app.utils.xml import is_schema_valid, get_hash, \
     get_template_with_server_dependencies, get_local_dependencies
+from core_main_app.utils.xml_schema_cache import invalidate_template_xml_schema
 
 
 def upsert(template):
@@ -22,8 +24,13 @@ def upsert(template):
     template.hash = get_hash(template.content)
     # Register local dependencies
     _register_local_dependencies(template)
+    # Remove outdated compiled schema
+    invalidate_template_xml_schema(template)
     # Save template
-    return template.save()
+    is_new = template.id is None
+    template = template.save()
+    events.publish(events.TEMPLATE_ADDED if is_new else events.TEMPLATE_UPDATED, template)
+    return template
 
 
 def init_template_with_dependencies(template, dependencies_dict):
@@ -124,7 +131,9 @@ def delete(template):
     Returns:
 
     """
+    invalidate_template_xml_schema(template)
     template.delete()
+    events.publish(events.TEMPLATE_DELETED, template)
 
 
 def _register_local_dependencies(template):
@@ -21,7 +21,11 @@ class VersionManager(Document):
     is_disabled = fields.BooleanField(default=False)
     disabled_versions = fields.ListField(default=[], blank=True)
 
-    meta = {'allow_inheritance': True}
+    meta = {
+        'allow_inheritance': True,
+        'indexes': ['versions'],
+        'index_background': True,
+    }
 
     def disable(self):
         """Disable the Version Manager.
@@ -9,6 +9,7 @@ from core_main_app.components.workspace.access_control import can_delete_workspa
     is_workspace_owner_to_perform_action_for_others, can_user_set_workspace_public
 from core_main_app.components.workspace.models import Workspace
 from core_main_app.permissions import api as permission_api
+from core_main_app.utils.access_control import request_cache, workspace_access_cache
 from core_main_app.utils.access_control.decorators import access_control
 
 
@@ -27,7 +28,9 @@ def create_and_save(title, owner_id=None, is_public=False):
     workspace = _create_workspace(title, owner_id, is_public)
 
     try:
-        return workspace.save()
+        workspace = workspace.save()
+        workspace_access_cache.invalidate()
+        return workspace
     except Exception as ex:
         # Rollback permissions
         permission_api.delete_permission(workspace.read_perm_id)
@@ -75,6 +78,8 @@ def delete(workspace, user):
     permission_api.delete_permission(workspace.read_perm_id)
     permission_api.delete_permission(workspace.write_perm_id)
     workspace.delete()
+    workspace_access_cache.invalidate()
+    request_cache.clear(user)
 
 
 def set_title(workspace, new_title):
@@ -164,6 +169,36 @@ def get_all_workspaces_with_write_access_by_user(user):
     return Workspace.get_all_workspaces_with_write_access_by_user_id(user.id, write_permissions)
 
 
+def get_all_workspace_ids_with_read_access_by_user(user):
+    """ Get the ids of all workspaces with read access for the given user, cached for the request.
+
+    Args:
+        user
+
+    Returns:
+        Set of workspace ids.
+
+    """
+    return workspace_access_cache.get_or_set(user, 'workspace_ids_with_read_access',
+                                             lambda: {workspace.id for workspace in
+                                                      get_all_workspaces_with_read_access_by_user(user)})
+
+
+def get_all_workspace_ids_with_write_access_by_user(user):
+    """ Get the ids of all workspaces with write access for the given user, cached for the request.
+
+    Args:
+        user
+
+    Returns:
+        Set of workspace ids.
+
+    """
+    return workspace_access_cache.get_or_set(user, 'workspace_ids_with_write_access',
+                                             lambda: {workspace.id for workspace in
+                                                      get_all_workspaces_with_write_access_by_user(user)})
+
+
 def get_all_workspaces_with_read_access_not_owned_by_user(user):
     """ Get the all workspaces with read access not owned by the given user.
 
@@ -279,6 +314,8 @@ def set_workspace_public(workspace, user):
     if settings.CAN_SET_WORKSPACE_PUBLIC:
         workspace.is_public = True
         workspace.save()
+        workspace_access_cache.invalidate()
+        request_cache.clear(user)
     else:
         raise exceptions.ApiError("You can't change the state of the workspace because of the settings of the website.")
 
@@ -299,6 +336,8 @@ def set_workspace_private(workspace, user):
     if settings.CAN_SET_PUBLIC_DATA_TO_PRIVATE:
         workspace.is_public = False
         workspace.save()
+        workspace_access_cache.invalidate()
+        request_cache.clear(user)
     else:
         raise exceptions.ApiError("You can't change the state of the workspace because of the settings of the website.")
 
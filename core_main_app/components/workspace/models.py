@@ -20,6 +20,11 @@ class Workspace(Document):
     write_perm_id = fields.StringField(blank=False)
     is_public = fields.BooleanField(default=False)
 
+    meta = {
+        'indexes': ['owner', 'read_perm_id', 'write_perm_id', 'is_public'],
+        'index_background': True,
+    }
+
     def clean(self):
         """
 
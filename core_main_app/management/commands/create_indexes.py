@@ -0,0 +1,71 @@
+""" Command creating the indexes of the core collections, and reporting index drift
+"""
+from django.core.management.base import BaseCommand
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.lock.models import DatabaseLockObject
+from core_main_app.components.version_manager.models import VersionManager
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.settings import DATA_DICT_CONTENT_INDEXES
+from core_main_app.utils.databases import indexes
+
+
+class Command(BaseCommand):
+    """ Create the indexes of the core collections.
+    """
+    help = 'Create the indexes declared by the core documents and the data content indexes set in ' \
+           'DATA_DICT_CONTENT_INDEXES, and report index drift.'
+
+    def add_arguments(self, parser):
+        """ Add command arguments.
+
+        Args:
+            parser:
+
+        Returns:
+
+        """
+        parser.add_argument('--check', action='store_true', dest='check', default=False,
+                            help='Only report index drift, without creating indexes.')
+
+    def handle(self, *args, **options):
+        """ Create indexes and report drift.
+
+        Args:
+            *args:
+            **options:
+
+        Returns:
+
+        """
+        for document_class, managed_index_keys in get_indexed_documents():
+            if not options['check']:
+                indexes.create_indexes(document_class)
+                if document_class is Data:
+                    indexes.create_dict_content_indexes(Data, DATA_DICT_CONTENT_INDEXES)
+
+            drift = indexes.get_index_drift(document_class, managed_index_keys)
+            collection_name = document_class._get_collection_name()
+            for key in drift['missing']:
+                self.stdout.write("{0}: missing index {1}".format(collection_name, key))
+            for key in drift['extra']:
+                self.stdout.write("{0}: extra index {1}".format(collection_name, key))
+            if not drift['missing'] and not drift['extra']:
+                self.stdout.write("{0}: indexes up to date".format(collection_name))
+
+
+def get_indexed_documents():
+    """ Return the indexed documents, with the keys of the indexes not declared by the documents.
+
+    Returns:
+        List of (document class, list of index keys).
+
+    """
+    data_index_keys = [indexes.TEXT_INDEX_KEY] + [indexes.get_dict_content_index_key(path)
+                                                  for path in DATA_DICT_CONTENT_INDEXES]
+    return [
+        (Data, data_index_keys),
+        (Workspace, []),
+        (VersionManager, []),
+        (DatabaseLockObject, []),
+    ]
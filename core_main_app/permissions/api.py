@@ -11,6 +11,7 @@ from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
 from core_main_app.permissions.rights import CAN_READ_NAME, CAN_READ_CODENAME, CONTENT_TYPE_APP_LABEL,\
     CAN_WRITE_NAME, CAN_WRITE_CODENAME
+from core_main_app.utils.access_control import request_cache, workspace_access_cache
 
 
 def _title_to_codename(title):
@@ -95,6 +96,7 @@ def add_permission_to_user(user, permission):
     """
     user.user_permissions.add(permission)
     user.save()
+    request_cache.clear(user)
 
 
 def add_permission_to_group(group, permission):
@@ -121,6 +123,7 @@ def remove_permission_to_user(user, permission):
     """
     user.user_permissions.remove(permission)
     user.save()
+    request_cache.clear(user)
 
 
 def remove_permission_to_group(group, permission):
@@ -144,6 +147,19 @@ def get_all_workspace_permissions_user_can_write(user):
 
     Return:
 
+    """
+    return list(workspace_access_cache.get_or_set(user, 'workspace_permissions_can_write',
+                                                  lambda: _get_all_workspace_permissions_user_can_write(user)))
+
+
+def _get_all_workspace_permissions_user_can_write(user):
+    """ Get a list of permission ids of workspaces that the user has write access, from the database.
+
+    Args:
+        user
+
+    Return:
+
     """
     # TODO: fix the super user case
     if user.is_superuser:
@@ -161,6 +177,18 @@ def get_all_workspace_permissions_user_can_write(user):
 def get_all_workspace_permissions_user_can_read(user):
     """ Get a list of permission ids of workspaces that the user has read access.
 
+    Args:
+        user
+
+    Return:
+    """
+    return list(workspace_access_cache.get_or_set(user, 'workspace_permissions_can_read',
+                                                  lambda: _get_all_workspace_permissions_user_can_read(user)))
+
+
+def _get_all_workspace_permissions_user_can_read(user):
+    """ Get a list of permission ids of workspaces that the user has read access, from the database.
+
     Args:
         user
 
@@ -4,11 +4,15 @@ import json
 from abc import ABCMeta, abstractmethod
 
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core_main_app.components.data import api as data_api
-from core_main_app.utils.query.constants import VISIBILITY_OPTION
+from core_main_app.utils.access_control.exceptions import AccessControlError
+from core_main_app.utils.boolean import to_bool
+from core_main_app.utils.pagination.rest_framework_paginator.rest_framework_paginator import get_request_paginator
+from core_main_app.utils.query.constants import VISIBILITY_OPTION, COUNT_ONLY_OPTION, IDS_ONLY_OPTION
 from core_main_app.utils.query.mongo.query_builder import QueryBuilder
 
 
@@ -27,6 +31,8 @@ class AbstractExecuteLocalQueryView(APIView):
             {"query": "{\"root.element.value\": 2}", "all": "true"}
             {"query": "{\"root.element.value\": 2}", "templates": "[{\"id\":\"[template_id]\"}]"}
             {"query": "{}", "templates": "[{\"id\":\"[template_id]\"}]"}
+            {"query": "{}", "options": "{\"count_only\": true}"}
+            {"query": "{}", "options": "{\"ids_only\": true}"}
 
         Warning:
 
@@ -39,7 +45,7 @@ class AbstractExecuteLocalQueryView(APIView):
         Returns:
 
             - code: 200
-              content: List of data
+              content: List of data (number of data if count_only, list of ids if ids_only, paginated unless all)
             - code: 400
               content: Bad request
             - code: 500
@@ -64,7 +70,7 @@ class AbstractExecuteLocalQueryView(APIView):
         Returns:
 
             - code: 200
-              content: List of data
+              content: List of data (number of data if count_only, list of ids if ids_only, paginated unless all)
             - code: 400
               content: Bad request
             - code: 500
@@ -87,10 +93,19 @@ class AbstractExecuteLocalQueryView(APIView):
                 # execute query
                 data_list = self.execute_raw_query(raw_query)
                 # build and return response
-                return self.build_response(data_list)
+                return self.build_query_response(data_list, options)
             else:
                 content = {'message': 'Expected parameters not provided.'}
                 return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as validation_exception:
+            content = {'message': validation_exception.detail}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as value_exception:
+            content = {'message': value_exception.message}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
         except Exception as api_exception:
             content = {'message': api_exception.message}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -133,6 +148,60 @@ class AbstractExecuteLocalQueryView(APIView):
         """
         return data_api.execute_query(raw_query, self.request.user)
 
+    def build_query_response(self, data_list, options):
+        """ Build the response of the query, depending on the options: number of results if count_only, ids of the
+        results if ids_only, paginated results otherwise.
+
+        Args:
+
+            data_list: List of data.
+            options: Query option
+
+        Returns:
+
+            The response
+        """
+        if to_bool(options.get(COUNT_ONLY_OPTION, False)):
+            return self.build_count_response(data_list)
+        if to_bool(options.get(IDS_ONLY_OPTION, False)):
+            return self.build_ids_response(data_list)
+        return self.build_response(data_list)
+
+    def build_count_response(self, data_list):
+        """ Build the response containing the number of results, without reading the data.
+
+        Args:
+
+            data_list: List of data.
+
+        Returns:
+
+            The response
+        """
+        return Response({'count': data_list.count()})
+
+    def build_ids_response(self, data_list):
+        """ Build the response containing the ids of the results, reading only the ids of the data. The ids are
+        paginated as the results, unless all the ids are requested.
+
+        Args:
+
+            data_list: List of data.
+
+        Returns:
+
+            The response
+        """
+        if 'all' in self.request.data and to_bool(self.request.data['all']):
+            return Response([str(data_id) for data_id in data_list.no_cache().scalar('id')])
+
+        # Get paginator (page number or keyset pagination)
+        paginator = get_request_paginator(self.request)
+        # Get requested page from list of results, loading only the ids
+        page = paginator.paginate_queryset(data_list.only('id'), self.request)
+        # Return paginated response
+        return paginator.get_paginated_response([str(data.id) for data in page])
+
     @abstractmethod
     def build_response(self, data_list):
         """ Build the paginated response.
@@ -1,11 +1,18 @@
 """Serializers used throughout the data Rest API
 """
+import json
+
+from mongoengine.errors import InvalidDocumentError
 from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework_mongoengine.serializers import DocumentSerializer
 
 import core_main_app.components.data.api as data_api
 from core_main_app.components.data.models import Data
 
+# document fields storing the serializer fields, when named differently
+DATA_DOCUMENT_FIELDS = {'xml_content': 'xml_file'}
+
 
 class XMLContentField(serializers.Field):
     """
@@ -35,11 +42,31 @@ class DataSerializer(DocumentSerializer):
                   "last_modification_date"]
         read_only_fields = ('id', 'user_id', 'last_modification_date', )
 
+    def __init__(self, *args, **kwargs):
+        """
+        Init the serializer, keeping only the given `fields` if set.
+        """
+        fields = kwargs.pop('fields', None)
+        super(DataSerializer, self).__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
     def create(self, validated_data):
         """
         Create and return a new `Data` instance, given the validated data.
         """
         # Create data
+        instance = self.build_instance(validated_data)
+        # Save the data
+        return data_api.upsert(instance, validated_data['user'])
+
+    @staticmethod
+    def build_instance(validated_data):
+        """
+        Return a new unsaved `Data` instance, given the validated data.
+        """
+        # Create data
         instance = Data(
             template=validated_data['template'],
             title=validated_data['title'],
@@ -47,8 +74,7 @@ class DataSerializer(DocumentSerializer):
         )
         # Set xml content
         instance.xml_content = validated_data['xml_content']
-        # Save the data
-        return data_api.upsert(instance, validated_data['user'])
+        return instance
 
     def update(self, instance, validated_data):
         """
@@ -59,6 +85,120 @@ class DataSerializer(DocumentSerializer):
         return data_api.upsert(instance, validated_data['user'])
 
 
+class DataWithScoreSerializer(DataSerializer):
+    """ Data serializer, with the relevance of the data for a full text search
+    """
+    score = serializers.SerializerMethodField()
+
+    class Meta(DataSerializer.Meta):
+        """ Meta
+        """
+        fields = DataSerializer.Meta.fields + ["score"]
+
+    def __init__(self, *args, **kwargs):
+        """
+        Init the serializer, always keeping the score.
+        """
+        fields = kwargs.get('fields', None)
+        if fields is not None:
+            kwargs['fields'] = list(fields) + ["score"]
+        super(DataWithScoreSerializer, self).__init__(*args, **kwargs)
+
+    def get_score(self, obj):
+        """
+        Return the text score of the data, None if not loaded from a full text search.
+        """
+        try:
+            return obj.get_text_score()
+        except InvalidDocumentError:
+            return None
+
+
+def get_data_fields(fields_param):
+    """ Return the list of data fields to serialize, given a comma separated list of fields.
+
+    Args:
+        fields_param: Comma separated list of fields (e.g. id,title,template), None for all fields.
+
+    Returns:
+        List of fields, None for all fields.
+
+    Raises:
+        ValidationError: Unknown field.
+
+    """
+    if fields_param is None:
+        return None
+
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+    unknown_fields = [field for field in fields if field not in DataSerializer.Meta.fields]
+    if len(unknown_fields) > 0:
+        raise serializers.ValidationError('Unknown fields: ' + ', '.join(unknown_fields) + '.')
+    return fields
+
+
+def project_data_queryset(data_queryset, fields):
+    """ Load only the given fields of the data from the database.
+
+    The dict_content is never loaded, and the xml file is only read from GridFS if xml_content is requested.
+
+    Args:
+        data_queryset:
+        fields: List of fields, None for all fields.
+
+    Returns:
+
+    """
+    if fields is None:
+        return data_queryset.exclude('dict_content')
+    return data_queryset.only(*[DATA_DOCUMENT_FIELDS.get(field, field) for field in fields])
+
+
+def iter_data_ndjson(data_queryset, fields, batch_size, serializer_class=DataSerializer):
+    """ Serialize the data of a queryset as newline delimited JSON, one data at a time.
+
+    Data are read from the database by batch, without caching the results of the queryset: only one batch of data is
+    kept in memory.
+
+    Args:
+        data_queryset:
+        fields: List of fields, None for all fields.
+        batch_size: Number of data read per batch.
+        serializer_class: Serializer of the data.
+
+    Returns:
+        Iterator of JSON lines.
+
+    """
+    batch = []
+    for data in data_queryset.no_cache().batch_size(batch_size):
+        batch.append(data)
+        if len(batch) == batch_size:
+            for line in _iter_data_batch_ndjson(batch, fields, serializer_class):
+                yield line
+            batch = []
+    for line in _iter_data_batch_ndjson(batch, fields, serializer_class):
+        yield line
+
+
+def _iter_data_batch_ndjson(batch, fields, serializer_class):
+    """ Serialize a batch of data as newline delimited JSON.
+
+    Args:
+        batch:
+        fields:
+        serializer_class:
+
+    Returns:
+
+    """
+    # Read xml contents of the batch at once
+    if fields is None or 'xml_content' in fields:
+        data_api.prefetch_xml_content(batch)
+    for data in batch:
+        yield json.dumps(serializer_class(data, fields=fields).data, cls=JSONEncoder) + '\n'
+
+
 # FIXME: Should use in the future an serializer with dynamic fields (init depth with parameter for example)
 class DataWithTemplateInfoSerializer(DocumentSerializer):
     """ Data Full serializer
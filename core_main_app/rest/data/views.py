@@ -1,24 +1,40 @@
 """ REST views for the data API
 """
 import json
-
-from django.http import Http404
+from collections import OrderedDict
+
+import pytz
+from bson import json_util
+from django.contrib.auth.models import User
+from django.http import Http404, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_aware
+from pymongo.errors import OperationFailure
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 from rest_framework.views import APIView
 
 from core_main_app.commons import exceptions
 from core_main_app.components.data import api as data_api
+from core_main_app.components.template import api as template_api
+from core_main_app.components.user import api as user_api
 from core_main_app.components.workspace import api as workspace_api
 from core_main_app.rest.data.abstract_views import AbstractExecuteLocalQueryView
-from core_main_app.rest.data.serializers import DataSerializer, DataWithTemplateInfoSerializer
+from core_main_app.rest.data.serializers import DataSerializer, DataWithTemplateInfoSerializer, get_data_fields, \
+    project_data_queryset, iter_data_ndjson, DataWithScoreSerializer
+from core_main_app.settings import DATA_STREAM_BATCH_SIZE, DATA_FACET_MAX_VALUES, DATA_KEYWORD_QUERY_MAX_RESULTS, \
+    DATA_CHANGES_PAGE_SIZE
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.boolean import to_bool
-from core_main_app.utils.databases.pymongo_database import get_full_text_query
-from core_main_app.utils.file import get_file_http_response
-from core_main_app.utils.pagination.rest_framework_paginator.pagination import StandardResultsSetPagination
+from core_main_app.utils.databases.indexes import INDEX_NOT_FOUND_ERROR_CODE
+from core_main_app.utils.databases.pymongo_database import get_full_text_search
+from core_main_app.utils.file import get_file_streaming_http_response
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import KeysetResultsSetPagination
+from core_main_app.utils.pagination.rest_framework_paginator.rest_framework_paginator import get_request_paginator, \
+    PAGINATION_QUERY_PARAM, CURSOR_PAGINATION
 
 
 # FIXME: permissions
@@ -33,6 +49,11 @@ class DataList(APIView):
 
             template: template_id
             title: document_title
+            fields: comma separated list of fields to return
+            pagination: cursor, to return the data page by page
+            ordering: id (default) or last_modification_date, ordering of the pages
+            cursor: position of the page, from the next link of the previous page
+            count: true, to return the total number of data with the pages
 
         Examples:
 
@@ -40,6 +61,8 @@ class DataList(APIView):
             ../data?template=[template_id]
             ../data?title=[document_title]
             ../data?template=[template_id]&title=[document_title]
+            ../data?fields=id,title,template,last_modification_date
+            ../data?pagination=cursor&ordering=last_modification_date&count=true
 
         Args:
 
@@ -49,10 +72,15 @@ class DataList(APIView):
 
             - code: 200
               content: List of data
+            - code: 400
+              content: Validation error
             - code: 500
               content: Internal server error
         """
         try:
+            # Get requested fields
+            fields = get_data_fields(self.request.query_params.get('fields', None))
+
             # Get object
             data_object_list = data_api.get_all_by_user(request.user)
 
@@ -65,11 +93,28 @@ class DataList(APIView):
             if title is not None:
                 data_object_list = data_object_list.filter(title=title)
 
+            # Load only requested fields
+            data_object_list = project_data_queryset(data_object_list, fields)
+
+            if self.request.query_params.get(PAGINATION_QUERY_PARAM, None) == CURSOR_PAGINATION:
+                # Get requested page from list of data
+                paginator = get_request_paginator(self.request)
+                page = paginator.paginate_queryset(data_object_list, self.request)
+
+                # Serialize page
+                data_serializer = DataSerializer(page, many=True, fields=fields)
+
+                # Return paginated response
+                return paginator.get_paginated_response(data_serializer.data)
+
             # Serialize object
-            data_serializer = DataSerializer(data_object_list, many=True)
+            data_serializer = DataSerializer(data_object_list, many=True, fields=fields)
 
             # Return response
             return Response(data_serializer.data, status=status.HTTP_200_OK)
+        except ValidationError as validation_exception:
+            content = {'message': validation_exception.detail}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
         except Exception as api_exception:
             content = {'message': api_exception.message}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -122,6 +167,85 @@ class DataList(APIView):
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DataBulkList(APIView):
+    """ Create a list of Data.
+    """
+
+    def post(self, request):
+        """ Create a list of Data
+
+        Parameters:
+
+            [
+                {
+                    "title": "document_title",
+                    "template": "template_id",
+                    "xml_content": "document_content"
+                },
+                {
+                    "title": "document_title",
+                    "template": "template_id",
+                    "xml_content": "document_content"
+                }
+            ]
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 201
+              content: Result of each data creation
+            - code: 207
+              content: Result of each data creation, some data were not created
+            - code: 400
+              content: Validation error
+            - code: 403
+              content: Authentication error
+            - code: 404
+              content: Template was not found
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Build serializer
+            data_serializer = DataSerializer(data=request.data, many=True)
+
+            # Validate data
+            data_serializer.is_valid(True)
+
+            # Build and save the list of data
+            list_data = [DataSerializer.build_instance(dict(validated_data, user=request.user))
+                         for validated_data in data_serializer.validated_data]
+            errors = data_api.bulk_upsert(list_data, request.user)
+
+            # Build the result of each data creation
+            content = []
+            for data, error in zip(list_data, errors):
+                if error is None:
+                    content.append({'id': str(data.id), 'status': status.HTTP_201_CREATED})
+                else:
+                    content.append({'message': error, 'status': status.HTTP_400_BAD_REQUEST})
+
+            # Return response
+            if any(error is not None for error in errors):
+                return Response(content, status=status.HTTP_207_MULTI_STATUS)
+            return Response(content, status=status.HTTP_201_CREATED)
+        except ValidationError as validation_exception:
+            content = {'message': validation_exception.detail}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except exceptions.DoesNotExist:
+            content = {'message': 'Template not found.'}
+            return Response(content, status=status.HTTP_404_NOT_FOUND)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class DataDetail(APIView):
     """ Retrieve, update or delete a Data
     """
@@ -302,7 +426,9 @@ class DataDownload(APIView):
             # Get object
             data_object = self.get_object(request, pk)
 
-            return get_file_http_response(data_object.xml_content, data_object.title, 'text/xml', 'xml')
+            # Stream xml file chunk by chunk
+            return get_file_streaming_http_response(data_object.iter_xml_content(), data_object.title,
+                                                    'text/xml', 'xml')
         except Http404:
             content = {'message': 'Data not found.'}
             return Response(content, status=status.HTTP_404_NOT_FOUND)
@@ -365,18 +491,27 @@ def get_by_id_with_template_info(request):
 
 
 class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
+    serializer_class = DataSerializer
+
     def post(self, request):
         """ Execute a query
 
         Url Parameters:
 
             page: page_number
+            fields: comma separated list of fields to return
+            pagination: cursor, to paginate by position instead of page number (faster on deep pages)
+            ordering: id (default) or last_modification_date, ordering of the pages
+            cursor: position of the page, from the next link of the previous page
+            count: true, to return the total number of results with the pages
 
         Parameters:
 
             {"query": "{}"}
             {"query": "{\"root.element.value\": 2}"}
             {"query": "{\"root.element.value\": 2}", "all": "true"}
+            {"query": "{\"root.element.value\": 2}", "all": "true", "stream": "true"}
+            {"query": "{\"root.element.value\": 2}", "fields": "id,title,template"}
             {"query": "{\"root.element.value\": 2}", "templates": "[{\"id\":\"[template_id]\"}]"}
             {"query": "{}", "templates": "[{\"id\":\"[template_id]\"}]"}
 
@@ -388,6 +523,8 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
 
             ../data/query/
             ../data/query/?page=2
+            ../data/query/?fields=id,title,template,last_modification_date
+            ../data/query/?pagination=cursor&ordering=last_modification_date
 
         Args:
 
@@ -396,7 +533,7 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
         Returns:
 
             - code: 200
-              content: List of data
+              content: List of data (newline delimited JSON stream if stream is true)
             - code: 400
               content: Bad request
             - code: 500
@@ -415,43 +552,310 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
 
             The response paginated
         """
+        # Get requested fields
+        fields = get_data_fields(self.request.data.get('fields', self.request.query_params.get('fields', None)))
+        # Load only requested fields
+        data_list = project_data_queryset(data_list, fields)
+
         if 'all' in self.request.data and to_bool(self.request.data['all']):
+            if 'stream' in self.request.data and to_bool(self.request.data['stream']):
+                # Stream data as newline delimited JSON, batch by batch
+                return StreamingHttpResponse(iter_data_ndjson(data_list, fields, DATA_STREAM_BATCH_SIZE,
+                                                              self.serializer_class),
+                                             content_type='application/x-ndjson')
+            data_list = list(data_list)
+            # Read xml contents in batch
+            if fields is None or 'xml_content' in fields:
+                data_api.prefetch_xml_content(data_list)
             # Serialize data list
-            data_serializer = DataSerializer(data_list, many=True)
+            data_serializer = self.serializer_class(data_list, many=True, fields=fields)
             # Return response
             return Response(data_serializer.data)
         else:
-            # Get paginator
-            paginator = StandardResultsSetPagination()
+            # Get paginator (page number or keyset pagination)
+            paginator = get_request_paginator(self.request)
 
             # Get requested page from list of results
             page = paginator.paginate_queryset(data_list, self.request)
 
+            # Read xml contents of the page in batch
+            if fields is None or 'xml_content' in fields:
+                data_api.prefetch_xml_content(page)
+
             # Serialize page
-            data_serializer = DataSerializer(page, many=True)
+            data_serializer = self.serializer_class(page, many=True, fields=fields)
 
             # Return paginated response
             return paginator.get_paginated_response(data_serializer.data)
 
 
 class ExecuteLocalKeywordQueryView(ExecuteLocalQueryView):
+    """ Execute a keyword query, returning the most relevant data first, with their score
+
+    Parameters (in addition to the parameters of the local query):
+
+        {"query": "keyword other", "limit": 100}
+
+    The limit is the number of most relevant data returned (at most DATA_KEYWORD_QUERY_MAX_RESULTS). Data are sorted by
+    relevance, unless paginated by cursor. When more data match than the limit, the response has the header
+    "X-Results-Truncated: true".
+    """
+    serializer_class = DataWithScoreSerializer
+    truncated = False
+
     def build_query(self, query, templates, options):
         """ Build the raw query
-        Prepare the query for a keyword search
+        Prepare the query for a keyword search: keywords are searched separately, to sort the results by relevance
 
         Args:
 
             query: ObjectId
             templates: ObjectId
             options: Query options
-            
+
         Returns:
 
             The raw query
         """
-        # build query builder
-        query = json.dumps(get_full_text_query(query))
-        return super(ExecuteLocalKeywordQueryView, self).build_query(str(query), templates, options)
+        self.full_text_search = get_full_text_search(query)
+        return super(ExecuteLocalKeywordQueryView, self).build_query("{}", templates, options)
+
+    def execute_raw_query(self, raw_query):
+        """ Execute the raw query in database, with the keywords
+
+        Args:
+
+            raw_query: Query to execute
+
+        Returns:
+
+            Results of the query, most relevant first
+        """
+        if len(self.full_text_search) == 0:
+            return super(ExecuteLocalKeywordQueryView, self).execute_raw_query(raw_query)
+
+        max_results = DATA_KEYWORD_QUERY_MAX_RESULTS
+        if 'limit' in self.request.data:
+            try:
+                max_results = int(self.request.data['limit'])
+            except ValueError:
+                raise ValidationError('Expected an integer limit.')
+            if max_results < 1:
+                raise ValidationError('Expected a positive limit.')
+            if DATA_KEYWORD_QUERY_MAX_RESULTS is not None:
+                max_results = min(max_results, DATA_KEYWORD_QUERY_MAX_RESULTS)
+        data_list, self.truncated = data_api.execute_text_query(raw_query, self.full_text_search, self.request.user,
+                                                                max_results)
+        return data_list
+
+    def build_query_response(self, data_list, options):
+        """ Build the response, telling if the results were cut to the limit
+
+        Args:
+
+            data_list: List of data
+            options: Query options
+
+        Returns:
+
+            The response, with the header X-Results-Truncated
+        """
+        response = super(ExecuteLocalKeywordQueryView, self).build_query_response(data_list, options)
+        response['X-Results-Truncated'] = 'true' if self.truncated else 'false'
+        return response
+
+
+class ExecuteLocalQueryExplainView(AbstractExecuteLocalQueryView):
+    def post(self, request):
+        """ Explain the execution of a query (administrators only)
+
+        Parameters:
+
+            {"query": "{\"root.element.value\": 2}"}
+            {"query": "{\"root.element.value\": 2}", "templates": "[{\"id\":\"[template_id]\"}]"}
+            {"query": "{\"root.element.value\": 2}", "user": "[user_id]"}
+
+        Warning:
+
+            Need to backslash double quotes in JSON payload
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 200
+              content: Executed query, regular expression report, explain output and summary, access control time
+            - code: 400
+              content: Bad request
+            - code: 403
+              content: Authentication error
+            - code: 500
+              content: Internal server error
+        """
+        return super(ExecuteLocalQueryExplainView, self).post(request)
+
+    def execute_raw_query(self, raw_query):
+        """ Explain the execution of the raw query
+
+        Args:
+
+            raw_query: Query to explain
+
+        Returns:
+
+            The explanation of the query
+        """
+        # explain the query executed for another user if requested
+        user_id = self.request.data.get('user', None)
+        try:
+            query_user = user_api.get_user_by_id(user_id) if user_id is not None else None
+        except (User.DoesNotExist, ValueError):
+            raise ValidationError('User not found.')
+        return data_api.explain_query(self.request.user, raw_query, query_user)
+
+    def build_response(self, explanation):
+        """ Build the response.
+
+        Args:
+
+            explanation: Explanation of the query
+
+        Returns:
+
+            The response
+        """
+        # convert database types (ObjectId, regular expressions, dates)
+        return Response(json.loads(json_util.dumps(explanation)))
+
+    def build_query_response(self, explanation, options):
+        """ Build the response, the explanation of the query being the same whatever the options.
+
+        Args:
+
+            explanation: Explanation of the query
+            options: Query option
+
+        Returns:
+
+            The response
+        """
+        return self.build_response(explanation)
+
+
+class ExecuteLocalQueryFacetView(AbstractExecuteLocalQueryView):
+    def get(self, request):
+        """ Count the most frequent values of paths in the results of a query
+
+        Parameters:
+
+            {"query": "{}", "facets": "[\"root.element\"]"}
+            {"query": "{\"root.element.value\": 2}", "facets": "[\"root.element\", \"root.other\"]", "size": 5}
+            {"query": "{}", "facets": "[\"root.element\"]", "templates": "[{\"id\":\"[template_id]\"}]"}
+
+        Warning:
+
+            Need to backslash double quotes in JSON payload
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 200
+              content: Most frequent values of each path, with their number of data
+            - code: 400
+              content: Bad request
+            - code: 403
+              content: Authentication error
+            - code: 500
+              content: Internal server error
+        """
+        return super(ExecuteLocalQueryFacetView, self).get(request)
+
+    def post(self, request):
+        """ Count the most frequent values of paths in the results of a query
+
+        Parameters:
+
+            {"query": "{}", "facets": "[\"root.element\"]", "size": 5}
+
+        Warning:
+
+            Need to backslash double quotes in JSON payload
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 200
+              content: Most frequent values of each path, with their number of data
+            - code: 400
+              content: Bad request
+            - code: 403
+              content: Authentication error
+            - code: 500
+              content: Internal server error
+        """
+        return super(ExecuteLocalQueryFacetView, self).post(request)
+
+    def execute_raw_query(self, raw_query):
+        """ Count the most frequent values of the requested paths in the results of the raw query
+
+        Args:
+
+            raw_query: Query to execute
+
+        Returns:
+
+            The counts, by path
+        """
+        paths = json.loads(self.request.data.get('facets', '[]'))
+        if not isinstance(paths, list) or len(paths) == 0 \
+                or not all(isinstance(path, basestring) and path and not path.startswith('$') for path in paths):
+            raise ValidationError('Expected a non empty list of paths in facets.')
+        try:
+            max_values = int(self.request.data.get('size', DATA_FACET_MAX_VALUES))
+        except ValueError:
+            raise ValidationError('Expected an integer size.')
+        if max_values < 1:
+            raise ValidationError('Expected a positive size.')
+
+        full_paths = ['.'.join([self.sub_document_root, path]) for path in paths]
+        facets = data_api.get_facets(raw_query, full_paths, self.request.user, max_values)
+        # remove the sub document root from the paths
+        return [(path, facets[full_path]) for path, full_path in zip(paths, full_paths)]
+
+    def build_response(self, facets):
+        """ Build the response.
+
+        Args:
+
+            facets: Counts, by path
+
+        Returns:
+
+            The response
+        """
+        return Response(OrderedDict(facets))
+
+    def build_query_response(self, facets, options):
+        """ Build the response, facets being counts of values whatever the options.
+
+        Args:
+
+            facets: Counts, by path
+            options: Query option
+
+        Returns:
+
+            The response
+        """
+        return self.build_response(facets)
 
 
 class DataAssign(APIView):
@@ -528,3 +932,238 @@ class DataAssign(APIView):
         except Exception as api_exception:
             content = {'message': api_exception.message}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DataIndexList(APIView):
+    """ List or create the indexes on the content of the data.
+    """
+
+    def get(self, request):
+        """ Get the indexes on the content of the data, with their usage statistics
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 200
+              content: List of indexes
+            - code: 403
+              content: Authentication error
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Get indexes
+            index_list = data_api.get_dict_content_indexes(request.user)
+
+            # Return response
+            return Response(index_list, status=status.HTTP_200_OK)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def post(self, request):
+        """ Create indexes on the content of the data, for the paths of a template
+
+        Parameters:
+
+            {"template": "template_id", "paths": "[\"root.element\", \"root.element.@attribute\"]"}
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 201
+              content: List of created indexes
+            - code: 400
+              content: Validation error
+            - code: 403
+              content: Authentication error
+            - code: 404
+              content: Template was not found
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Get parameters
+            template_id = request.data.get('template', None)
+            paths = request.data.get('paths', None)
+            if template_id is None or paths is None:
+                content = {'message': 'Expected parameters not provided.'}
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+            if isinstance(paths, basestring):
+                paths = json.loads(paths)
+
+            # Create indexes
+            template = template_api.get(template_id)
+            index_names = data_api.create_dict_content_indexes(request.user, template, paths)
+
+            # Return response
+            return Response(index_names, status=status.HTTP_201_CREATED)
+        except (exceptions.ApiError, ValueError) as validation_exception:
+            content = {'message': validation_exception.message}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except exceptions.DoesNotExist:
+            content = {'message': 'Template not found.'}
+            return Response(content, status=status.HTTP_404_NOT_FOUND)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DataIndexDetail(APIView):
+    """ Drop an index on the content of the data.
+    """
+
+    def delete(self, request, path):
+        """ Drop the index on a path of the content of the data
+
+        Args:
+
+            request: HTTP request
+            path: Indexed path
+
+        Returns:
+
+            - code: 204
+              content: Deletion succeed
+            - code: 403
+              content: Authentication error
+            - code: 404
+              content: Index was not found
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Drop index
+            data_api.drop_dict_content_index(request.user, path)
+
+            # Return response
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except OperationFailure as operation_failure:
+            if operation_failure.code != INDEX_NOT_FOUND_ERROR_CODE:
+                content = {'message': str(operation_failure)}
+                return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            content = {'message': 'Index not found.'}
+            return Response(content, status=status.HTTP_404_NOT_FOUND)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DataChangeList(APIView):
+    """ List the changes of the data, for incremental harvesting.
+    """
+
+    def get(self, request):
+        """ Get the data modified and deleted at or after a date, or after a resume token, ordered by date and id
+
+        Assigning a data to a workspace and changing its owner are changes of the data. Data the user can no longer
+        read are not reported as deleted: compare the harvested ids with a full harvest to detect them.
+
+        Url Parameters:
+
+            since: ISO 8601 date (e.g. 2018-01-31T12:00:00Z), first date of the changes
+            cursor: resume token of a previous response, to get the following changes
+            fields: comma separated list of data fields to return
+
+        Examples:
+
+            ../data/changes/
+            ../data/changes/?since=2018-01-31T12:00:00Z
+            ../data/changes/?cursor=[resume_token]
+
+        Args:
+
+            request: HTTP request
+
+        Returns:
+
+            - code: 200
+              content: Changes (id, date, deleted, data), link to the next changes, and resume token to get the changes
+              following the returned ones later
+            - code: 400
+              content: Validation error
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Get parameters
+            paginator = KeysetResultsSetPagination()
+            cursor = request.query_params.get('cursor', None)
+            position = None
+            if cursor:
+                ordering, position = paginator.decode_cursor(cursor)
+                # only resume tokens of the changes are accepted
+                if ordering != 'last_modification_date':
+                    raise ValidationError('Invalid cursor.')
+            since = _parse_date(request.query_params.get('since', None))
+            fields = get_data_fields(request.query_params.get('fields', None))
+
+            # Get changes
+            changes = data_api.get_changes(request.user, since, position, DATA_CHANGES_PAGE_SIZE)
+
+            # Read xml contents in batch
+            list_data = [data for _, _, data in changes if data is not None]
+            if fields is None or 'xml_content' in fields:
+                data_api.prefetch_xml_content(list_data)
+
+            results = [OrderedDict([('id', str(data_id)),
+                                    ('date', date),
+                                    ('deleted', data is None),
+                                    ('data', DataSerializer(data, fields=fields).data if data is not None else None)])
+                       for date, data_id, data in changes]
+
+            # Resume after the last change, or from the same position if no change
+            resume_token = cursor
+            if len(changes) > 0:
+                resume_token = paginator.encode_cursor('last_modification_date', list(changes[-1][:2]))
+            next_link = None
+            if len(changes) == DATA_CHANGES_PAGE_SIZE:
+                next_link = replace_query_param(remove_query_param(request.build_absolute_uri(), 'since'),
+                                                'cursor', resume_token)
+
+            # Return response
+            return Response(OrderedDict([('next', next_link), ('resume_token', resume_token), ('results', results)]),
+                            status=status.HTTP_200_OK)
+        except ValidationError as validation_exception:
+            content = {'message': validation_exception.detail}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _parse_date(value):
+    """ Parse an ISO 8601 date into a naive UTC date, as stored in database.
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if value is None:
+        return None
+    try:
+        date = parse_datetime(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise ValidationError('Expected an ISO 8601 date.')
+    if is_aware(date):
+        date = date.astimezone(pytz.utc).replace(tzinfo=None)
+    return date
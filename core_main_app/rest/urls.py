@@ -65,6 +65,18 @@ urlpatterns = [
     url(r'^data/$', data_views.DataList.as_view(),
         name='core_main_app_rest_data_list'),
 
+    url(r'^data/bulk/$', data_views.DataBulkList.as_view(),
+        name='core_main_app_rest_data_bulk_list'),
+
+    url(r'^data/indexes/$', data_views.DataIndexList.as_view(),
+        name='core_main_app_rest_data_index_list'),
+
+    url(r'^data/indexes/(?P<path>[^/]+)/$', data_views.DataIndexDetail.as_view(),
+        name='core_main_app_rest_data_index_detail'),
+
+    url(r'^data/changes/$', data_views.DataChangeList.as_view(),
+        name='core_main_app_rest_data_change_list'),
+
     url(r'^data/download/(?P<pk>\w+)/$', data_views.DataDownload.as_view(),
         name='core_main_app_rest_data_download'),
 
@@ -77,6 +89,12 @@ urlpatterns = [
     url(r'^data/query/$', data_views.ExecuteLocalQueryView.as_view(),
         name='core_explore_common_local_query'),
 
+    url(r'^data/query/explain/$', data_views.ExecuteLocalQueryExplainView.as_view(),
+        name='core_main_app_rest_data_query_explain'),
+
+    url(r'^data/query/facets/$', data_views.ExecuteLocalQueryFacetView.as_view(),
+        name='core_main_app_rest_data_query_facets'),
+
     url(r'^data/(?P<pk>\w+)/assign/(?P<workspace_id>\w+)$', data_views.DataAssign.as_view(),
         name='core_main_app_rest_data_assign'),
 
@@ -36,6 +36,18 @@ XERCES_VALIDATION = getattr(settings, 'XERCES_VALIDATION', False)
 """ :py:class:`bool`: Enables Xerces validation (requires additional packages).
 """
 
+XML_SCHEMA_CACHE_MAX_ENTRIES = getattr(settings, 'XML_SCHEMA_CACHE_MAX_ENTRIES', 32)
+""" :py:class:`int`: Maximum number of compiled XML schemas kept in memory (0 disables the cache).
+"""
+
+XML_SCHEMA_CACHE_MAX_SIZE = getattr(settings, 'XML_SCHEMA_CACHE_MAX_SIZE', 64 * 1024 * 1024)
+""" :py:class:`int`: Maximum cumulated size (in bytes of XSD content) of the compiled XML schemas kept in memory.
+"""
+
+XML_VALIDATION_POOL_SIZE = getattr(settings, 'XML_VALIDATION_POOL_SIZE', 0)
+""" :py:class:`int`: Number of worker processes validating XML data (0 validates inline, in the calling thread).
+"""
+
 # GridFS
 GRIDFS_DATA_COLLECTION = getattr(settings, 'GRIDFS_DATA_COLLECTION', 'fs_data')
 """ :py:class:`str`: Collection name for file storage in MongoDB.
@@ -137,6 +149,86 @@ PASSWORD_MIN_UPPERCASE_LETTERS = getattr(settings, 'PASSWORD_MIN_UPPERCASE_LETTE
 """ :py:class:`int`: Required number of uppercase chars in a password.
 """
 
+DATA_BULK_UPSERT_THREADS = getattr(settings, 'DATA_BULK_UPSERT_THREADS', 4)
+""" :py:class:`int`: Number of threads validating data in parallel during a bulk upsert.
+"""
+
+DATA_BULK_UPSERT_BATCH_SIZE = getattr(settings, 'DATA_BULK_UPSERT_BATCH_SIZE', 1000)
+""" :py:class:`int`: Number of new data inserted per database round trip during a bulk upsert.
+"""
+
+DATA_STREAM_BATCH_SIZE = getattr(settings, 'DATA_STREAM_BATCH_SIZE', 100)
+""" :py:class:`int`: Number of data read per database round trip when streaming query results.
+"""
+
+DATA_AGGREGATE_ALLOW_DISK_USE = getattr(settings, 'DATA_AGGREGATE_ALLOW_DISK_USE', True)
+""" :py:class:`bool`: Allow the stages of data aggregations exceeding the memory limit to write temporary files.
+"""
+
+DATA_AGGREGATE_MAX_TIME_MS = getattr(settings, 'DATA_AGGREGATE_MAX_TIME_MS', 60000)
+""" :py:class:`int`: Maximum duration (in milliseconds) of a data aggregation (None for no limit).
+"""
+
+DATA_AGGREGATE_MAX_RESULTS = getattr(settings, 'DATA_AGGREGATE_MAX_RESULTS', 100000)
+""" :py:class:`int`: Maximum number of results returned by a data aggregation (None for no limit).
+"""
+
+DATA_AGGREGATE_BATCH_SIZE = getattr(settings, 'DATA_AGGREGATE_BATCH_SIZE', 1000)
+""" :py:class:`int`: Number of results of a data aggregation read per database round trip.
+"""
+
+DATA_FACET_MAX_VALUES = getattr(settings, 'DATA_FACET_MAX_VALUES', 10)
+""" :py:class:`int`: Default number of most frequent values returned for each facet of a data search.
+"""
+
+DATA_CHANGES_PAGE_SIZE = getattr(settings, 'DATA_CHANGES_PAGE_SIZE', 100)
+""" :py:class:`int`: Number of changes (modified or deleted data) returned per page to harvesters.
+"""
+
+EVENT_OUTBOX_ENABLED = getattr(settings, 'EVENT_OUTBOX_ENABLED', False)
+""" :py:class:`bool`: Store the events of Data and Template writes in the event outbox collection, for the consumers of
+other processes.
+"""
+
+EVENT_OUTBOX_TTL = getattr(settings, 'EVENT_OUTBOX_TTL', 604800)  # 7 days
+""" :py:class:`int`: Duration (in seconds) events are kept in the outbox (None to keep them).
+"""
+
+EVENT_OUTBOX_GAP_TIMEOUT = getattr(settings, 'EVENT_OUTBOX_GAP_TIMEOUT', 60)
+""" :py:class:`int`: Duration (in seconds) the consumers of the outbox wait for a missing sequence number before skipping
+it (event numbered but not stored by a failed process, or expired).
+"""
+
+QUERY_PREPARE_CACHE_MAX_ENTRIES = getattr(settings, 'QUERY_PREPARE_CACHE_MAX_ENTRIES', 1024)
+""" :py:class:`int`: Maximum number of prepared queries kept in memory (0 disables the cache).
+"""
+
+QUERY_RESULT_CACHE = getattr(settings, 'QUERY_RESULT_CACHE', None)
+""" :py:class:`str`: Alias of the Django cache storing the ids of the results of data queries (None disables it).
+"""
+
+QUERY_RESULT_CACHE_TIMEOUT = getattr(settings, 'QUERY_RESULT_CACHE_TIMEOUT', 60)
+""" :py:class:`int`: Duration (in seconds) the ids of the results of a query are kept in the cache.
+"""
+
+QUERY_RESULT_CACHE_MAX_SIZE = getattr(settings, 'QUERY_RESULT_CACHE_MAX_SIZE', 10000)
+""" :py:class:`int`: Maximum number of results of a query for its ids to be cached.
+"""
+
+DATA_TEXT_INDEX_WEIGHTS = getattr(settings, 'DATA_TEXT_INDEX_WEIGHTS', {})
+""" :py:class:`dict`: Weights of the paths in the data content (e.g. {'root.title.#text': 10}) indexed for keyword
+search, by template name. All the strings of the data content are indexed if empty.
+"""
+
+DATA_KEYWORD_QUERY_MAX_RESULTS = getattr(settings, 'DATA_KEYWORD_QUERY_MAX_RESULTS', 1000)
+""" :py:class:`int`: Maximum number of most relevant data returned by a keyword query (None for no limit). Responses
+to keyword queries cut to this number of results have the header ``X-Results-Truncated: true``.
+"""
+
+DATA_DICT_CONTENT_INDEXES = getattr(settings, 'DATA_DICT_CONTENT_INDEXES', [])
+""" :py:class:`list`: Paths in the data content (e.g. root.element.#text) indexed by the create_indexes command.
+"""
+
 # Lock
 LOCK_OBJECT_TTL = getattr(settings, 'LOCK_OBJECT_TTL', 600)  # 10 min
 """ :py:class:`int`: Lock duration on files.
@@ -161,6 +253,16 @@ CAN_ANONYMOUS_ACCESS_PUBLIC_DATA = getattr(settings, 'CAN_ANONYMOUS_ACCESS_PUBLI
 """ :py:class:`bool`: Can anonymous user access public data.
 """
 
+# Workspace access cache
+WORKSPACE_ACCESS_CACHE = getattr(settings, 'WORKSPACE_ACCESS_CACHE', None)
+""" :py:class:`str`: Alias of the Django cache storing the workspaces accessible by each user (None disables it). The
+cache must be shared by all the processes (e.g. memcached, redis): process-local caches (locmem, dummy) disable it.
+"""
+
+WORKSPACE_ACCESS_CACHE_TIMEOUT = getattr(settings, 'WORKSPACE_ACCESS_CACHE_TIMEOUT', 300)
+""" :py:class:`int`: Duration (in seconds) the workspaces accessible by a user are kept in the cache.
+"""
+
 DISPLAY_NIST_HEADERS = getattr(settings, 'DISPLAY_NIST_HEADERS', False)
 """ :py:class:`bool`: HTML pages show the NIST headers/footers.
 """
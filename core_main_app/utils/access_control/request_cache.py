@@ -0,0 +1,62 @@
+""" Access control values cached for the duration of a request.
+
+The values are stored on the user object, which is loaded once per request (same as the permission cache of the
+Django authentication backend).
+"""
+REQUEST_CACHE_ATTRIBUTE = '_core_access_control_cache'
+
+
+def get_or_set(user, key, get_value):
+    """ Return the value cached for the user, compute and cache it if missing.
+
+    Args:
+        user:
+        key: Key of the value.
+        get_value: Function computing the value.
+
+    Returns:
+
+    """
+    cache = _get_user_cache(user)
+    if cache is None:
+        return get_value()
+
+    if key not in cache:
+        cache[key] = get_value()
+    return cache[key]
+
+
+def clear(user):
+    """ Clear the values cached for the user.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    cache = _get_user_cache(user)
+    if cache is not None:
+        cache.clear()
+
+
+def _get_user_cache(user):
+    """ Return the cache of the user, create it if missing.
+
+    Args:
+        user:
+
+    Returns:
+        Cache of the user, None if values can not be cached on the user.
+
+    """
+    cache = getattr(user, REQUEST_CACHE_ATTRIBUTE, None)
+    if isinstance(cache, dict):
+        return cache
+
+    cache = {}
+    try:
+        setattr(user, REQUEST_CACHE_ATTRIBUTE, cache)
+    except AttributeError:
+        return None
+    return cache
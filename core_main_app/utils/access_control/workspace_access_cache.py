@@ -0,0 +1,168 @@
+""" Cache of the workspaces accessible by each user, shared between processes through the Django cache framework.
+
+All entries are invalidated at once when a permission, a group membership or a workspace changes: a generation number
+is part of the cache keys, and incremented on each change.
+
+The cache backend must be shared by all the processes (e.g. memcached, redis): the generation of a process-local backend
+(e.g. locmem) is only incremented in the process making the change, and the other processes would keep granting revoked
+accesses until the entries expire. Process-local backends are refused: the cache is disabled.
+"""
+import time
+from logging import getLogger
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from core_main_app.settings import WORKSPACE_ACCESS_CACHE, WORKSPACE_ACCESS_CACHE_TIMEOUT
+from core_main_app.utils.access_control import request_cache
+
+CACHE_KEY_PREFIX = 'core_main_app:workspace_access'
+GENERATION_KEY = CACHE_KEY_PREFIX + ':generation'
+# backends not shared between processes
+PROCESS_LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+logger = getLogger(__name__)
+# aliases of the refused caches, warned about once
+_refused_caches = set()
+
+
+def get_or_set(user, key, get_value):
+    """ Return the value cached for the user, compute and cache it if missing.
+
+    Values are also cached for the duration of the request.
+
+    Args:
+        user:
+        key: Key of the value.
+        get_value: Function computing the value.
+
+    Returns:
+
+    """
+    return request_cache.get_or_set(user, key, lambda: _get_or_set_shared(user, key, get_value))
+
+
+def invalidate():
+    """ Invalidate the values cached for all users.
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return
+
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # generation not set or evicted
+        cache.set(GENERATION_KEY, _get_generation(cache) + 1, None)
+
+
+def _get_or_set_shared(user, key, get_value):
+    """ Return the value cached for the user in the shared cache, compute and cache it if missing.
+
+    Args:
+        user:
+        key:
+        get_value:
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return get_value()
+
+    cache_key = ':'.join([CACHE_KEY_PREFIX, str(_get_generation(cache)), _get_user_key(user), key])
+    value = cache.get(cache_key)
+    if value is None:
+        value = get_value()
+        cache.set(cache_key, value, WORKSPACE_ACCESS_CACHE_TIMEOUT)
+    return value
+
+
+def _get_cache():
+    """ Return the cache storing the values, None if disabled or not shared between processes.
+
+    Returns:
+
+    """
+    if WORKSPACE_ACCESS_CACHE is None:
+        return None
+    cache = caches[WORKSPACE_ACCESS_CACHE]
+    if isinstance(cache, PROCESS_LOCAL_CACHE_BACKENDS):
+        if WORKSPACE_ACCESS_CACHE not in _refused_caches:
+            _refused_caches.add(WORKSPACE_ACCESS_CACHE)
+            logger.warning("Workspace access cache disabled: cache {0} is not shared between processes."
+                           .format(WORKSPACE_ACCESS_CACHE))
+        return None
+    return cache
+
+
+def _get_generation(cache):
+    """ Return the current generation of the cache entries.
+
+    Args:
+        cache:
+
+    Returns:
+
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # start from the current time, to not reuse entries left by an evicted generation
+        generation = int(time.time() * 1000)
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def _get_user_key(user):
+    """ Return the key of the user in the cache, including the superuser status: granted or revoked without signal.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    if user.is_anonymous:
+        return 'anonymous'
+    return str(user.id) + (':superuser' if user.is_superuser else '')
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def _invalidate_on_permissions_changed(sender, action, **kwargs):
+    """ Invalidate the cache when the permissions or the groups of users change.
+
+    Args:
+        sender:
+        action:
+        **kwargs:
+
+    Returns:
+
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate()
+
+
+@receiver(post_delete, sender=Group)
+def _invalidate_on_group_deleted(sender, **kwargs):
+    """ Invalidate the cache when a group is deleted.
+
+    Args:
+        sender:
+        **kwargs:
+
+    Returns:
+
+    """
+    invalidate()
@@ -0,0 +1,209 @@
+""" Index management tools
+"""
+from pymongo.errors import OperationFailure
+
+TEXT_INDEX_KEY = [(u'_fts', u'text'), (u'_ftsx', 1)]
+DICT_CONTENT_FIELD = 'dict_content'
+# weights of the text index on all the strings of the documents
+WILDCARD_TEXT_INDEX_WEIGHTS = {'$**': 1}
+# code of the database error raised when dropping a missing index
+INDEX_NOT_FOUND_ERROR_CODE = 27
+
+
+def create_indexes(document_class):
+    """ Create the indexes declared by a document class.
+
+    Args:
+        document_class:
+
+    Returns:
+
+    """
+    document_class.ensure_indexes()
+
+
+def get_index_drift(document_class, managed_index_keys=None):
+    """ Compare the indexes declared by a document class with the indexes of its collection.
+
+    Args:
+        document_class:
+        managed_index_keys: Keys of indexes not declared by the document class but expected in the collection.
+
+    Returns:
+        Dict with the missing and the extra index keys.
+
+    """
+    managed_index_keys = [_normalize_index_key(key) for key in managed_index_keys or []]
+    drift = document_class.compare_indexes()
+    return {
+        'missing': drift['missing'] + [key for key in managed_index_keys
+                                       if key not in _get_existing_index_keys(document_class)],
+        'extra': [key for key in drift['extra'] if _normalize_index_key(key) not in managed_index_keys],
+    }
+
+
+def get_dict_content_index_key(path):
+    """ Return the key of the index on a path of the dict content.
+
+    Args:
+        path: Path in the dict content (e.g. root.element.#text).
+
+    Returns:
+
+    """
+    return [(DICT_CONTENT_FIELD + '.' + path, 1)]
+
+
+def create_dict_content_indexes(document_class, paths):
+    """ Create indexes on paths of the dict content of a document class.
+
+    Args:
+        document_class:
+        paths: List of paths in the dict content.
+
+    Returns:
+        List of created index names.
+
+    """
+    collection = document_class._get_collection()
+    return [collection.create_index(get_dict_content_index_key(path), background=True) for path in paths]
+
+
+def get_dict_content_indexes(document_class):
+    """ Return the indexes on paths of the dict content of a document class, with their usage statistics.
+
+    Args:
+        document_class:
+
+    Returns:
+        List of dicts with the name, the path and the number of uses since the start of the statistics of each index
+        (None when statistics are not available).
+
+    """
+    collection = document_class._get_collection()
+    index_stats = _get_index_stats(collection)
+
+    dict_content_indexes = []
+    for name, index_information in collection.index_information().items():
+        key = _normalize_index_key(index_information['key'])
+        if len(key) != 1 or not key[0][0].startswith(DICT_CONTENT_FIELD + '.'):
+            continue
+        accesses = index_stats.get(name, {})
+        dict_content_indexes.append({
+            'name': name,
+            'path': key[0][0][len(DICT_CONTENT_FIELD) + 1:],
+            'ops': accesses.get('ops', None),
+            'since': accesses.get('since', None),
+        })
+    return sorted(dict_content_indexes, key=lambda index: index['path'])
+
+
+def drop_dict_content_index(document_class, path):
+    """ Drop the index on a path of the dict content of a document class.
+
+    Args:
+        document_class:
+        path:
+
+    Returns:
+
+    """
+    document_class._get_collection().drop_index(get_dict_content_index_key(path))
+
+
+def get_text_index_weights(template_weights):
+    """ Return the weights of the text index, from the weights of the paths of the dict content of each template.
+
+    A collection only has one text index: the paths of all templates are indexed, with their highest weight.
+
+    Args:
+        template_weights: Dict of weights by path in the dict content (e.g. root.title.#text), by template name.
+
+    Returns:
+        Weights by field, WILDCARD_TEXT_INDEX_WEIGHTS if no path is set.
+
+    """
+    weights = {}
+    for path_weights in template_weights.values():
+        for path, weight in path_weights.items():
+            field = DICT_CONTENT_FIELD + '.' + path
+            weights[field] = max(weight, weights.get(field, weight))
+    return weights if len(weights) > 0 else dict(WILDCARD_TEXT_INDEX_WEIGHTS)
+
+
+def create_text_index(document_class, weights):
+    """ Create the text index of a document class, replacing its text index if it has other weights.
+
+    Args:
+        document_class:
+        weights: Weights by field.
+
+    Returns:
+        Name of the text index.
+
+    """
+    collection = document_class._get_collection()
+    for name, index_information in collection.index_information().items():
+        if not _is_text_index(index_information):
+            continue
+        if dict(index_information.get('weights', {})) == weights:
+            return name
+        # a collection only has one text index
+        collection.drop_index(name)
+
+    return collection.create_index([(field, 'text') for field in sorted(weights)], weights=weights,
+                                   default_language="en", language_override="en", background=True)
+
+
+def _is_text_index(index_information):
+    """ Return True if an index is a text index.
+
+    Args:
+        index_information:
+
+    Returns:
+
+    """
+    return any(direction == 'text' for _, direction in _normalize_index_key(index_information['key']))
+
+
+def _get_index_stats(collection):
+    """ Return the usage statistics of the indexes of a collection, by index name.
+
+    Args:
+        collection:
+
+    Returns:
+
+    """
+    try:
+        return {index_stats['name']: index_stats['accesses']
+                for index_stats in collection.aggregate([{'$indexStats': {}}])}
+    except (OperationFailure, NotImplementedError):
+        # statistics not supported by the database
+        return {}
+
+
+def _get_existing_index_keys(document_class):
+    """ Return the keys of the indexes of the collection of a document class.
+
+    Args:
+        document_class:
+
+    Returns:
+
+    """
+    return [_normalize_index_key(index_information['key'])
+            for index_information in document_class._get_collection().index_information().values()]
+
+
+def _normalize_index_key(key):
+    """ Return an index key as a list of (field, direction) tuples.
+
+    Args:
+        key:
+
+    Returns:
+
+    """
+    return [tuple(field) for field in key]
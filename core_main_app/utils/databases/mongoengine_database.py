@@ -3,6 +3,8 @@
 from mongoengine import connect
 from mongoengine.connection import disconnect
 
+from core_main_app.utils.databases import indexes
+
 
 class Database(object):
     """ Represent a Database.
@@ -49,8 +51,15 @@ class Database(object):
                     self.database[self.database_name].get_collection(collection).delete_many({})
 
 
-def init_text_index(document_object):
+def init_text_index(document_object, template_weights=None):
     """ Create index for full text search.
+
+    Args:
+        document_object:
+        template_weights: Dict of weights by path in the dict content, by template name. All the strings are indexed
+            if not set.
+
+    Returns:
+
     """
-    collection = document_object._get_collection()
-    collection.create_index([('$**', "text")], default_language="en", language_override="en")
+    indexes.create_text_index(document_object, indexes.get_text_index_weights(template_weights or {}))
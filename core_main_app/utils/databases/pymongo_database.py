@@ -85,10 +85,22 @@ def get_full_text_query(text):
 
     """
     full_text_query = {}
-    word_list = re.sub("[^\w]", " ", text, flags=re.UNICODE).split()
-    word_list = ['"'+x+'"' for x in word_list]
-    word_list = ' '.join(word_list)
-    if len(word_list) > 0:
-        full_text_query = {'$text': {'$search': word_list}}
+    full_text_search = get_full_text_search(text)
+    if len(full_text_search) > 0:
+        full_text_query = {'$text': {'$search': full_text_search}}
 
     return full_text_query
+
+
+def get_full_text_search(text):
+    """ Return a full text search, matching all the keywords.
+
+    Args:
+        text: List of keywords
+
+    Returns: The corresponding search (see $text), empty if no keyword
+
+    """
+    word_list = re.sub("[^\w]", " ", text, flags=re.UNICODE).split()
+    word_list = ['"'+x+'"' for x in word_list]
+    return ' '.join(word_list)
@@ -0,0 +1,87 @@
+""" Events published by the writes of Data and Templates.
+
+Events are dispatched in the process of the write, to the receivers of their signal (e.g.
+@receiver(events.data_deleted)), with the written instance and the user who wrote it. If EVENT_OUTBOX_ENABLED, events
+are also stored in the event outbox collection, read by the consumers of other processes.
+"""
+import datetime
+from logging import getLogger
+
+import pytz
+from django.dispatch import Signal
+
+from core_main_app.components.event import api as event_api
+from core_main_app.components.event.models import Event
+from core_main_app.settings import EVENT_OUTBOX_ENABLED
+
+logger = getLogger(__name__)
+
+DATA_CREATED = 'data_created'
+DATA_UPDATED = 'data_updated'
+DATA_DELETED = 'data_deleted'
+DATA_ASSIGNED = 'data_assigned'
+TEMPLATE_ADDED = 'template_added'
+TEMPLATE_UPDATED = 'template_updated'
+TEMPLATE_DELETED = 'template_deleted'
+
+data_created = Signal(providing_args=['instance', 'user'])
+data_updated = Signal(providing_args=['instance', 'user'])
+data_deleted = Signal(providing_args=['instance', 'user'])
+data_assigned = Signal(providing_args=['instance', 'user'])
+template_added = Signal(providing_args=['instance', 'user'])
+template_updated = Signal(providing_args=['instance', 'user'])
+template_deleted = Signal(providing_args=['instance', 'user'])
+
+SIGNALS = {
+    DATA_CREATED: data_created,
+    DATA_UPDATED: data_updated,
+    DATA_DELETED: data_deleted,
+    DATA_ASSIGNED: data_assigned,
+    TEMPLATE_ADDED: template_added,
+    TEMPLATE_UPDATED: template_updated,
+    TEMPLATE_DELETED: template_deleted,
+}
+
+
+def publish(event_type, instance, user=None):
+    """ Publish an event: dispatch it to the receivers of its signal, and store it in the outbox if enabled.
+
+    The write is done when the event is published: errors of receivers and of the outbox are logged, not raised.
+
+    Args:
+        event_type:
+        instance: Written instance.
+        user: User who wrote the instance, None if unknown.
+
+    Returns:
+
+    """
+    for receiver, response in SIGNALS[event_type].send_robust(sender=instance.__class__, instance=instance,
+                                                              user=user):
+        if isinstance(response, Exception):
+            logger.error("Receiver {0} of {1} failed: {2}".format(receiver, event_type, response))
+
+    if EVENT_OUTBOX_ENABLED:
+        try:
+            event_api.insert(Event(event_type=event_type,
+                                   object_id=instance.id,
+                                   template=_get_reference_id(instance, 'template'),
+                                   workspace=_get_reference_id(instance, 'workspace'),
+                                   user_id=str(user.id) if user is not None else None,
+                                   date=datetime.datetime.now(pytz.utc)))
+        except Exception as e:
+            logger.error("Unable to store {0} in the outbox: {1}".format(event_type, e.message))
+
+
+def _get_reference_id(instance, field):
+    """ Get the id referenced by a field of an instance, without loading the referenced document.
+
+    Args:
+        instance:
+        field:
+
+    Returns:
+
+    """
+    reference = instance._data.get(field, None)
+    return getattr(reference, 'id', reference)
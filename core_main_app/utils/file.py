@@ -4,7 +4,7 @@ from io import BytesIO
 from mimetypes import guess_type
 
 from core_main_app.commons.exceptions import CoreError
-from django.http.response import HttpResponse
+from django.http.response import HttpResponse, StreamingHttpResponse
 
 
 def get_file_http_response(file_content, file_name, content_type=None, extension=''):
@@ -30,19 +30,75 @@ def get_file_http_response(file_content, file_name, content_type=None, extension
             content_type = guess_type(file_name)
         # set file in http response
         response = HttpResponse(_file, content_type=content_type)
-        # set filename extension
-        if not file_name.endswith(extension):
-            if not extension.startswith("."):
-                extension = "." + extension
-            file_name += extension
         # set content disposition in response
-        response['Content-Disposition'] = 'attachment; filename=' + file_name
+        _set_attachment(response, file_name, extension)
         # return response
         return response
     except Exception:
         raise CoreError('An unexpected error occurred.')
 
 
+def get_file_streaming_http_response(file_chunks, file_name, content_type=None, extension=''):
+    """Return streaming http response with file to download, sent chunk by chunk.
+
+    Args:
+        file_chunks: Iterable of file content chunks.
+        file_name:
+        content_type:
+        extension:
+
+    Returns:
+
+    """
+    try:
+        # guess file content type if not set
+        if content_type is None:
+            content_type = guess_type(file_name)
+        # set file chunks in streaming http response
+        response = StreamingHttpResponse(_encode_chunks(file_chunks), content_type=content_type)
+        # set content disposition in response
+        _set_attachment(response, file_name, extension)
+        # return response
+        return response
+    except Exception:
+        raise CoreError('An unexpected error occurred.')
+
+
+def _encode_chunks(file_chunks):
+    """Encode unicode chunks of a file in utf-8.
+
+    Args:
+        file_chunks:
+
+    Returns:
+
+    """
+    for chunk in file_chunks:
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode('utf-8')
+        yield chunk
+
+
+def _set_attachment(response, file_name, extension):
+    """Set the content disposition of a file to download in a http response.
+
+    Args:
+        response:
+        file_name:
+        extension:
+
+    Returns:
+
+    """
+    # set filename extension
+    if not file_name.endswith(extension):
+        if not extension.startswith("."):
+            extension = "." + extension
+        file_name += extension
+    # set content disposition in response
+    response['Content-Disposition'] = 'attachment; filename=' + file_name
+
+
 def read_file_content(file_path):
     """Read the content of a file.
 
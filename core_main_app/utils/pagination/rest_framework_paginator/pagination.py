@@ -1,9 +1,202 @@
 """Pagination configuration for rest_framework
 """
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from mongoengine.queryset.field_list import QueryFieldList
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 
-from rest_framework.pagination import PageNumberPagination
 from core_main_app.settings import RESULTS_PER_PAGE
+from core_main_app.utils.boolean import to_bool
+from core_main_app.utils.raw_query.mongo_raw_query import get_position_query
+
+EPOCH = datetime(1970, 1, 1)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = RESULTS_PER_PAGE
+
+
+class KeysetResultsSetPagination(BasePagination):
+    """ Paginate a queryset of documents by position in a stable ordering, instead of page number.
+
+    Each page is fetched with a range query on the ordering fields, starting after the last document of the previous
+    page (given by an opaque cursor): the cost of a page does not depend on its depth. The total count is only computed
+    when requested.
+    """
+    page_size = RESULTS_PER_PAGE
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    count_query_param = 'count'
+
+    # ordering name: ordering fields, ending with the unique id
+    orderings = OrderedDict([
+        ('id', ('id',)),
+        ('last_modification_date', ('last_modification_date', 'id')),
+    ])
+    default_ordering = 'id'
+
+    def __init__(self):
+        self.base_url = None
+        self.ordering = None
+        self.count = None
+        self.next_position = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """ Return the page of documents following the cursor of the request.
+
+        Args:
+            queryset:
+            request:
+            view:
+
+        Returns:
+
+        """
+        self.base_url = request.build_absolute_uri()
+        cursor = request.query_params.get(self.cursor_query_param, None)
+        if cursor:
+            self.ordering, position = self.decode_cursor(cursor)
+        else:
+            self.ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+            position = None
+            if self.ordering not in self.orderings:
+                raise ValidationError('Unknown ordering: {0}. Expected one of: {1}.'.format(
+                    self.ordering, ', '.join(self.orderings)))
+
+        try:
+            with_count = to_bool(request.query_params.get(self.count_query_param, 'false'))
+        except ValueError as e:
+            raise ValidationError(e.message)
+        self.count = queryset.count() if with_count else None
+
+        ordering_fields = self.orderings[self.ordering]
+        # load the ordering fields, to build the next cursor
+        if queryset._loaded_fields.value == QueryFieldList.ONLY:
+            queryset = queryset.only(*ordering_fields)
+        if position is not None:
+            queryset = queryset.filter(__raw__=self.get_position_query(ordering_fields, position))
+
+        # fetch one more document, to know if there is a next page
+        page = list(queryset.order_by(*ordering_fields)[:self.page_size + 1])
+        if len(page) > self.page_size:
+            page = page[:self.page_size]
+            self.next_position = [getattr(page[-1], field) for field in ordering_fields]
+        else:
+            self.next_position = None
+        return page
+
+    def get_paginated_response(self, data):
+        """ Return the response containing a page of results.
+
+        Args:
+            data:
+
+        Returns:
+
+        """
+        content = OrderedDict()
+        if self.count is not None:
+            content['count'] = self.count
+        content['next'] = self.get_next_link()
+        content['results'] = data
+        return Response(content)
+
+    def get_next_link(self):
+        """ Return the link to the next page, None if on the last page.
+
+        Returns:
+
+        """
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.base_url, self.ordering_query_param)
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.ordering, self.next_position))
+
+    @staticmethod
+    def get_position_query(ordering_fields, position):
+        """ Return the raw query selecting the documents after a position, in the ordering.
+
+        Args:
+            ordering_fields:
+            position: Values of the ordering fields at the position.
+
+        Returns:
+
+        """
+        db_fields = ['_id' if field == 'id' else field for field in ordering_fields]
+        return get_position_query(db_fields, position)
+
+    def encode_cursor(self, ordering, position):
+        """ Encode an ordering and a position into an opaque cursor.
+
+        Args:
+            ordering:
+            position:
+
+        Returns:
+
+        """
+        values = [self._encode_value(value) for value in position]
+        return urlsafe_b64encode(json.dumps([ordering, values]))
+
+    def decode_cursor(self, cursor):
+        """ Decode an opaque cursor into an ordering and a position.
+
+        Args:
+            cursor:
+
+        Returns:
+
+        """
+        try:
+            ordering, values = json.loads(urlsafe_b64decode(str(cursor)))
+            ordering_fields = self.orderings[ordering]
+            if len(values) != len(ordering_fields):
+                raise ValueError()
+            position = [self._decode_value(field, value) for field, value in zip(ordering_fields, values)]
+        except Exception:
+            raise ValidationError('Invalid cursor.')
+        return ordering, position
+
+    @staticmethod
+    def _encode_value(value):
+        """ Encode the value of an ordering field.
+
+        Args:
+            value:
+
+        Returns:
+
+        """
+        if isinstance(value, datetime):
+            # milliseconds since epoch, precision of the dates stored in database
+            delta = value - EPOCH
+            return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+        if isinstance(value, ObjectId):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _decode_value(field, value):
+        """ Decode the value of an ordering field.
+
+        Args:
+            field:
+            value:
+
+        Returns:
+
+        """
+        if value is None:
+            return None
+        if field == 'id':
+            return ObjectId(value)
+        return EPOCH + timedelta(milliseconds=value)
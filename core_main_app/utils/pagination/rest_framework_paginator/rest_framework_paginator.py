@@ -2,7 +2,11 @@
 """
 from urlparse import urlparse
 from core_main_app.commons.exceptions import PaginationError
-from core_main_app.utils.pagination.rest_framework_paginator.pagination import StandardResultsSetPagination
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import StandardResultsSetPagination, \
+    KeysetResultsSetPagination
+
+PAGINATION_QUERY_PARAM = 'pagination'
+CURSOR_PAGINATION = 'cursor'
 
 
 def get_page_number(url):
@@ -39,3 +43,18 @@ def get_paginator():
     """
     # return paginator
     return StandardResultsSetPagination()
+
+
+def get_request_paginator(request):
+    """Create the paginator selected by the request: keyset pagination if requested with pagination=cursor, page
+    number pagination otherwise.
+
+    Args:
+        request:
+
+    Returns:
+
+    """
+    if request.query_params.get(PAGINATION_QUERY_PARAM, None) == CURSOR_PAGINATION:
+        return KeysetResultsSetPagination()
+    return get_paginator()
@@ -5,3 +5,6 @@ VISIBILITY_OPTION = 'visibility'
 VISIBILITY_USER = 'user'
 VISIBILITY_ALL = 'all'
 VISIBILITY_PUBLIC = 'public'
+
+COUNT_ONLY_OPTION = 'count_only'
+IDS_ONLY_OPTION = 'ids_only'
@@ -0,0 +1,52 @@
+"""Mongo query explain tools
+"""
+
+
+def get_execution_summary(explain_output):
+    """Summarizes the output of the explain command of a query
+
+    Args:
+        explain_output: Output of the explain command, with execution statistics.
+
+    Returns:
+        Dict with the indexes used by the winning plan, if the collection is scanned, and the numbers of keys and
+        documents examined and returned.
+
+    """
+    index_names = []
+    stages = []
+    _add_plan_stages(explain_output.get('queryPlanner', {}).get('winningPlan', {}), index_names, stages)
+    execution_stats = explain_output.get('executionStats', {})
+    return {
+        'indexes': sorted(set(index_names)),
+        'collection_scan': 'COLLSCAN' in stages,
+        'keys_examined': execution_stats.get('totalKeysExamined', None),
+        'documents_examined': execution_stats.get('totalDocsExamined', None),
+        'documents_returned': execution_stats.get('nReturned', None),
+        'execution_time_ms': execution_stats.get('executionTimeMillis', None),
+    }
+
+
+def _add_plan_stages(plan, index_names, stages):
+    """Adds the indexes and the stages of a plan, and of its input stages
+
+    Args:
+        plan:
+        index_names:
+        stages:
+
+    Returns:
+
+    """
+    if isinstance(plan, list):
+        for sub_plan in plan:
+            _add_plan_stages(sub_plan, index_names, stages)
+    elif isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        if 'indexName' in plan:
+            index_names.append(plan['indexName'])
+        # input stages, and plans of the shards
+        for key in ('inputStage', 'inputStages', 'shards', 'winningPlan'):
+            if key in plan:
+                _add_plan_stages(plan[key], index_names, stages)
@@ -0,0 +1,208 @@
+"""Mongo query optimizer: completes regular expression criteria to be served from indexes
+"""
+import re
+import sys
+
+# logical operators containing a list of criteria
+LOGICAL_OPERATORS = ("$and", "$or", "$nor")
+# characters with a special meaning in regular expressions
+REGEX_SPECIAL_CHARACTERS = ".^$*+?{}[]\\|()"
+# quantifiers making the previous character optional
+OPTIONAL_QUANTIFIERS = "*?{"
+# patterns matching any end of string, after the prefix
+ANY_END_PATTERNS = ("", ".*", ".*?")
+# regex flags preventing a prefix search
+UNSUPPORTED_FLAGS = re.IGNORECASE | re.MULTILINE | re.VERBOSE
+UNSUPPORTED_OPTIONS = "imx"
+
+# criteria completed with a range
+REPORT_RANGE = "range"
+# criteria searched from an index by prefix
+REPORT_PREFIX = "prefix"
+# criteria needing to scan all values
+REPORT_SCAN = "scan"
+
+
+def optimize_query(query, report=None):
+    """Returns a copy of the query, with regular expression criteria rewritten to be served from indexes.
+
+    Anchored regular expressions matching a literal prefix (e.g. /^NIST-/, /^NIST-.*/) are completed with the range
+    of the strings starting with the prefix ({"$regex": /^NIST-/, "$gte": "NIST-", "$lt": "NIST."}). The regular
+    expression is kept: on arrays, each bound could be satisfied by a different element. Other regular expressions
+    are kept unchanged.
+
+    Args:
+        query:
+        report: List completed with an entry per regular expression criteria (path, pattern, status and prefix), if
+            set. Status is 'range' (range added), 'prefix' (searched from an index by prefix) or 'scan' (all values of
+            the field are scanned: unanchored or case insensitive regular expressions).
+
+    Returns:
+
+    """
+    optimized_query = {}
+    for key, value in query.iteritems():
+        if key in LOGICAL_OPERATORS and isinstance(value, list):
+            optimized_query[key] = [optimize_query(criteria, report) for criteria in value]
+        elif key.startswith("$"):
+            optimized_query[key] = value
+        else:
+            optimized_query[key] = _optimize_field_criteria(key, value, report)
+    return optimized_query
+
+
+def explain_query(query):
+    """Returns the report of the regular expression criteria of a query (see optimize_query).
+
+    Args:
+        query:
+
+    Returns:
+
+    """
+    report = []
+    optimize_query(query, report)
+    return report
+
+
+def get_regex_prefix(pattern):
+    """Returns the literal prefix of an anchored regular expression.
+
+    Args:
+        pattern:
+
+    Returns:
+        Tuple (prefix, is_prefix_only): prefix None if the regular expression is not anchored, is_prefix_only True if
+        the regular expression matches any string starting with the prefix.
+
+    """
+    if pattern.startswith("^"):
+        index = 1
+    elif pattern.startswith("\\A"):
+        index = 2
+    else:
+        return None, False
+    if _has_top_level_alternation(pattern):
+        return None, False
+
+    prefix = []
+    while index < len(pattern):
+        character = pattern[index]
+        if character == "\\":
+            escaped_character = pattern[index + 1:index + 2]
+            # character classes, back references and anchors are not literal
+            if escaped_character == "" or escaped_character.isalnum():
+                break
+            literal, length = escaped_character, 2
+        elif character in REGEX_SPECIAL_CHARACTERS:
+            break
+        else:
+            literal, length = character, 1
+
+        next_character = pattern[index + length:index + length + 1]
+        if next_character != "" and next_character in OPTIONAL_QUANTIFIERS:
+            # optional character is not part of the prefix
+            break
+        prefix.append(literal)
+        index += length
+        if next_character == "+":
+            break
+
+    return "".join(prefix), pattern[index:] in ANY_END_PATTERNS
+
+
+def get_prefix_upper_bound(prefix):
+    """Returns the smallest string greater than all the strings starting with the prefix.
+
+    Args:
+        prefix:
+
+    Returns:
+        Upper bound, None if no bound.
+
+    """
+    characters = list(unicode(prefix))
+    while len(characters) > 0:
+        code_point = ord(characters[-1]) + 1
+        # surrogates are not valid characters
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+        if code_point <= sys.maxunicode:
+            characters[-1] = unichr(code_point)
+            return u"".join(characters)
+        characters.pop()
+    return None
+
+
+def _optimize_field_criteria(path, value, report):
+    """Returns the optimized criteria on a field.
+
+    Args:
+        path:
+        value:
+        report:
+
+    Returns:
+
+    """
+    if isinstance(value, re._pattern_type):
+        pattern, supported = value.pattern, not value.flags & UNSUPPORTED_FLAGS
+        regex_criteria = {"$regex": value}
+    elif isinstance(value, dict) and "$regex" in value and set(value.keys()) <= {"$regex", "$options"}:
+        regex = value["$regex"]
+        if isinstance(regex, re._pattern_type):
+            pattern, supported = regex.pattern, not regex.flags & UNSUPPORTED_FLAGS
+        else:
+            pattern, supported = regex, True
+        supported = supported and not set(value.get("$options", "")) & set(UNSUPPORTED_OPTIONS)
+        regex_criteria = value
+    else:
+        return value
+
+    prefix, is_prefix_only = get_regex_prefix(pattern) if supported else (None, False)
+    if prefix is not None and is_prefix_only:
+        status = REPORT_RANGE
+        # keep the regular expression: each bound alone could be satisfied by a different element of an array
+        optimized_value = dict(regex_criteria)
+        optimized_value["$gte"] = prefix
+        upper_bound = get_prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            optimized_value["$lt"] = upper_bound
+    else:
+        status = REPORT_PREFIX if prefix else REPORT_SCAN
+        optimized_value = value
+
+    if report is not None:
+        report.append({"path": path, "pattern": pattern, "status": status, "prefix": prefix})
+    return optimized_value
+
+
+def _has_top_level_alternation(pattern):
+    """Returns True if the regular expression has an alternation outside of groups (e.g. ^a|b).
+
+    Args:
+        pattern:
+
+    Returns:
+
+    """
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        character = pattern[index]
+        if character == "\\":
+            index += 2
+            continue
+        if in_class:
+            in_class = character != "]"
+        elif character == "[":
+            in_class = True
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "|" and depth == 0:
+            return True
+        index += 1
+    return False
@@ -0,0 +1,161 @@
+"""Mongo aggregation pipeline tools
+"""
+# stages writing to, or reading from, other collections
+OTHER_COLLECTION_STAGES = ("$out", "$merge", "$lookup", "$graphLookup", "$unionWith")
+# stages that must be last
+OUTPUT_STAGES = ("$out", "$merge")
+# stages containing sub pipelines
+SUB_PIPELINE_STAGES = ("$facet",)
+# operators of a $match that can not be evaluated before other stages
+NOT_MOVABLE_MATCH_OPERATORS = ("$expr", "$where", "$text")
+
+
+def optimize_pipeline(pipeline):
+    """Returns an optimized copy of an aggregation pipeline: filters are applied as early as possible.
+
+    - $match stages following a $sort, or a $project only including or excluding fields the $match does not use, are
+      moved before them,
+    - consecutive $match stages are merged.
+
+    Args:
+        pipeline:
+
+    Returns:
+
+    """
+    optimized_pipeline = []
+    for stage in pipeline:
+        if _get_stage_name(stage) == "$match":
+            match = stage["$match"]
+            # move the $match before the stages it can be applied before
+            index = len(optimized_pipeline)
+            while index > 0 and _can_match_before(match, optimized_pipeline[index - 1]):
+                index -= 1
+            # merge the $match with a previous $match
+            if index > 0 and _get_stage_name(optimized_pipeline[index - 1]) == "$match":
+                previous_match = optimized_pipeline[index - 1]["$match"]
+                optimized_pipeline[index - 1] = {"$match": {"$and": [previous_match, match]}}
+            else:
+                optimized_pipeline.insert(index, {"$match": match})
+        else:
+            optimized_pipeline.append(stage)
+    return optimized_pipeline
+
+
+def limit_pipeline_results(pipeline, max_results):
+    """Returns a copy of an aggregation pipeline returning at most a number of results.
+
+    Args:
+        pipeline:
+        max_results: Maximum number of results, no limit if None.
+
+    Returns:
+
+    """
+    if max_results is None or (len(pipeline) > 0 and _get_stage_name(pipeline[-1]) in OUTPUT_STAGES):
+        return list(pipeline)
+    return list(pipeline) + [{"$limit": max_results}]
+
+
+def get_pipeline_stage_names(pipeline):
+    """Returns the names of the stages of an aggregation pipeline, and of its sub pipelines.
+
+    Args:
+        pipeline:
+
+    Returns:
+
+    """
+    stage_names = set()
+    for stage in pipeline:
+        stage_name = _get_stage_name(stage)
+        stage_names.add(stage_name)
+        if stage_name in SUB_PIPELINE_STAGES:
+            for sub_pipeline in stage[stage_name].values():
+                stage_names.update(get_pipeline_stage_names(sub_pipeline))
+    return stage_names
+
+
+def _get_stage_name(stage):
+    """Returns the name of a stage.
+
+    Args:
+        stage:
+
+    Returns:
+
+    """
+    return stage.keys()[0] if len(stage) == 1 else None
+
+
+def _can_match_before(match, stage):
+    """Returns True if a $match following a stage selects the same documents when applied before it.
+
+    Args:
+        match:
+        stage:
+
+    Returns:
+
+    """
+    if set(match.keys()) & set(NOT_MOVABLE_MATCH_OPERATORS):
+        return False
+
+    stage_name = _get_stage_name(stage)
+    if stage_name == "$sort":
+        return True
+    if stage_name == "$project":
+        projection = stage["$project"]
+        # only projections including or excluding fields keep the values of the fields
+        if not all(value in (0, 1, True, False) for value in projection.values()):
+            return False
+        match_fields = _get_match_fields(match)
+        if match_fields is None:
+            return False
+        projected_fields = set(field for field, value in projection.items() if value and field != "_id")
+        excluded_fields = set(field for field, value in projection.items() if not value)
+        if "_id" in match_fields and projection.get("_id", True) in (0, False):
+            return False
+        if len(projected_fields) > 0:
+            return all(field == "_id" or _is_in_fields(field, projected_fields) for field in match_fields)
+        return not any(_is_in_fields(field, excluded_fields) or _is_in_fields(excluded_field, {field})
+                       for field in match_fields for excluded_field in excluded_fields)
+    return False
+
+
+def _get_match_fields(match):
+    """Returns the fields used by a $match.
+
+    Args:
+        match:
+
+    Returns:
+        Set of fields, None if unknown.
+
+    """
+    fields = set()
+    for key, value in match.items():
+        if key in ("$and", "$or", "$nor"):
+            for criteria in value:
+                criteria_fields = _get_match_fields(criteria)
+                if criteria_fields is None:
+                    return None
+                fields.update(criteria_fields)
+        elif key.startswith("$"):
+            return None
+        else:
+            fields.add(key)
+    return fields
+
+
+def _is_in_fields(field, fields):
+    """Returns True if a field is one of the fields, or a sub field of one of them.
+
+    Args:
+        field:
+        fields:
+
+    Returns:
+
+    """
+    return any(field == other_field or field.startswith(other_field + ".") for other_field in fields)
@@ -1,41 +1,105 @@
 """Mongo query builder tools
 """
+import json
 import re
-import copy
+import threading
+from collections import OrderedDict
 
+from core_main_app.settings import QUERY_PREPARE_CACHE_MAX_ENTRIES
+from core_main_app.utils.query.mongo.optimizer import optimize_query
 
-def _compile_regex(query):
-    """Compile all regular expressions in the query
+# logical operators containing a list of criteria
+LOGICAL_OPERATORS = ("$and", "$or")
 
-    Args:
-        query:
 
-    Returns:
+class ImmutableDict(dict):
+    """Dict of a prepared query, shared between requests: can not be modified.
 
+    A deep copy returns a regular dict, that can be modified.
     """
-    for key, value in query.iteritems():
-        if key == "$and" or key == "$or":
-            for sub_value in value:
-                _compile_regex(sub_value)
-        elif isinstance(value, unicode) or isinstance(value, str):
-            if len(value) >= 2 and value[0] == "/" and value[-1] == "/":
-                query[key] = re.compile(value[1:-1])
-        elif isinstance(value, dict):
-            _compile_regex(value)
 
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("A prepared query can not be modified.")
 
-def _add_sub_document_root(query, sub_document_root):
-    """Adds a sub document root to each criteria
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
 
-    Returns:
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return {key: _thaw(value) for key, value in self.iteritems()}
 
+
+class ImmutableList(list):
+    """List of a prepared query, shared between requests: can not be modified.
+
+    A deep copy returns a regular list, that can be modified.
     """
-    for key in query.keys():
-        if key == "$and" or key == "$or":
-            for value in query[key]:
-                _add_sub_document_root(value, sub_document_root)
-        elif not key.startswith("$"):
-            query["{}.{}".format(sub_document_root, key)] = query.pop(key)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("A prepared query can not be modified.")
+
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return [_thaw(value) for value in self]
+
+
+class PreparedQueryCache(object):
+    """LRU cache of prepared queries.
+    """
+
+    def __init__(self, max_entries):
+        """Create the cache.
+
+        Args:
+            max_entries: Maximum number of entries.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, prepare):
+        """Return the prepared query for the key, preparing it if missing.
+
+        Args:
+            key:
+            prepare: Function preparing the query.
+
+        Returns:
+
+        """
+        with self._lock:
+            prepared_query = self._entries.pop(key, None)
+            if prepared_query is not None:
+                # put the entry back as most recently used
+                self._entries[key] = prepared_query
+                return prepared_query
+
+        prepared_query = prepare()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = prepared_query
+                # remove least recently used entries
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return prepared_query
+
+    def clear(self):
+        """Remove all entries.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+prepared_query_cache = PreparedQueryCache(QUERY_PREPARE_CACHE_MAX_ENTRIES)
 
 
 def prepare_query(query_dict, regex=True, sub_document_root=None):
@@ -49,15 +113,117 @@ def prepare_query(query_dict, regex=True, sub_document_root=None):
     Returns:
 
     """
-    # get a copy of the query
-    query = copy.deepcopy(query_dict)
+    # build a prepared copy of the query, in a single pass
+    return _prepare_criteria(query_dict, regex, sub_document_root)
+
+
+def compile_query(query_string, regex=True, sub_document_root=None, optimize=False):
+    """Parses and prepares a JSON query, reusing the prepared query if the same query was already compiled
+
+    Args:
+        query_string:
+        regex:
+        sub_document_root:
+        optimize: Rewrite the criteria of the query to use indexes (see optimizer.optimize_query).
+
+    Returns:
+        Immutable prepared query (deep copy it to modify it)
+
+    """
+    return prepared_query_cache.get((query_string, regex, sub_document_root, optimize),
+                                    lambda: _compile_query(query_string, regex, sub_document_root, optimize))
+
 
-    if regex:
-        # compile the regular expressions
-        _compile_regex(query)
+def _compile_query(query_string, regex, sub_document_root, optimize):
+    """Parses and prepares a JSON query
 
-    if sub_document_root is not None:
-        # add a sub document root
-        _add_sub_document_root(query, sub_document_root)
+    Args:
+        query_string:
+        regex:
+        sub_document_root:
+        optimize:
 
-    return query
+    Returns:
+
+    """
+    query = prepare_query(json.loads(query_string), regex=regex, sub_document_root=sub_document_root)
+    if optimize:
+        query = optimize_query(query)
+    return _freeze(query)
+
+
+def _prepare_criteria(query, regex, sub_document_root):
+    """Returns a prepared copy of criteria: regular expressions compiled and sub document root added to the fields
+
+    Args:
+        query:
+        regex:
+        sub_document_root:
+
+    Returns:
+
+    """
+    prepared_query = {}
+    for key, value in query.iteritems():
+        if key in LOGICAL_OPERATORS:
+            value = [_prepare_criteria(criteria, regex, sub_document_root) for criteria in value]
+        else:
+            value = _prepare_value(value, regex)
+            if sub_document_root is not None and not key.startswith("$"):
+                key = "{}.{}".format(sub_document_root, key)
+        prepared_query[key] = value
+    return prepared_query
+
+
+def _prepare_value(value, regex):
+    """Returns a prepared copy of the value of a criteria: regular expressions compiled
+
+    Args:
+        value:
+        regex:
+
+    Returns:
+
+    """
+    if isinstance(value, dict):
+        return {key: [_prepare_value(criteria, regex) for criteria in item]
+                if key in LOGICAL_OPERATORS and isinstance(item, list) else _prepare_value(item, regex)
+                for key, item in value.iteritems()}
+    if isinstance(value, list):
+        # values of lists are not regular expressions
+        return [_prepare_value(item, False) for item in value]
+    if regex and isinstance(value, basestring) and len(value) >= 2 and value[0] == "/" and value[-1] == "/":
+        return re.compile(value[1:-1])
+    return value
+
+
+def _freeze(value):
+    """Returns an immutable copy of a value of a prepared query
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if isinstance(value, dict):
+        return ImmutableDict((key, _freeze(item)) for key, item in value.iteritems())
+    if isinstance(value, list):
+        return ImmutableList(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Returns a modifiable copy of a value of a prepared query
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if isinstance(value, dict):
+        return {key: _thaw(item) for key, item in value.iteritems()}
+    if isinstance(value, list):
+        return [_thaw(item) for item in value]
+    return value
@@ -3,8 +3,7 @@
 from bson.objectid import ObjectId
 
 from core_main_app.utils.query.constants import VISIBILITY_PUBLIC, VISIBILITY_ALL, VISIBILITY_USER
-from core_main_app.utils.query.mongo.prepare import prepare_query
-import json
+from core_main_app.utils.query.mongo.prepare import compile_query
 from core_main_app.components.workspace import api as workspace_api
 
 
@@ -19,9 +18,10 @@ class QueryBuilder(object):
             query:
             sub_document_root:
         """
-        self.criteria = [prepare_query(json.loads(query),
+        self.criteria = [compile_query(query,
                                        regex=True,
-                                       sub_document_root=sub_document_root)]
+                                       sub_document_root=sub_document_root,
+                                       optimize=True)]
 
     def add_list_templates_criteria(self, list_template_ids):
         """Adds a criteria on template ids
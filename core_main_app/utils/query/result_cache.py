@@ -0,0 +1,223 @@
+""" Cache of the ids of the results of queries, shared between processes through the Django cache framework.
+
+Entries are keyed by the normalized query (including the access criteria of the user) and the ordering. They are
+invalidated by writes to the data of the templates the query is restricted to, or by any data write if the query is not
+restricted to templates: generation numbers of the templates are part of the cache keys, and incremented on each write.
+"""
+import hashlib
+import json
+import time
+
+from bson import json_util
+from bson.objectid import ObjectId
+from django.core.cache import caches
+
+from core_main_app.settings import QUERY_RESULT_CACHE, QUERY_RESULT_CACHE_TIMEOUT, QUERY_RESULT_CACHE_MAX_SIZE
+
+CACHE_KEY_PREFIX = 'core_main_app:query_result'
+GENERATION_KEY_PREFIX = CACHE_KEY_PREFIX + ':generation:'
+# generation incremented by every write
+ALL_GENERATION = 'all'
+# generation changed to invalidate all results
+START_GENERATION = 'start'
+# value cached instead of the ids when the results are too many: the ids are not fetched again
+TOO_MANY_RESULTS = 'too_many_results'
+
+
+def is_enabled():
+    """ Return True if the query result cache is enabled.
+
+    Returns:
+
+    """
+    return QUERY_RESULT_CACHE is not None
+
+
+def get_or_set(query, order_by_field, get_ids):
+    """ Return the ids of the results of the query, compute and cache them if missing.
+
+    Args:
+        query: Raw query.
+        order_by_field: Order by field.
+        get_ids: Function returning the ids of the results, with at most QUERY_RESULT_CACHE_MAX_SIZE + 1 ids.
+
+    Returns:
+        List of ids, None if the results are too many to be cached (remembered until the data of the query are
+        written).
+
+    """
+    cache = _get_cache()
+    cache_key = _get_cache_key(cache, query, order_by_field)
+
+    ids = cache.get(cache_key)
+    if ids is None:
+        ids = list(get_ids())
+        if len(ids) > QUERY_RESULT_CACHE_MAX_SIZE:
+            ids = TOO_MANY_RESULTS
+        cache.set(cache_key, ids, QUERY_RESULT_CACHE_TIMEOUT)
+    return ids if ids != TOO_MANY_RESULTS else None
+
+
+def get_or_set_value(query, name, get_value):
+    """ Return a value computed from the results of the query (e.g. counts), compute and cache it if missing.
+
+    Args:
+        query: Raw query.
+        name: Name of the value, including its parameters.
+        get_value: Function returning the value.
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    cache_key = _get_cache_key(cache, query, name)
+
+    value = cache.get(cache_key)
+    if value is None:
+        value = get_value()
+        cache.set(cache_key, value, QUERY_RESULT_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate(template_ids):
+    """ Invalidate the results of the queries on the data of templates.
+
+    Args:
+        template_ids: Ids of the templates of the written data, None to invalidate all results.
+
+    Returns:
+
+    """
+    if not is_enabled():
+        return
+
+    cache = _get_cache()
+    if template_ids is None:
+        names = [START_GENERATION]
+    else:
+        names = [ALL_GENERATION] + [str(template_id) for template_id in set(template_ids)]
+
+    for name in names:
+        try:
+            cache.incr(GENERATION_KEY_PREFIX + name)
+        except ValueError:
+            # generation not set or evicted
+            cache.set(GENERATION_KEY_PREFIX + name, _get_generations(cache, [name])[name] + 1, None)
+
+
+def get_query_template_ids(query):
+    """ Return the ids of the templates a query is restricted to.
+
+    Args:
+        query:
+
+    Returns:
+        List of template ids, None if the query is not restricted to templates.
+
+    """
+    if not isinstance(query, dict):
+        return None
+
+    template_criteria = query.get('template', None)
+    if isinstance(template_criteria, ObjectId):
+        return [template_criteria]
+    if isinstance(template_criteria, dict) and template_criteria.keys() == ['$in']:
+        return list(template_criteria['$in'])
+
+    # all criteria of a $and apply
+    for criteria in query.get('$and', []):
+        template_ids = get_query_template_ids(criteria)
+        if template_ids is not None:
+            return template_ids
+    return None
+
+
+def get_query_fingerprint(query, order_by_field):
+    """ Return a fingerprint of a query, independent of the order of its keys and of the values of its $in lists.
+
+    Args:
+        query:
+        order_by_field:
+
+    Returns:
+
+    """
+    normalized_query = json.dumps([_normalize(query), order_by_field], sort_keys=True, default=json_util.default)
+    return hashlib.sha1(normalized_query).hexdigest()
+
+
+def _normalize(value):
+    """ Return a normalized copy of a query value.
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if isinstance(value, dict):
+        normalized_value = {}
+        for key, item in value.items():
+            if key in ('$in', '$nin', '$all') and isinstance(item, list):
+                normalized_value[key] = sorted((_normalize(element) for element in item),
+                                               key=lambda element: json.dumps(element, sort_keys=True,
+                                                                              default=json_util.default))
+            else:
+                normalized_value[key] = _normalize(item)
+        return normalized_value
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _get_cache_key(cache, query, name):
+    """ Return the key of a cache entry, including the current generations of the templates of the query.
+
+    Args:
+        cache:
+        query:
+        name:
+
+    Returns:
+
+    """
+    template_ids = get_query_template_ids(query)
+    generation_names = [ALL_GENERATION] if template_ids is None else sorted(str(template_id)
+                                                                              for template_id in template_ids)
+    generations = _get_generations(cache, [START_GENERATION] + generation_names)
+    return ':'.join([CACHE_KEY_PREFIX, get_query_fingerprint(query, name)] +
+                    [str(generations[generation_name]) for generation_name in [START_GENERATION] + generation_names])
+
+
+def _get_cache():
+    """ Return the cache storing the results.
+
+    Returns:
+
+    """
+    return caches[QUERY_RESULT_CACHE]
+
+
+def _get_generations(cache, names):
+    """ Return the current generations of the cache entries, by name.
+
+    Args:
+        cache:
+        names:
+
+    Returns:
+
+    """
+    keys = [GENERATION_KEY_PREFIX + name for name in names]
+    values = cache.get_many(keys)
+
+    generations = {}
+    for name, key in zip(names, keys):
+        generation = values.get(key, None)
+        if generation is None:
+            # start from the current time, to not reuse entries left by an evicted generation
+            generation = int(time.time() * 1000)
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        generations[name] = generation
+    return generations
@@ -21,7 +21,11 @@ def add_access_criteria(query, accessible_workspaces, user):
 
 
 def add_aggregate_access_criteria(query, accessible_workspaces, user):
-    """ Add access criteria to an aggregation query.
+    """ Add access criteria to the first stage of an aggregation query.
+
+    The access criteria are merged into the first stage if it is a $match (that may use a text index) or a $geoNear
+    (that must be the first stage), prepended as a new $match stage otherwise: stages before them would read data the
+    user can not access.
 
     Args:
         query:
@@ -31,21 +35,61 @@ def add_aggregate_access_criteria(query, accessible_workspaces, user):
     Returns:
 
     """
-    has_match_criteria = False
     access_criteria = _get_accessible_criteria(accessible_workspaces, user)
-    # Update $match with access criteria if exist.
-    for elt in query:
-        if '$match' in elt:
-            elt['$match'].update(access_criteria)
-            has_match_criteria = True
-            break
-    # Add $match with access criteria if does not exist.
-    if not has_match_criteria:
+    query = list(query)
+    first_stage = query[0] if len(query) > 0 else {}
+
+    if first_stage.keys() == ['$match']:
+        query[0] = {'$match': merge_criteria(first_stage['$match'], access_criteria)}
+    elif first_stage.keys() == ['$geoNear']:
+        geo_near = dict(first_stage['$geoNear'])
+        geo_near['query'] = merge_criteria(geo_near.get('query', {}), access_criteria)
+        query[0] = {'$geoNear': geo_near}
+    else:
         query.insert(0, {'$match': access_criteria})
 
     return query
 
 
+def merge_criteria(criteria, other_criteria):
+    """ Merge two criteria, keeping the top level operators of the first criteria (e.g. $text).
+
+    Args:
+        criteria:
+        other_criteria:
+
+    Returns:
+
+    """
+    if set(criteria.keys()) & set(other_criteria.keys()):
+        return {'$and': [criteria, other_criteria]}
+    merged_criteria = dict(criteria)
+    merged_criteria.update(other_criteria)
+    return merged_criteria
+
+
+def get_position_query(db_fields, position):
+    """ Return the query selecting the documents after a position, in the ascending order of fields.
+
+    Args:
+        db_fields: Ordering fields, ending with a unique field.
+        position: Values of the ordering fields at the position.
+
+    Returns:
+
+    """
+    or_query = []
+    for index, (db_field, value) in enumerate(zip(db_fields, position)):
+        equal_query = {previous_field: previous_value
+                       for previous_field, previous_value in zip(db_fields[:index], position[:index])}
+        # documents without value come first in ascending order
+        after_query = {db_field: {'$exists': True, '$ne': None}} if value is None \
+            else {db_field: {'$gt': value}}
+        equal_query.update(after_query)
+        or_query.append(equal_query)
+    return {'$or': or_query}
+
+
 def _get_accessible_criteria(accessible_workspaces, user):
     """ Get accessible criteria.
 
@@ -13,6 +13,7 @@ import xml_utils.commons.constants as xml_utils_constants
 import xml_utils.xml_validation.validation as xml_validation
 from core_main_app.commons.exceptions import XMLError
 from core_main_app.settings import XERCES_VALIDATION, SERVER_URI
+from core_main_app.utils import xml_dict_handler, xml_validation_pool
 from core_main_app.utils.urls import get_template_download_pattern
 from xml_utils.commons.constants import XSL_NAMESPACE
 from xml_utils.xsd_hash import xsd_hash
@@ -41,7 +42,8 @@ def validate_xml_schema(xsd_tree):
 
 
 def validate_xml_data(xsd_tree, xml_tree):
-    """Check if XML data is valid, send XML data to server to be validated if XERCES_VALIDATION is true
+    """Check if XML data is valid, send XML data to server to be validated if XERCES_VALIDATION is true, or to the
+    validation pool if XML_VALIDATION_POOL_SIZE is set
 
     Args:
         xsd_tree:
@@ -55,6 +57,8 @@ def validate_xml_data(xsd_tree, xml_tree):
             error = xml_validation.xerces_validate_xml(xsd_tree, xml_tree)
         except Exception:
             error = xml_validation.lxml_validate_xml(xsd_tree, xml_tree)
+    elif xml_validation_pool.is_enabled():
+        error = xml_validation_pool.validate_xml_tree(xsd_tree, xml_tree)
     else:
         error = xml_validation.lxml_validate_xml(xsd_tree, xml_tree)
 
@@ -154,6 +158,23 @@ def raw_xml_to_dict(raw_xml, postprocessor=None):
         raise exceptions.XMLError("An unexpected error happened during the XML parsing.")
 
 
+def stream_raw_xml_to_dict(raw_xml, postprocessor=None, max_list_size=None):
+    """Transform a raw xml to dict while parsing it. Lists which size exceed max list size are never materialized.
+
+    Args:
+        raw_xml: XML string or file-like object.
+        postprocessor:
+        max_list_size:
+
+    Returns:
+
+    """
+    try:
+        return xml_dict_handler.parse(raw_xml, postprocessor=postprocessor, max_list_size=max_list_size)
+    except xmltodict.expat.ExpatError:
+        raise exceptions.XMLError("An unexpected error happened during the XML parsing.")
+
+
 def remove_lists_from_xml_dict(xml_dict, max_list_size=0):
     """Remove from dictionary the lists that exceed max list size.
 
@@ -277,6 +298,151 @@ def get_imports_and_includes(xsd_string):
     return imports, includes
 
 
+def get_element_paths(xsd_string):
+    """Get the paths of the values defined by an XSD, in the dict of an XML document.
+
+    Element, type, group and attribute group references are resolved within the XSD (not in its imports and includes).
+
+    Args:
+        xsd_string:
+
+    Returns: list of paths (e.g. root.element, root.element.@attribute, root.element.#text)
+
+    """
+    xsd_tree = XSDTree.build_tree(xsd_string)
+    # get global components, by tag and name
+    global_components = {tag: _get_global_components_by_name(xsd_tree, tag)
+                         for tag in ('element', 'complexType', 'group', 'attributeGroup')}
+
+    paths = []
+    for element in global_components['element'].values():
+        _add_element_paths(element, [], global_components, paths)
+    return paths
+
+
+def _get_global_components_by_name(xsd_tree, tag):
+    """Get the global components of an XSD with the given tag, by name.
+
+    Args:
+        xsd_tree:
+        tag:
+
+    Returns:
+
+    """
+    components = xsd_tree.findall("{0}{1}".format(xml_utils_constants.LXML_SCHEMA_NAMESPACE, tag))
+    return OrderedDict((component.attrib['name'], component) for component in components
+                       if 'name' in component.attrib)
+
+
+def _add_element_paths(element, parent_path, global_components, paths, visited_components=()):
+    """Add the paths of the values of an element, and of its children.
+
+    Args:
+        element:
+        parent_path: list of element names from the root.
+        global_components: global components, by tag and name.
+        paths: list of paths to update.
+        visited_components: (tag, name) of the global types and groups being visited, to stop on recursion.
+
+    Returns:
+
+    """
+    # element reference
+    if 'ref' in element.attrib:
+        element = global_components['element'].get(_get_local_name(element.attrib['ref']))
+        # stop on missing or recursive elements
+        if element is None or element.attrib['name'] in parent_path:
+            return
+
+    path = parent_path + [element.attrib['name']]
+    complex_type = element.find("{}complexType".format(xml_utils_constants.LXML_SCHEMA_NAMESPACE))
+    if complex_type is None and 'type' in element.attrib:
+        complex_type, visited_components = _get_global_component(global_components, 'complexType',
+                                                                 element.attrib['type'], visited_components)
+        if complex_type is None and visited_components is None:
+            # recursive type
+            return
+
+    if complex_type is None:
+        # simple type
+        paths.append('.'.join(path))
+    else:
+        _add_type_paths(complex_type, path, global_components, paths, visited_components)
+
+
+def _add_type_paths(node, path, global_components, paths, visited_components):
+    """Add the paths of the values declared by the content of a complex type.
+
+    Args:
+        node: complex type, or node of its content.
+        path:
+        global_components:
+        paths:
+        visited_components:
+
+    Returns:
+
+    """
+    for child in node:
+        tag = child.tag.replace(xml_utils_constants.LXML_SCHEMA_NAMESPACE, '')
+        if tag == 'element':
+            _add_element_paths(child, path, global_components, paths, visited_components)
+        elif tag == 'attribute' and ('name' in child.attrib or 'ref' in child.attrib):
+            attribute_name = child.attrib.get('name', _get_local_name(child.attrib.get('ref', '')))
+            paths.append('.'.join(path + ['@' + attribute_name]))
+        elif tag in ('group', 'attributeGroup') and 'ref' in child.attrib:
+            # content of the referenced group
+            group, group_visited_components = _get_global_component(global_components, tag, child.attrib['ref'],
+                                                                    visited_components)
+            if group is not None:
+                _add_type_paths(group, path, global_components, paths, group_visited_components)
+        elif tag == 'simpleContent':
+            paths.append('.'.join(path + ['#text']))
+            _add_type_paths(child, path, global_components, paths, visited_components)
+        elif tag in ('extension', 'restriction'):
+            # content of the base type
+            base_type, base_visited_components = _get_global_component(global_components, 'complexType',
+                                                                       child.attrib.get('base', ''),
+                                                                       visited_components)
+            if base_type is not None:
+                _add_type_paths(base_type, path, global_components, paths, base_visited_components)
+            _add_type_paths(child, path, global_components, paths, visited_components)
+        elif tag in ('sequence', 'choice', 'all', 'complexContent'):
+            _add_type_paths(child, path, global_components, paths, visited_components)
+
+
+def _get_global_component(global_components, tag, qualified_name, visited_components):
+    """Get a global component from its name, if not being visited.
+
+    Args:
+        global_components:
+        tag:
+        qualified_name:
+        visited_components:
+
+    Returns:
+        Component (None if missing) and visited components including it (None if already visited).
+
+    """
+    key = (tag, _get_local_name(qualified_name))
+    if key in visited_components:
+        return None, None
+    return global_components[tag].get(key[1]), visited_components + (key,)
+
+
+def _get_local_name(qualified_name):
+    """Get the local part of a qualified name.
+
+    Args:
+        qualified_name:
+
+    Returns:
+
+    """
+    return qualified_name.split(':')[-1]
+
+
 def update_dependencies(xsd_string, dependencies):
     """Update dependencies of the schemas with given dependencies.
 
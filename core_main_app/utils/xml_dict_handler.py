@@ -0,0 +1,235 @@
+""" Streaming XML to dict conversion, producing the same structure as xmltodict
+"""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+from xml.parsers import expat
+
+ATTRIBUTE_PREFIX = '@'
+TEXT_KEY = '#text'
+
+_DROPPED = -1
+
+
+class _ElementFrame(object):
+    """ Element being parsed.
+    """
+    __slots__ = ('item', 'data', 'occurrences', 'keys')
+
+    def __init__(self, item):
+        self.item = item
+        self.data = []
+        # number of occurrences of each child element name (_DROPPED once the limit is exceeded)
+        self.occurrences = {}
+        # key of each child element name in item, after post processing
+        self.keys = {}
+
+
+class XmlDictHandler(object):
+    """ Expat handler building the dict of an XML document while it is parsed.
+
+    Repeated elements exceeding the maximum list size are removed from their parent as soon as the limit is
+    exceeded, and the following occurrences are not materialized.
+    """
+
+    def __init__(self, postprocessor=None, max_list_size=None):
+        """ Create the handler.
+
+        Args:
+            postprocessor: Function called with (path, key, value) for each value, returning (key, value) or None.
+            max_list_size: Maximum number of occurrences of an element, None for no limit.
+        """
+        self.postprocessor = postprocessor
+        self.max_occurrences = None if max_list_size is None else max(max_list_size, 1)
+        self.path = []
+        # root frame receives the document element
+        self.stack = [_ElementFrame(None)]
+        # depth inside an element that is not materialized
+        self.skip_depth = 0
+
+    @property
+    def result(self):
+        """ Return the dict built from the parsed document.
+
+        Returns:
+
+        """
+        return self.stack[0].item
+
+    def start_element(self, name, attributes):
+        """ Expat start element handler.
+
+        Args:
+            name:
+            attributes: List of attribute names and values.
+
+        Returns:
+
+        """
+        if self.skip_depth > 0:
+            self.skip_depth += 1
+            return
+
+        parent = self.stack[-1]
+        if self.max_occurrences is not None and not self._count_occurrence(parent, name):
+            self.skip_depth = 1
+            return
+
+        attributes = OrderedDict(zip(attributes[0::2], attributes[1::2]))
+        self.path.append((name, attributes or None))
+
+        attribute_entries = []
+        for key, value in attributes.items():
+            entry = self._post_process(ATTRIBUTE_PREFIX + key, value)
+            if entry:
+                attribute_entries.append(entry)
+
+        self.stack.append(_ElementFrame(OrderedDict(attribute_entries) or None))
+
+    def end_element(self, name):
+        """ Expat end element handler.
+
+        Args:
+            name:
+
+        Returns:
+
+        """
+        if self.skip_depth > 0:
+            self.skip_depth -= 1
+            return
+
+        frame = self.stack.pop()
+        parent = self.stack[-1]
+        data = ''.join(frame.data).strip() or None
+
+        item = frame.item
+        if item is not None:
+            if data:
+                item = self._push_data(item, TEXT_KEY, data)
+            parent.item = self._push_data(parent.item, name, item, parent)
+        else:
+            parent.item = self._push_data(parent.item, name, data, parent)
+
+        self.path.pop()
+
+    def characters(self, data):
+        """ Expat character data handler.
+
+        Args:
+            data:
+
+        Returns:
+
+        """
+        if self.skip_depth == 0:
+            self.stack[-1].data.append(data)
+
+    def _count_occurrence(self, parent, name):
+        """ Count an occurrence of an element, and drop the element from its parent if the limit is exceeded.
+
+        Args:
+            parent:
+            name:
+
+        Returns:
+            True if the element should be materialized, False otherwise.
+
+        """
+        occurrences = parent.occurrences.get(name, 0)
+        if occurrences == _DROPPED:
+            return False
+
+        occurrences += 1
+        if occurrences > self.max_occurrences:
+            # remove the occurrences already materialized
+            key = parent.keys.pop(name, None)
+            if parent.item is not None and key in parent.item:
+                del parent.item[key]
+            parent.occurrences[name] = _DROPPED
+            return False
+
+        parent.occurrences[name] = occurrences
+        return True
+
+    def _post_process(self, key, value):
+        """ Apply the post processor to a key and a value.
+
+        Args:
+            key:
+            value:
+
+        Returns:
+
+        """
+        if self.postprocessor is None:
+            return key, value
+        return self.postprocessor(self.path, key, value)
+
+    def _push_data(self, item, key, data, frame=None):
+        """ Add a value to an item, creating a list if the key is repeated.
+
+        Args:
+            item:
+            key:
+            data:
+            frame: Frame of the item, to keep track of the keys of child elements.
+
+        Returns:
+
+        """
+        result = self._post_process(key, data)
+        if result is None:
+            return item
+        processed_key, data = result
+
+        if item is None:
+            item = OrderedDict()
+        if frame is not None:
+            frame.keys[key] = processed_key
+
+        if processed_key in item:
+            value = item[processed_key]
+            if isinstance(value, list):
+                value.append(data)
+            else:
+                item[processed_key] = [value, data]
+        else:
+            item[processed_key] = data
+        return item
+
+
+def parse(xml_input, postprocessor=None, max_list_size=None):
+    """ Parse an XML document into a dict.
+
+    Args:
+        xml_input: XML string or file-like object.
+        postprocessor: Function called with (path, key, value) for each value, returning (key, value) or None.
+        max_list_size: Maximum number of occurrences of an element, None for no limit.
+
+    Returns:
+
+    Raises:
+        ExpatError: XML is not well formed.
+
+    """
+    handler = XmlDictHandler(postprocessor, max_list_size)
+
+    parser = expat.ParserCreate()
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start_element
+    parser.EndElementHandler = handler.end_element
+    parser.CharacterDataHandler = handler.characters
+    # do not expand entities
+    parser.DefaultHandler = lambda data: None
+    parser.ExternalEntityRefHandler = lambda *args: 1
+
+    if hasattr(xml_input, 'read'):
+        parser.ParseFile(xml_input)
+    else:
+        if isinstance(xml_input, unicode):
+            xml_input = xml_input.encode('utf-8')
+        parser.Parse(xml_input, True)
+
+    return handler.result
@@ -0,0 +1,256 @@
+""" Process-wide cache of compiled XML schemas
+"""
+import threading
+from collections import OrderedDict
+
+from lxml import etree
+
+from core_main_app.settings import XML_SCHEMA_CACHE_MAX_ENTRIES, XML_SCHEMA_CACHE_MAX_SIZE
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+
+class XMLSchemaCacheEntry(object):
+    """ Compiled XML schema stored in the cache.
+    """
+
+    def __init__(self, schema, version, xsd_string):
+        """ Create a cache entry.
+
+        Args:
+            schema: Compiled XML schema.
+            version: Version of the XSD the schema was compiled from (e.g. template hash).
+            xsd_string: XSD the schema was compiled from.
+        """
+        self.schema = schema
+        self.version = version
+        self.xsd_string = xsd_string
+        self.size = len(xsd_string)
+        # lxml validators keep their error log on the instance: each thread validates with its own compiled schema
+        self._local = threading.local()
+        self._local.schema = schema
+
+    def get_thread_schema(self):
+        """ Return the compiled schema of the current thread, compiling it on first use by the thread.
+
+        Returns:
+
+        """
+        schema = getattr(self._local, 'schema', None)
+        if schema is None:
+            schema = etree.XMLSchema(XSDTree.build_tree(self.xsd_string))
+            self._local.schema = schema
+        return schema
+
+    def validate(self, xml_tree):
+        """ Validate an XML tree against the compiled schema.
+
+        Args:
+            xml_tree:
+
+        Returns: None if no errors, string otherwise
+
+        """
+        try:
+            self.get_thread_schema().assertValid(xml_tree)
+        except Exception as e:
+            return e.message
+        return None
+
+
+class XMLSchemaCache(object):
+    """ LRU cache of compiled XML schemas, bounded in number of entries and in cumulated XSD size.
+    """
+
+    def __init__(self, max_entries, max_size):
+        """ Create the cache.
+
+        Args:
+            max_entries: Maximum number of entries.
+            max_size: Maximum cumulated size of the XSD of the entries.
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # incremented each time an entry is invalidated, to let copies of the cache (e.g. in worker processes) know
+        # that they are outdated
+        self.generation = 0
+
+    def find(self, key, version=None):
+        """ Return the cache entry for the key, None if missing or outdated.
+
+        Args:
+            key: Cache key (e.g. template id).
+            version: Version of the XSD (e.g. template hash).
+
+        Returns:
+            XMLSchemaCacheEntry
+
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                if entry.version == version:
+                    # put the entry back as most recently used
+                    self._entries[key] = entry
+                    return entry
+                # outdated entry
+                self._size -= entry.size
+        return None
+
+    def get(self, key, xsd_string, version=None):
+        """ Return the cache entry for the key, compiling the XSD if missing or outdated.
+
+        Args:
+            key: Cache key (e.g. template id).
+            xsd_string: XSD content, compiled on cache miss.
+            version: Version of the XSD (e.g. template hash).
+
+        Returns:
+            XMLSchemaCacheEntry
+
+        """
+        entry = self.find(key, version)
+        if entry is not None:
+            return entry
+
+        # compile the schema outside of the lock
+        entry = compile_xml_schema(xsd_string, version)
+
+        with self._lock:
+            self._add(key, entry)
+        return entry
+
+    def invalidate(self, key):
+        """ Remove an entry from the cache.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        with self._lock:
+            self.generation += 1
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry.size
+
+    def clear(self):
+        """ Remove all entries from the cache.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, key, entry):
+        """ Add an entry and evict least recently used entries exceeding the limits.
+
+        Args:
+            key:
+            entry:
+
+        Returns:
+
+        """
+        if self.max_entries <= 0 or entry.size > self.max_size:
+            return
+
+        previous_entry = self._entries.pop(key, None)
+        if previous_entry is not None:
+            self._size -= previous_entry.size
+
+        self._entries[key] = entry
+        self._size += entry.size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_size:
+            _, evicted_entry = self._entries.popitem(last=False)
+            self._size -= evicted_entry.size
+
+
+def compile_xml_schema(xsd_string, version=None):
+    """ Compile an XSD into a cache entry.
+
+    Args:
+        xsd_string:
+        version:
+
+    Returns:
+        XMLSchemaCacheEntry
+
+    """
+    xsd_tree = XSDTree.build_tree(xsd_string)
+    return XMLSchemaCacheEntry(etree.XMLSchema(xsd_tree), version, xsd_string)
+
+
+xml_schema_cache = XMLSchemaCache(XML_SCHEMA_CACHE_MAX_ENTRIES, XML_SCHEMA_CACHE_MAX_SIZE)
+""" Process-wide cache of compiled XML schemas.
+"""
+
+
+def get_xml_schema(key, xsd_string, version=None):
+    """ Return the compiled schema of an XSD, from the cache when a key is given.
+
+    Args:
+        key: Cache key, None to compile the XSD without caching it.
+        xsd_string:
+        version:
+
+    Returns:
+        XMLSchemaCacheEntry
+
+    """
+    if key is None:
+        return compile_xml_schema(xsd_string, version)
+
+    return xml_schema_cache.get(key, xsd_string, version)
+
+
+def get_template_cache_key(template):
+    """ Return the cache key of a template.
+
+    Args:
+        template:
+
+    Returns:
+        Template id, None for unsaved templates (no stable key).
+
+    """
+    return str(template.id) if template.id is not None else None
+
+
+def get_template_xml_schema(template):
+    """ Return the compiled schema of a template, from the cache when possible.
+
+    Args:
+        template:
+
+    Returns:
+        XMLSchemaCacheEntry
+
+    """
+    return get_xml_schema(get_template_cache_key(template), template.content, template.hash)
+
+
+def invalidate_template_xml_schema(template):
+    """ Remove the compiled schema of a template from the cache.
+
+    Args:
+        template:
+
+    Returns:
+
+    """
+    key = get_template_cache_key(template)
+    if key is not None:
+        xml_schema_cache.invalidate(key)
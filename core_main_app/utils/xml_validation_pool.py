@@ -0,0 +1,151 @@
+""" Process pool validating XML data. Each worker keeps its own compiled schemas warm, by key and version of the XSD:
+the XSD is only sent to a worker missing its compiled schema.
+"""
+import hashlib
+import multiprocessing
+import threading
+
+from core_main_app.commons import exceptions
+from core_main_app.settings import XML_VALIDATION_POOL_SIZE
+from core_main_app.utils.xml_schema_cache import get_xml_schema, xml_schema_cache
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+XML_ERROR = 'xml'
+XSD_ERROR = 'xsd'
+XSD_MISSING = 'xsd_missing'
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# generation of the cache of the process that sent the last validation (set in the workers)
+_worker_generation = None
+
+
+def is_enabled():
+    """ Is the validation pool enabled.
+
+    Returns:
+
+    """
+    return XML_VALIDATION_POOL_SIZE > 0
+
+
+def get_pool():
+    """ Return the validation pool, create it on first use.
+
+    Returns:
+
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = multiprocessing.Pool(XML_VALIDATION_POOL_SIZE)
+    return _pool
+
+
+def close_pool():
+    """ Stop the workers of the validation pool.
+
+    Returns:
+
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool.join()
+            _pool = None
+
+
+def validate_xml_string(xml_string, xsd_string, xsd_key=None, xsd_version=None):
+    """ Validate an XML string against an XSD string in a worker process.
+
+    Args:
+        xml_string:
+        xsd_string:
+        xsd_key: Key of the compiled schema in the cache of the worker, None to not cache it.
+        xsd_version: Version of the XSD (e.g. template hash).
+
+    Returns:
+
+    Raises:
+        XMLError: XML is not well formed or not valid.
+        XSDError: XSD can not be compiled.
+
+    """
+    pool = get_pool()
+    generation = xml_schema_cache.generation
+    if xsd_key is None or xml_schema_cache.max_entries <= 0:
+        error_type, error = pool.apply(_validate_xml_string, (xml_string, xsd_string, None, xsd_version, generation))
+    else:
+        # send the XSD only if the worker has not compiled it yet
+        error_type, error = pool.apply(_validate_xml_string, (xml_string, None, xsd_key, xsd_version, generation))
+        if error_type == XSD_MISSING:
+            error_type, error = pool.apply(_validate_xml_string,
+                                           (xml_string, xsd_string, xsd_key, xsd_version, generation))
+
+    if error_type == XSD_ERROR:
+        raise exceptions.XSDError(error)
+    elif error_type == XML_ERROR:
+        raise exceptions.XMLError(error)
+
+
+def validate_xml_tree(xsd_tree, xml_tree):
+    """ Validate an XML tree against an XSD tree in a worker process.
+
+    Args:
+        xsd_tree:
+        xml_tree:
+
+    Returns: None if no errors, string otherwise
+
+    """
+    xsd_string = XSDTree.tostring(xsd_tree)
+    try:
+        validate_xml_string(XSDTree.tostring(xml_tree), xsd_string, hashlib.sha1(xsd_string).hexdigest())
+    except (exceptions.XMLError, exceptions.XSDError) as e:
+        return e.message
+    return None
+
+
+def _validate_xml_string(xml_string, xsd_string, xsd_key, xsd_version, generation=None):
+    """ Validate an XML string against an XSD string. Executed by the workers.
+
+    Args:
+        xml_string:
+        xsd_string: XSD content, None to use the compiled schema cached by the worker.
+        xsd_key:
+        xsd_version:
+        generation: Generation of the cache of the sending process, the cache of the worker is cleared when it changes
+        (schemas were invalidated, e.g. template deleted).
+
+    Returns:
+        Type of error and error message, (None, None) if the XML is valid, (XSD_MISSING, None) if no XSD was sent and
+        the worker has no compiled schema.
+
+    """
+    global _worker_generation
+    if generation is not None and generation != _worker_generation:
+        xml_schema_cache.clear()
+        _worker_generation = generation
+
+    try:
+        xml_tree = XSDTree.build_tree(xml_string)
+    except Exception as e:
+        return XML_ERROR, e.message
+
+    if xsd_string is None:
+        xml_schema = xml_schema_cache.find(xsd_key, xsd_version)
+        if xml_schema is None:
+            return XSD_MISSING, None
+    else:
+        try:
+            xml_schema = get_xml_schema(xsd_key, xsd_string, xsd_version)
+        except Exception as e:
+            return XSD_ERROR, e.message
+
+    error = xml_schema.validate(xml_tree)
+    if error is not None:
+        return XML_ERROR, error
+    return None, None
@@ -1,10 +1,27 @@
 """ Unit Test Data
 """
+import datetime
+
+import pytz
+
 from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
 from tests.components.data.fixtures.fixtures import DataFixtures
+from core_main_app.components.abstract_data.models import AbstractData
 from core_main_app.components.data.models import Data
+from core_main_app.components.data_tombstone.models import DataTombstone
+from core_main_app.components.workspace.models import Workspace
 from core_main_app.commons import exceptions
+from bson.binary import Binary
 from bson.objectid import ObjectId
+from django.core.cache import caches
+from mock import patch
+from mongoengine.connection import get_db
+
+import core_main_app.components.data.api as data_api
+from core_main_app.utils.query import result_cache
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+from core_main_app.settings import GRIDFS_DATA_COLLECTION
 
 fixture_data = DataFixtures()
 
@@ -82,3 +99,210 @@ class TestDataGetAllExceptUserId(MongoIntegrationBaseTestCase):
         result = Data.get_all_except_user_id(user_id)
         # Assert
         self.assertTrue(result.count() > 0)
+
+
+class TestDataInsertMany(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def test_data_insert_many_saves_all_data(self):
+        # Arrange
+        list_data = [Data(template=self.fixture.template, user_id='1', title='title_3'),
+                     Data(template=self.fixture.template, user_id='1', title='title_4')]
+        # Act
+        errors = Data.insert_many(list_data)
+        # Assert
+        self.assertEqual(errors, [None, None])
+        self.assertEqual(Data.get_all().count(), len(self.fixture.data_collection) + 2)
+
+    def test_data_insert_many_sets_id_of_inserted_data(self):
+        # Arrange
+        data = Data(template=self.fixture.template, user_id='1', title='title_3')
+        # Act
+        Data.insert_many([data])
+        # Assert
+        self.assertEqual(Data.get_by_id(data.id).title, 'title_3')
+
+
+class TestDataExecuteQueryInIdList(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def test_data_execute_query_in_id_list_returns_data_of_query_in_list(self):
+        # Arrange
+        query = {'title': {'$in': ['title', 'title2']}}
+        # Act
+        result = Data.execute_query_in_id_list(query, [self.fixture.data_1.id])
+        # Assert
+        self.assertEqual([data.id for data in result], [self.fixture.data_1.id])
+
+
+class TestDataQueryResultCache(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def setUp(self):
+        super(TestDataQueryResultCache, self).setUp()
+        self.patcher = patch.object(result_cache, 'QUERY_RESULT_CACHE', 'default')
+        self.patcher.start()
+        self.query = {'template': {'$in': [self.fixture.template.id]}}
+
+    def tearDown(self):
+        caches['default'].clear()
+        self.patcher.stop()
+        super(TestDataQueryResultCache, self).tearDown()
+
+    def test_saving_data_of_template_invalidates_cached_results(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        data_api.execute_query(self.query, user).count()
+        # Act
+        Data(template=self.fixture.template, user_id='1', title='title3').save()
+        result = data_api.execute_query(self.query, user)
+        # Assert
+        self.assertEqual(result.count(), 3)
+
+    def test_updating_data_of_template_invalidates_cached_results(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        query = {'$and': [self.query, {'title': 'title'}]}
+        data_api.execute_query(query, user).count()
+        # Act
+        self.fixture.data_2.title = 'title'
+        self.fixture.data_2.save()
+        result = data_api.execute_query(query, user)
+        # Assert
+        self.assertEqual(result.count(), 2)
+
+
+class TestDataGetChanges(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def setUp(self):
+        super(TestDataGetChanges, self).setUp()
+        self.fixture.data_1.last_modification_date = datetime.datetime(2018, 1, 1)
+        self.fixture.data_1.save()
+        self.fixture.data_2.last_modification_date = datetime.datetime(2018, 1, 3)
+        self.fixture.data_2.save()
+        self.tombstone = DataTombstone(id=ObjectId(), template=self.fixture.template.id, user_id='1',
+                                       deletion_date=datetime.datetime(2018, 1, 2)).save()
+
+    def test_get_changes_returns_modified_and_deleted_data_ordered_by_date(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        # Act
+        changes = data_api.get_changes(user)
+        # Assert
+        self.assertEqual([(data_id, data is None) for _, data_id, data in changes],
+                         [(self.fixture.data_1.id, False), (self.tombstone.id, True), (self.fixture.data_2.id, False)])
+
+    def test_get_changes_since_date_returns_changes_from_date(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        # Act
+        changes = data_api.get_changes(user, since=datetime.datetime(2018, 1, 2))
+        # Assert
+        self.assertEqual([data_id for _, data_id, _ in changes], [self.tombstone.id, self.fixture.data_2.id])
+
+    def test_get_changes_after_position_returns_following_changes(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        # Act
+        changes = data_api.get_changes(user, position=(datetime.datetime(2018, 1, 2), self.tombstone.id))
+        # Assert
+        self.assertEqual([data_id for _, data_id, _ in changes], [self.fixture.data_2.id])
+
+    def test_get_changes_returns_at_most_max_changes(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        # Act
+        changes = data_api.get_changes(user, max_changes=2)
+        # Assert
+        self.assertEqual([data_id for _, data_id, _ in changes], [self.fixture.data_1.id, self.tombstone.id])
+
+    @patch('core_main_app.components.workspace.api.get_all_workspace_ids_with_read_access_by_user')
+    def test_get_changes_returns_changes_of_data_the_user_can_read(self, mock_get_workspace_ids):
+        # Arrange
+        mock_get_workspace_ids.return_value = []
+        user = create_mock_user('2')
+        # Act
+        changes = data_api.get_changes(user)
+        # Assert
+        self.assertEqual([data_id for _, data_id, _ in changes], [self.fixture.data_2.id])
+
+    def test_assign_updates_last_modification_date(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        workspace = Workspace(title='workspace', owner='1', read_perm_id='1', write_perm_id='2').save()
+        # Act
+        data_api.assign(self.fixture.data_1, workspace, user)
+        # Assert
+        self.assertGreater(self.fixture.data_1.last_modification_date, datetime.datetime(2018, 1, 3, tzinfo=pytz.utc))
+
+    def test_change_owner_updates_last_modification_date(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        # Act
+        data_api.change_owner(self.fixture.data_1, create_mock_user('2'), user)
+        # Assert
+        self.assertGreater(self.fixture.data_1.last_modification_date, datetime.datetime(2018, 1, 3, tzinfo=pytz.utc))
+
+
+class TestDataDelete(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    @patch.object(AbstractData, 'delete')
+    def test_data_delete_records_tombstone(self, mock_delete):
+        # Arrange
+        data_id = self.fixture.data_1.id
+        # Act
+        self.fixture.data_1.delete()
+        # Assert
+        tombstone = DataTombstone.objects.get(id=data_id)
+        self.assertEqual(tombstone.template, self.fixture.template.id)
+        self.assertEqual(tombstone.user_id, '1')
+        self.assertIsNotNone(tombstone.deletion_date)
+
+
+class TestDataPrefetchXmlContent(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def test_data_prefetch_xml_content_sets_xml_content_from_chunks(self):
+        # Arrange
+        data = Data.get_by_id(self.fixture.data_1.id)
+        data.xml_file.grid_id = _insert_grid_file(['<tag>', 'value</tag>'])
+        # Act
+        Data.prefetch_xml_content([data])
+        # Assert
+        self.assertEqual(data._xml_content, '<tag>value</tag>')
+
+    def test_data_prefetch_xml_content_does_not_set_xml_content_of_missing_file(self):
+        # Arrange
+        data = Data.get_by_id(self.fixture.data_1.id)
+        data.xml_file.grid_id = ObjectId()
+        # Act
+        Data.prefetch_xml_content([data])
+        # Assert
+        self.assertIsNone(data._xml_content)
+
+
+def _insert_grid_file(list_chunk):
+    """ Insert a file in the GridFS collection of the data.
+
+    Args:
+        list_chunk:
+
+    Returns:
+
+    """
+    database = get_db()
+    grid_id = ObjectId()
+    database[GRIDFS_DATA_COLLECTION + '.files'].insert_one({'_id': grid_id,
+                                                            'length': len(''.join(list_chunk))})
+    for index, chunk in enumerate(list_chunk):
+        database[GRIDFS_DATA_COLLECTION + '.chunks'].insert_one({'files_id': grid_id, 'n': index,
+                                                                 'data': Binary(chunk)})
+    return grid_id
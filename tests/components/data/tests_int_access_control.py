@@ -3,6 +3,7 @@
 import unittest
 
 from mock.mock import patch
+from mongoengine.queryset.queryset import QuerySet
 
 from core_main_app.components.data import api as data_api
 from core_main_app.components.data.models import Data
@@ -141,6 +142,27 @@ class TestDataGetAllExceptUser(MongoIntegrationBaseTestCase):
         self.assertTrue(data.user_id != mock_user.id for data in data_list)
 
 
+class TestDataGetByIdList(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_get_by_id_list_with_workspace_access_returns_data(self, get_all_workspaces_with_read_access_by_user):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_2]
+        data = fixture_data.data_collection[fixture_data.USER_2_WORKSPACE_2]
+        data_list = data_api.get_by_id_list([data.id], mock_user)
+        self.assertEqual(list(data_list), [data])
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_get_by_id_list_without_workspace_access_raises_error(self, get_all_workspaces_with_read_access_by_user):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_1]
+        data = fixture_data.data_collection[fixture_data.USER_2_WORKSPACE_2]
+        with self.assertRaises(AccessControlError):
+            data_api.get_by_id_list([data.id], mock_user)
+
+
 class TestDataUpsert(MongoIntegrationBaseTestCase):
     # TODO: can not test without mock for GridFS
     pass
@@ -211,6 +233,57 @@ class TestDataExecuteQuery(MongoIntegrationBaseTestCase):
         self.assertTrue(len(data_list) == 4)
 
 
+    @patch('core_main_app.components.data.access_control._get_workspace_id')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_execute_query_does_not_check_each_data(self, get_all_workspaces_with_read_access_by_user,
+                                                     get_workspace_id):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_2]
+        data_list = data_api.execute_query({}, mock_user)
+        self.assertEqual(len(data_list), 3)
+        self.assertFalse(get_workspace_id.called)
+
+    @patch('core_main_app.components.data.access_control._check_can_read_data_list')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_execute_query_returns_unevaluated_queryset(self, get_all_workspaces_with_read_access_by_user,
+                                                        check_can_read_data_list):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_2]
+        data_list = data_api.execute_query({}, mock_user)
+        self.assertIsInstance(data_list, QuerySet)
+        self.assertFalse(data_list._result_cache)
+        self.assertFalse(check_can_read_data_list.called)
+
+
+class TestDataAggregate(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_aggregate_returns_accessible_data_only(self, get_all_workspaces_with_read_access_by_user):
+        mock_user = _create_user('3')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_1]
+        results = list(data_api.aggregate([{'$project': {'workspace': 1}}], mock_user))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['workspace'], fixture_data.workspace_1.id)
+
+    def test_aggregate_as_superuser_returns_all_data(self):
+        mock_user = _create_user('0', is_superuser=True)
+        results = list(data_api.aggregate([{'$project': {'workspace': 1}}], mock_user))
+        self.assertEqual(len(results), len(fixture_data.data_collection))
+
+    def test_aggregate_with_lookup_raises_error(self):
+        mock_user = _create_user('3')
+        with self.assertRaises(AccessControlError):
+            data_api.aggregate([{'$lookup': {'from': 'workspace', 'localField': 'workspace',
+                                             'foreignField': '_id', 'as': 'workspaces'}}], mock_user)
+
+    def test_aggregate_with_out_in_facet_raises_error(self):
+        mock_user = _create_user('3')
+        with self.assertRaises(AccessControlError):
+            data_api.aggregate([{'$facet': {'copy': [{'$out': 'copy'}]}}], mock_user)
+
+
 class TestDataDelete(MongoIntegrationBaseTestCase):
 
     fixture = fixture_data
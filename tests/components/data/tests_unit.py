@@ -1,8 +1,10 @@
 """ Unit Test Data
 """
+import threading
 from collections import OrderedDict
 from unittest.case import TestCase
 
+from bson.objectid import ObjectId
 from mock import patch
 
 import core_main_app.components.data.api as data_api
@@ -11,6 +13,7 @@ from core_main_app.components.data.models import Data
 from core_main_app.components.template.models import Template
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from core_main_app.utils.xml_schema_cache import xml_schema_cache
 
 
 class TestDataGetById(TestCase):
@@ -91,6 +94,37 @@ class TestDataUpsert(TestCase):
         # Assert
         self.assertEqual('3', result.user_id)
 
+    @patch('core_main_app.utils.events.publish')
+    @patch.object(Data, 'convert_to_file')
+    @patch.object(data_api, 'check_xml_file_is_valid')
+    @patch.object(Data, 'save')
+    def test_data_upsert_publishes_data_created_if_data_is_new(self, mock_save, mock_check, mock_convert_file,
+                                                               mock_publish):
+        # Arrange
+        data = _create_data(_get_template(), user_id='3', title='title', content='<tag></tag>')
+        mock_save.return_value = data
+        mock_user = _create_user('3')
+        # Act
+        data_api.upsert(data, mock_user)
+        # Assert
+        mock_publish.assert_called_once_with('data_created', data, mock_user)
+
+    @patch('core_main_app.utils.events.publish')
+    @patch.object(Data, 'convert_to_file')
+    @patch.object(data_api, 'check_xml_file_is_valid')
+    @patch.object(Data, 'save')
+    def test_data_upsert_publishes_data_updated_if_data_exists(self, mock_save, mock_check, mock_convert_file,
+                                                               mock_publish):
+        # Arrange
+        data = _create_data(_get_template(), user_id='3', title='title', content='<tag></tag>')
+        data.id = ObjectId()
+        mock_save.return_value = data
+        mock_user = _create_user('3')
+        # Act
+        data_api.upsert(data, mock_user)
+        # Assert
+        mock_publish.assert_called_once_with('data_updated', data, mock_user)
+
     @patch.object(Data, 'convert_to_file')
     @patch.object(data_api, 'check_xml_file_is_valid')
     @patch.object(Data, 'save')
@@ -152,6 +186,80 @@ class TestDataUpsert(TestCase):
             data_api.upsert(data, mock_user)
 
 
+class TestDataBulkUpsert(TestCase):
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_inserts_valid_data_in_one_call(self, mock_convert_file, mock_insert_many):
+        # Arrange
+        list_data = [_create_data(_get_saved_template(), user_id='1', title='title', content='<tag>1</tag>'),
+                     _create_data(_get_saved_template(), user_id='1', title='title', content='<tag>2</tag>')]
+        mock_insert_many.return_value = [None, None]
+        mock_user = _create_user('1')
+        # Act
+        result = data_api.bulk_upsert(list_data, mock_user)
+        # Assert
+        self.assertEqual(result, [None, None])
+        self.assertEqual(mock_insert_many.call_count, 1)
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_returns_error_of_each_invalid_data(self, mock_convert_file, mock_insert_many):
+        # Arrange
+        list_data = [_create_data(_get_saved_template(), user_id='1', title='title', content='<new_tag></new_tag>'),
+                     _create_data(_get_saved_template(), user_id='1', title='title', content='<tag>2</tag>')]
+        mock_insert_many.return_value = [None]
+        mock_user = _create_user('1')
+        # Act
+        result = data_api.bulk_upsert(list_data, mock_user)
+        # Assert
+        self.assertIsNotNone(result[0])
+        self.assertIsNone(result[1])
+        mock_insert_many.assert_called_once_with([list_data[1]])
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_returns_error_if_xml_content_is_not_set(self, mock_convert_file, mock_insert_many):
+        # Arrange
+        data = Data(template=_get_saved_template(), user_id='1', title='title')
+        mock_user = _create_user('1')
+        # Act
+        result = data_api.bulk_upsert([data], mock_user)
+        # Assert
+        self.assertIsNotNone(result[0])
+        self.assertFalse(mock_insert_many.called)
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'convert_to_file')
+    @patch('core_main_app.utils.xml_schema_cache.etree.XMLSchema')
+    def test_data_bulk_upsert_validates_data_of_same_template_concurrently(self, mock_xml_schema, mock_convert_file,
+                                                                           mock_insert_many):
+        # Arrange
+        template = _get_saved_template()
+        list_data = [_create_data(template, user_id='1', title='title', content='<tag>1</tag>'),
+                     _create_data(template, user_id='1', title='title', content='<tag>2</tag>')]
+        schema = _ConcurrentXMLSchema(expected_validations=2)
+        mock_xml_schema.return_value = schema
+        mock_insert_many.return_value = [None, None]
+        mock_user = _create_user('1')
+        # Act
+        try:
+            with patch.object(data_api, 'DATA_BULK_UPSERT_THREADS', 2):
+                data_api.bulk_upsert(list_data, mock_user)
+        finally:
+            xml_schema_cache.clear()
+        # Assert
+        self.assertEqual(schema.max_concurrent_validations, 2)
+
+    def test_data_bulk_upsert_raises_access_control_error_if_user_can_not_write_data(self):
+        # Arrange
+        list_data = [_create_data(_get_saved_template(), user_id='1', title='title', content='<tag>1</tag>')]
+        mock_user = _create_user('2')
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_api.bulk_upsert(list_data, mock_user)
+
+
 class TestDataCheckXmlFileIsValid(TestCase):
 
     def test_data_check_xml_file_is_valid_raises_xml_error_if_failed_during_xml_validation(self):
@@ -197,6 +305,12 @@ def _get_template():
     return template
 
 
+def _get_saved_template():
+    template = _get_template()
+    template.id = ObjectId()
+    return template
+
+
 def _create_data(template, user_id, title, content):
     data = Data(template=template,
                 user_id=user_id,
@@ -207,3 +321,160 @@ def _create_data(template, user_id, title, content):
 
 def _create_user(user_id):
     return create_mock_user(user_id)
+
+
+class _ConcurrentXMLSchema(object):
+    """ XML schema recording the number of concurrent validations, each validation waiting for the others.
+    """
+
+    def __init__(self, expected_validations):
+        self.expected_validations = expected_validations
+        self.concurrent_validations = 0
+        self.max_concurrent_validations = 0
+        self.lock = threading.Lock()
+        self.all_started = threading.Event()
+
+    def assertValid(self, xml_tree):
+        with self.lock:
+            self.concurrent_validations += 1
+            self.max_concurrent_validations = max(self.max_concurrent_validations, self.concurrent_validations)
+            if self.concurrent_validations == self.expected_validations:
+                self.all_started.set()
+        # validations serialized by a lock would time out here
+        self.all_started.wait(5)
+        with self.lock:
+            self.concurrent_validations -= 1
+
+
+class TestDataCreateDictContentIndexes(TestCase):
+    def setUp(self):
+        self.template = Template(content='<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                         '<xs:element name="root" type="xs:string"/></xs:schema>')
+
+    @patch('core_main_app.utils.databases.indexes.create_dict_content_indexes')
+    def test_create_dict_content_indexes_raises_api_error_if_path_not_in_template(self, mock_create_indexes):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        # Act # Assert
+        with self.assertRaises(exceptions.ApiError):
+            data_api.create_dict_content_indexes(mock_user, self.template, ['root.unknown'])
+
+    @patch('core_main_app.utils.databases.indexes.create_dict_content_indexes')
+    def test_create_dict_content_indexes_creates_indexes_of_paths(self, mock_create_indexes):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        # Act
+        data_api.create_dict_content_indexes(mock_user, self.template, ['root'])
+        # Assert
+        mock_create_indexes.assert_called_with(Data, ['root'])
+
+    @patch('core_main_app.utils.databases.indexes.create_dict_content_indexes')
+    def test_create_dict_content_indexes_raises_api_error_if_paths_not_provided(self, mock_create_indexes):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        # Act # Assert
+        with self.assertRaises(exceptions.ApiError):
+            data_api.create_dict_content_indexes(mock_user, self.template, None)
+        self.assertFalse(mock_create_indexes.called)
+
+    def test_create_dict_content_indexes_raises_access_control_error_if_not_superuser(self):
+        # Arrange
+        mock_user = create_mock_user('1')
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_api.create_dict_content_indexes(mock_user, self.template, ['root'])
+
+
+class TestDataGetFacets(TestCase):
+
+    @patch.object(Data, 'aggregate')
+    def test_get_facets_runs_a_single_facet_aggregation(self, mock_aggregate):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_aggregate.return_value = iter([{'0': [{'_id': 'a', 'count': 2}], '1': []}])
+        # Act
+        data_api.get_facets({'title': 'title'}, ['dict_content.root.a', 'dict_content.root.b'], mock_user, 5)
+        # Assert
+        pipeline = mock_aggregate.call_args[0][0]
+        self.assertEqual(mock_aggregate.call_count, 1)
+        self.assertEqual(pipeline[0], {'$match': {'title': 'title'}})
+        self.assertEqual(pipeline[1]['$facet']['0'][0], {'$unwind': '$dict_content.root.a'})
+        self.assertEqual(pipeline[1]['$facet']['1'][-1], {'$limit': 5})
+
+    @patch.object(Data, 'aggregate')
+    def test_get_facets_counts_each_data_once_by_value(self, mock_aggregate):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_aggregate.return_value = iter([{'0': []}])
+        # Act
+        data_api.get_facets({}, ['dict_content.root.a'], mock_user)
+        # Assert
+        facet = mock_aggregate.call_args[0][0][1]['$facet']['0']
+        self.assertEqual(facet[1], {'$group': {'_id': {'value': '$dict_content.root.a', 'data': '$_id'}}})
+        self.assertEqual(facet[2], {'$group': {'_id': '$_id.value', 'count': {'$sum': 1}}})
+
+    @patch.object(Data, 'aggregate')
+    def test_get_facets_returns_counts_by_path(self, mock_aggregate):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_aggregate.return_value = iter([{'0': [{'_id': 'a', 'count': 2}, {'_id': 'b', 'count': 1}], '1': []}])
+        # Act
+        facets = data_api.get_facets({}, ['dict_content.root.a', 'dict_content.root.b'], mock_user)
+        # Assert
+        self.assertEqual(facets, OrderedDict([('dict_content.root.a', [{'value': 'a', 'count': 2},
+                                                                       {'value': 'b', 'count': 1}]),
+                                              ('dict_content.root.b', [])]))
+
+    @patch.object(Data, 'aggregate')
+    @patch('core_main_app.components.workspace.api.get_all_workspace_ids_with_read_access_by_user')
+    def test_get_facets_counts_accessible_data_only(self, mock_get_workspace_ids, mock_aggregate):
+        # Arrange
+        mock_user = create_mock_user('1')
+        mock_get_workspace_ids.return_value = []
+        mock_aggregate.return_value = iter([])
+        # Act
+        data_api.get_facets({'title': 'title'}, ['dict_content.root.a'], mock_user)
+        # Assert
+        match = mock_aggregate.call_args[0][0][0]['$match']
+        self.assertEqual(match['$and'][0], {'title': 'title'})
+        self.assertEqual(match['$and'][1]['$or'][1], {'user_id': '1'})
+
+
+class TestDataExecuteTextQuery(TestCase):
+
+    @patch.object(Data, 'objects')
+    def test_execute_text_query_returns_truncated_when_more_data_than_max_results(self, mock_objects):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        queryset = mock_objects.return_value.search_text.return_value.order_by.return_value
+        queryset.limit.return_value.scalar.return_value = ['1', '2', '3']
+        # Act
+        data_list, truncated = data_api.execute_text_query({}, '"value"', mock_user, 2)
+        # Assert
+        self.assertTrue(truncated)
+        queryset.limit.assert_called_with(3)
+        queryset.filter.assert_called_with(pk__in=['1', '2'])
+        self.assertEqual(data_list, queryset.filter.return_value)
+
+    @patch.object(Data, 'objects')
+    def test_execute_text_query_returns_not_truncated_when_all_data_fit(self, mock_objects):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        queryset = mock_objects.return_value.search_text.return_value.order_by.return_value
+        queryset.limit.return_value.scalar.return_value = ['1', '2']
+        # Act
+        data_list, truncated = data_api.execute_text_query({}, '"value"', mock_user, 2)
+        # Assert
+        self.assertFalse(truncated)
+        queryset.filter.assert_called_with(pk__in=['1', '2'])
+
+    @patch.object(Data, 'objects')
+    def test_execute_text_query_without_max_results_is_not_truncated(self, mock_objects):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        queryset = mock_objects.return_value.search_text.return_value.order_by.return_value
+        # Act
+        data_list, truncated = data_api.execute_text_query({}, '"value"', mock_user)
+        # Assert
+        self.assertFalse(truncated)
+        self.assertEqual(data_list, queryset)
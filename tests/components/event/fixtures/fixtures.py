@@ -0,0 +1,24 @@
+""" Fixtures files for Event
+"""
+import datetime
+
+from bson.objectid import ObjectId
+
+from core_main_app.components.event.models import Event
+from core_main_app.utils.integration_tests.fixture_interface import FixtureInterface
+
+
+class EventFixtures(FixtureInterface):
+    """ Event Fixture
+    """
+    event_collection = None
+
+    def insert_data(self):
+        """ Insert a set of events.
+
+        Returns:
+
+        """
+        self.event_collection = [Event(event_type='data_created', object_id=ObjectId(), user_id='1',
+                                       date=datetime.datetime(2018, 1, 1)).save()
+                                 for _ in range(3)]
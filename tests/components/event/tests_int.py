@@ -0,0 +1,73 @@
+""" Integration Test for Event API
+"""
+import datetime
+
+from bson.objectid import ObjectId
+
+from core_main_app.components.event.models import Event
+from core_main_app.components.event import api as event_api
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from tests.components.event.fixtures.fixtures import EventFixtures
+
+fixture_event = EventFixtures()
+
+
+class TestEventGetAllAfter(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_event
+
+    def test_get_all_after_returns_events_in_order_of_insertion(self):
+        # Act
+        result = event_api.get_all_after()
+        # Assert
+        self.assertEqual([event.id for event in result], [event.id for event in self.fixture.event_collection])
+
+    def test_get_all_after_sequence_returns_following_events(self):
+        # Act
+        result = event_api.get_all_after(self.fixture.event_collection[0].sequence)
+        # Assert
+        self.assertEqual([event.id for event in result], [event.id for event in self.fixture.event_collection[1:]])
+
+    def test_get_all_after_returns_at_most_limit_events(self):
+        # Act
+        result = event_api.get_all_after(limit=2)
+        # Assert
+        self.assertEqual([event.id for event in result], [event.id for event in self.fixture.event_collection[:2]])
+
+    def test_events_have_increasing_sequence_numbers(self):
+        # Act
+        sequences = [event.sequence for event in self.fixture.event_collection]
+        # Assert
+        self.assertEqual(sequences, sorted(set(sequences)))
+
+    def test_get_all_after_stops_at_missing_sequence_before_recent_event(self):
+        # Arrange
+        last_sequence = self.fixture.event_collection[-1].sequence
+        _insert_event(last_sequence + 2, datetime.datetime.utcnow())
+        # Act
+        result = event_api.get_all_after(self.fixture.event_collection[0].sequence)
+        # Assert
+        self.assertEqual([event.id for event in result], [event.id for event in self.fixture.event_collection[1:]])
+
+    def test_get_all_after_returns_event_following_missing_sequence_once_stored(self):
+        # Arrange
+        last_sequence = self.fixture.event_collection[-1].sequence
+        _insert_event(last_sequence + 2, datetime.datetime.utcnow())
+        _insert_event(last_sequence + 1, datetime.datetime.utcnow())
+        # Act
+        result = event_api.get_all_after(last_sequence)
+        # Assert
+        self.assertEqual([event.sequence for event in result], [last_sequence + 1, last_sequence + 2])
+
+    def test_get_all_after_skips_missing_sequence_before_old_event(self):
+        # Arrange
+        last_sequence = self.fixture.event_collection[-1].sequence
+        _insert_event(last_sequence + 2, datetime.datetime(2018, 1, 2))
+        # Act
+        result = event_api.get_all_after(last_sequence)
+        # Assert
+        self.assertEqual([event.sequence for event in result], [last_sequence + 2])
+
+
+def _insert_event(sequence, date):
+    return Event(event_type='data_created', object_id=ObjectId(), user_id='1', date=date, sequence=sequence).save()
@@ -1,5 +1,7 @@
 """ Integration Test for Data Rest API
 """
+import datetime
+import json
 
 from mock import patch
 from rest_framework import status
@@ -9,6 +11,7 @@ from core_main_app.components.workspace.models import Workspace
 from core_main_app.rest.data import views as data_rest_views
 from core_main_app.utils.integration_tests.integration_base_test_case import \
     MongoIntegrationBaseTestCase
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import KeysetResultsSetPagination
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
 from core_main_app.utils.tests_tools.RequestMock import RequestMock
 from tests.components.data.fixtures.fixtures import DataFixtures, QueryDataFixtures, AccessControlDataFixture
@@ -94,6 +97,56 @@ class TestDataList(MongoIntegrationBaseTestCase):
         # Assert
         self.assertEqual(len(response.data), 0)
 
+    def test_get_with_fields_returns_only_requested_fields(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'fields': 'id,title'})
+
+        # Assert
+        self.assertEqual(set(response.data[0].keys()), {'id', 'title'})
+
+    def test_get_with_unknown_field_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'fields': 'id,dict_content'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_with_cursor_pagination_returns_page_of_data(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'pagination': 'cursor', 'count': 'true'})
+
+        # Assert
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_get_with_invalid_cursor_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'pagination': 'cursor', 'cursor': 'invalid'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_data_missing_field_returns_http_400(self):
         # Arrange
         user = create_mock_user('1')
@@ -340,6 +393,372 @@ class TestExecuteLocalQueryView(MongoIntegrationBaseTestCase):
         # Assert
         self.assertEqual(len(response.data), 0)
 
+    def test_post_query_with_fields_returns_only_requested_fields(self):
+        # Arrange
+        self.data.update({"query": "{\"root.element\": \"value\"}",
+                          "fields": "id,title,template"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(set(response.data[0].keys()), {'id', 'title', 'template'})
+
+    def test_post_query_with_stream_returns_one_json_line_per_data(self):
+        # Arrange
+        self.data.update({"query": "{\"$or\": [{\"root.element\": \"value\"}, {\"root.element\":\"value2\"}]}",
+                          "stream": "true",
+                          "fields": "id,title"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        lines = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(sorted(json.loads(line)['title'] for line in lines),
+                         sorted(data.title for data in self.fixture.data_collection))
+
+    def test_post_query_with_prefix_regex_returns_data_starting_with_prefix(self):
+        # Arrange
+        self.data.update({"query": "{\"root.element\": \"/^value/\"}"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(len(response.data), 2)
+
+    def test_post_query_with_count_only_returns_number_of_data(self):
+        # Arrange
+        self.data.update({"query": "{\"$or\": [{\"root.element\": \"value\"}, {\"root.element\":\"value2\"}]}",
+                          "options": "{\"count_only\": true}"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.data, {'count': 2})
+
+    def test_post_query_with_ids_only_returns_ids_of_data(self):
+        # Arrange
+        self.data.update({"query": "{\"root.element\": \"value\"}",
+                          "options": "{\"ids_only\": true}"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.data, [str(self.fixture.data_1.id)])
+
+    def test_post_query_with_ids_only_paginates_ids_of_data(self):
+        # Arrange
+        del self.data['all']
+        self.data.update({"query": "{}",
+                          "options": "{\"ids_only\": true}"})
+
+        # Act
+        with patch.object(KeysetResultsSetPagination, 'page_size', 1), \
+                patch('core_main_app.rest.data.abstract_views.get_request_paginator') as mock_get_request_paginator:
+            mock_get_request_paginator.return_value = KeysetResultsSetPagination()
+            response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                                   self.user,
+                                                   data=self.data)
+
+        # Assert
+        self.assertEqual(response.data['results'], [str(min(data.id for data in self.fixture.data_collection))])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_post_query_with_invalid_option_value_returns_http_400(self):
+        # Arrange
+        self.data.update({"query": "{}",
+                          "options": "{\"count_only\": \"maybe\"}"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestExecuteLocalKeywordQueryView(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_query
+
+    def setUp(self):
+        super(TestExecuteLocalKeywordQueryView, self).setUp()
+        self.data = {"all": "true", "query": "value other"}
+        self.user = create_mock_user('1', is_superuser=True)
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_searches_keywords_with_limit(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all(), False
+        self.data.update({"limit": 5})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_execute_text_query.assert_called_with({}, '"value" "other"', 5)
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_returns_score_of_data(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all(), False
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertTrue(all('score' in data for data in response.data))
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_limit_is_capped(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all(), False
+        self.data.update({"limit": 10})
+
+        # Act
+        with patch.object(data_rest_views, 'DATA_KEYWORD_QUERY_MAX_RESULTS', 3):
+            RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                        self.user,
+                                        data=self.data)
+
+        # Assert
+        mock_execute_text_query.assert_called_with({}, '"value" "other"', 3)
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_with_truncated_results_sets_truncated_header(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all(), True
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response['X-Results-Truncated'], 'true')
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_with_all_results_sets_not_truncated_header(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all(), False
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response['X-Results-Truncated'], 'false')
+
+    def test_post_with_invalid_limit_returns_http_400(self):
+        # Arrange
+        self.data.update({"limit": 0})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestExecuteLocalQueryExplainView(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_query
+
+    def setUp(self):
+        super(TestExecuteLocalQueryExplainView, self).setUp()
+        self.data = {"query": "{\"root.element\": \"/^value/\"}"}
+
+    @patch.object(Data, 'explain_query')
+    def test_post_returns_executed_query_and_summary(self, mock_explain_query):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        mock_explain_query.return_value = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryExplainView.as_view(),
+                                               user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['query'], {'dict_content.root.element': {'$regex': {'$regex': '^value',
+                                                                                           '$options': ''},
+                                                                                '$gte': 'value', '$lt': 'valuf'}})
+        self.assertTrue(response.data['summary']['collection_scan'])
+
+    def test_post_as_user_returns_http_403(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryExplainView.as_view(),
+                                               user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_post_for_unknown_user_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        self.data.update({"user": "-1"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryExplainView.as_view(),
+                                               user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestExecuteLocalQueryFacetView(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_query
+
+    @patch.object(Data, 'aggregate')
+    def test_post_returns_counts_by_path(self, mock_aggregate):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        mock_aggregate.return_value = iter([{'0': [{'_id': 'value', 'count': 2}]}])
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryFacetView.as_view(),
+                                               user,
+                                               data={"query": "{}", "facets": "[\"root.element\"]", "size": 3})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'root.element': [{'value': 'value', 'count': 2}]})
+        facet = mock_aggregate.call_args[0][0][1]['$facet']['0']
+        self.assertEqual(facet[0], {'$unwind': '$dict_content.root.element'})
+        self.assertEqual(facet[-1], {'$limit': 3})
+
+    @patch.object(Data, 'aggregate')
+    def test_post_with_count_only_returns_counts_by_path(self, mock_aggregate):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+        mock_aggregate.return_value = iter([{'0': [{'_id': 'value', 'count': 2}]}])
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryFacetView.as_view(),
+                                               user,
+                                               data={"query": "{}", "facets": "[\"root.element\"]",
+                                                     "options": "{\"count_only\": true}"})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'root.element': [{'value': 'value', 'count': 2}]})
+
+    def test_post_without_facets_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryFacetView.as_view(),
+                                               user,
+                                               data={"query": "{}"})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_with_invalid_size_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryFacetView.as_view(),
+                                               user,
+                                               data={"query": "{}", "facets": "[\"root.element\"]", "size": 0})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestDataChangeList(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def setUp(self):
+        super(TestDataChangeList, self).setUp()
+        self.user = create_mock_user('1', is_superuser=True)
+        for index, data in enumerate(self.fixture.data_collection):
+            data.last_modification_date = datetime.datetime(2018, 1, index + 1)
+            data.save()
+
+    def test_get_returns_changes_and_resume_token(self):
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([change['id'] for change in response.data['results']],
+                         [str(data.id) for data in self.fixture.data_collection])
+        self.assertFalse(any(change['deleted'] for change in response.data['results']))
+        self.assertIsNotNone(response.data['resume_token'])
+
+    def test_get_with_resume_token_returns_following_changes(self):
+        # Arrange
+        with patch.object(data_rest_views, 'DATA_CHANGES_PAGE_SIZE', 1):
+            first_response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user)
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user,
+                                              data={'cursor': first_response.data['resume_token']})
+
+        # Assert
+        self.assertIsNotNone(first_response.data['next'])
+        self.assertEqual([change['id'] for change in response.data['results']],
+                         [str(data.id) for data in self.fixture.data_collection[1:]])
+
+    def test_get_since_date_returns_changes_from_date(self):
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user,
+                                              data={'since': '2018-01-02T00:00:00Z'})
+
+        # Assert
+        self.assertEqual([change['id'] for change in response.data['results']],
+                         [str(data.id) for data in self.fixture.data_collection[1:]])
+
+    def test_get_with_invalid_date_returns_http_400(self):
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user,
+                                              data={'since': 'yesterday'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_with_cursor_of_other_ordering_returns_http_400(self):
+        # Arrange
+        cursor = KeysetResultsSetPagination().encode_cursor('id', [self.fixture.data_collection[0].id])
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataChangeList.as_view(), self.user,
+                                              data={'cursor': cursor})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class TestDataAssign(MongoIntegrationBaseTestCase):
     fixture = fixture_data_workspace
@@ -1,12 +1,15 @@
 """Unit tests for data rest api
 """
 from django.test import SimpleTestCase
-from mock.mock import patch
+from mock.mock import patch, Mock
+from pymongo.errors import OperationFailure
 from rest_framework import status
 
 from core_main_app.commons.exceptions import DoesNotExist
 from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
 from core_main_app.rest.data import views as data_rest_views
+from core_main_app.rest.data.serializers import iter_data_ndjson
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
 from core_main_app.utils.tests_tools.RequestMock import RequestMock
 
@@ -126,3 +129,192 @@ class TestDataDownload(SimpleTestCase):
 
         # Assert
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(Data, 'get_by_id')
+    def test_get_streams_xml_content(self, mock_get_by_id):
+        # Arrange
+        mock_user = create_mock_user('1')
+        data = Data(user_id='1', title='test')
+        data.xml_content = u'<tag>value</tag>'
+        mock_get_by_id.return_value = data
+
+        # Mock
+        response = RequestMock.do_request_get(data_rest_views.DataDownload.as_view(),
+                                              mock_user,
+                                              param={'pk': '1'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(''.join(response.streaming_content), '<tag>value</tag>')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=test.xml')
+
+
+class TestIterDataNdjson(SimpleTestCase):
+    def setUp(self):
+        self.data_list = [Data(id='5a8d5f6e9a4b1f0b3c000001', title='title 1'),
+                          Data(id='5a8d5f6e9a4b1f0b3c000002', title='title 2'),
+                          Data(id='5a8d5f6e9a4b1f0b3c000003', title='title 3')]
+        self.data_queryset = Mock()
+        self.data_queryset.no_cache.return_value.batch_size.return_value = iter(self.data_list)
+
+    @patch('core_main_app.components.data.api.prefetch_xml_content')
+    def test_iter_data_ndjson_returns_one_line_per_data(self, mock_prefetch_xml_content):
+        # Act
+        lines = list(iter_data_ndjson(self.data_queryset, ['title'], 2))
+
+        # Assert
+        self.assertEqual(lines, ['{"title": "title 1"}\n', '{"title": "title 2"}\n', '{"title": "title 3"}\n'])
+
+    @patch('core_main_app.components.data.api.prefetch_xml_content')
+    def test_iter_data_ndjson_reads_xml_content_by_batch(self, mock_prefetch_xml_content):
+        # Act
+        list(iter_data_ndjson(self.data_queryset, ['xml_content'], 2))
+
+        # Assert
+        self.assertEqual([call[0][0] for call in mock_prefetch_xml_content.call_args_list],
+                         [self.data_list[:2], self.data_list[2:]])
+
+
+class TestDataIndexList(SimpleTestCase):
+    @patch('core_main_app.utils.databases.indexes.get_dict_content_indexes')
+    def test_get_returns_http_200_for_superuser(self, mock_get_dict_content_indexes):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_get_dict_content_indexes.return_value = [{'name': 'dict_content.root.element_1'}]
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataIndexList.as_view(), mock_user)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'name': 'dict_content.root.element_1'}])
+
+    def test_get_returns_http_403_for_user(self):
+        # Arrange
+        mock_user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataIndexList.as_view(), mock_user)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch('core_main_app.utils.databases.indexes.create_dict_content_indexes')
+    @patch('core_main_app.components.template.api.get')
+    def test_post_returns_http_201_for_superuser(self, mock_get_template, mock_create_dict_content_indexes):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_get_template.return_value = Template(content='<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                                          '<xs:element name="root" type="xs:string"/>'
+                                                          '</xs:schema>')
+        mock_create_dict_content_indexes.return_value = ['dict_content.root_1']
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataIndexList.as_view(), mock_user,
+                                               data={'template': '1', 'paths': '["root"]'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, ['dict_content.root_1'])
+
+    def test_post_returns_http_400_if_template_not_provided(self):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataIndexList.as_view(), mock_user, data={})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('core_main_app.components.template.api.get')
+    def test_post_returns_http_400_if_path_not_in_template(self, mock_get_template):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_get_template.return_value = Template(content='<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                                          '<xs:element name="root" type="xs:string"/>'
+                                                          '</xs:schema>')
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataIndexList.as_view(), mock_user,
+                                               data={'template': '1', 'paths': '["unknown"]'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_returns_http_400_if_paths_not_provided(self):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataIndexList.as_view(), mock_user,
+                                               data={'template': '1'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('core_main_app.components.template.api.get')
+    def test_post_returns_http_404_if_template_not_found(self, mock_get_template):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_get_template.side_effect = DoesNotExist("error")
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataIndexList.as_view(), mock_user,
+                                               data={'template': '1', 'paths': '["root"]'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestDataIndexDetail(SimpleTestCase):
+    @patch('core_main_app.utils.databases.indexes.drop_dict_content_index')
+    def test_delete_returns_http_204_for_superuser(self, mock_drop_dict_content_index):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_delete(data_rest_views.DataIndexDetail.as_view(), mock_user,
+                                                 param={'path': 'root.element'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(mock_drop_dict_content_index.call_args[0][1], 'root.element')
+
+    def test_delete_returns_http_403_for_user(self):
+        # Arrange
+        mock_user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_delete(data_rest_views.DataIndexDetail.as_view(), mock_user,
+                                                 param={'path': 'root.element'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch('core_main_app.utils.databases.indexes.drop_dict_content_index')
+    def test_delete_returns_http_404_if_index_not_found(self, mock_drop_dict_content_index):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_drop_dict_content_index.side_effect = OperationFailure("index not found with name", code=27)
+
+        # Act
+        response = RequestMock.do_request_delete(data_rest_views.DataIndexDetail.as_view(), mock_user,
+                                                 param={'path': 'root.element'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('core_main_app.utils.databases.indexes.drop_dict_content_index')
+    def test_delete_returns_http_500_if_other_database_error(self, mock_drop_dict_content_index):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        mock_drop_dict_content_index.side_effect = OperationFailure("not authorized", code=13)
+
+        # Act
+        response = RequestMock.do_request_delete(data_rest_views.DataIndexDetail.as_view(), mock_user,
+                                                 param={'path': 'root.element'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,20 +1,20 @@
 """Query tool unit tests
 """
-from core_main_app.utils.query.mongo.prepare import _compile_regex, _add_sub_document_root
+from core_main_app.utils.query.mongo.prepare import prepare_query, compile_query, prepared_query_cache
 from unittest import TestCase
 import copy
 import re
 
 
-class TestCompileRegex(TestCase):
+class TestPrepareQueryCompilesRegex(TestCase):
 
     def test_query_with_regex_returns_query_with_compiled_regex(self):
         # set query
         query = {"dot.notation": "/regex/"}
-        # compile regex
-        _compile_regex(query)
+        # prepare query
+        prepared_query = prepare_query(query, regex=True)
         # assert
-        self.assertTrue(isinstance(query["dot.notation"], re._pattern_type))
+        self.assertEquals(prepared_query, {"dot.notation": re.compile("regex")})
 
     def test_query_with_regex_on_multiple_levels_returns_query_with_compiled_regex(self):
         # set query
@@ -24,66 +24,65 @@ class TestCompileRegex(TestCase):
                         {"$or": [{"dot.notation.2": {"$lt": 500}}, {"dot.notation.2": {"$lt": 500}}]}
                      ]
                  }
-        # compile regex
-        _compile_regex(query)
+        # set expected query
+        expected_query = {"$and":
+                              [
+                                 {"$or": [{"dot.notation.1": re.compile("regex")},
+                                          {"dot.notation.1.#text": re.compile("regex")}]},
+                                 {"$or": [{"dot.notation.2": {"$lt": 500}}, {"dot.notation.2": {"$lt": 500}}]}
+                              ]
+                          }
+        # prepare query
+        prepared_query = prepare_query(query, regex=True)
         # assert
-        self.assertTrue(isinstance(query["$and"][0]["$or"][0]["dot.notation.1"], re._pattern_type))
-        self.assertTrue(isinstance(query["$and"][0]["$or"][1]["dot.notation.1.#text"], re._pattern_type))
-        self.assertFalse(isinstance(query["$and"][1]["$or"][0]["dot.notation.2"], re._pattern_type))
-        self.assertFalse(isinstance(query["$and"][1]["$or"][1]["dot.notation.2"], re._pattern_type))
+        self.assertEquals(prepared_query, expected_query)
 
     def test_query_without_regex_returns_same_query(self):
         # set query
         query = {"dot.notation": {"$gt": 0}}
-        # save original query
-        query_origin = copy.deepcopy(query)
-        # compile regex
-        _compile_regex(query)
+        # prepare query
+        prepared_query = prepare_query(query, regex=True)
         # assert
-        self.assertEquals(query, query_origin)
+        self.assertEquals(prepared_query, {"dot.notation": {"$gt": 0}})
 
     def test_query_without_regex_on_multiple_levels_returns_same_query(self):
         # set query
         query = {"$or": [{"dot.notation": {"$gt": 0}}, {"dot.notation.#text": {"$gt": 0}}]}
-        # save original query
-        query_origin = copy.deepcopy(query)
-        # compile regex
-        _compile_regex(query)
+        # prepare query
+        prepared_query = prepare_query(query, regex=True)
         # assert
-        self.assertEquals(query, query_origin)
+        self.assertEquals(prepared_query, {"$or": [{"dot.notation": {"$gt": 0}}, {"dot.notation.#text": {"$gt": 0}}]})
 
 
-class TestAddSubDocumentRoot(TestCase):
+class TestPrepareQueryAddsSubDocumentRoot(TestCase):
 
     def test_add_sub_document_root_to_query(self):
         # set query
         query = {"dot.notation": "test"}
-        # set expected query
-        expected_query = {"root.dot.notation": "test"}
-        # compile regex
-        _add_sub_document_root(query, "root")
+        # prepare query
+        prepared_query = prepare_query(query, regex=False, sub_document_root="root")
         # assert
-        self.assertEquals(query, expected_query)
+        self.assertEquals(prepared_query, {"root.dot.notation": "test"})
 
     def test_add_sub_document_root_to_and_query(self):
         # set query
         query = {"$and": [{"dot.notation": {"$gt": 0}}, {"dot.notation.#text": {"$gt": 0}}]}
         # set expected query
         expected_query = {"$and": [{"root.dot.notation": {"$gt": 0}}, {"root.dot.notation.#text": {"$gt": 0}}]}
-        # compile regex
-        _add_sub_document_root(query, "root")
+        # prepare query
+        prepared_query = prepare_query(query, regex=False, sub_document_root="root")
         # assert
-        self.assertEquals(query, expected_query)
+        self.assertEquals(prepared_query, expected_query)
 
     def test_add_sub_document_root_to_or_query(self):
         # set query
         query = {"$or": [{"dot.notation": {"$gt": 0}}, {"dot.notation.#text": {"$gt": 0}}]}
         # set expected query
         expected_query = {"$or": [{"root.dot.notation": {"$gt": 0}}, {"root.dot.notation.#text": {"$gt": 0}}]}
-        # compile regex
-        _add_sub_document_root(query, "root")
+        # prepare query
+        prepared_query = prepare_query(query, regex=False, sub_document_root="root")
         # assert
-        self.assertEquals(query, expected_query)
+        self.assertEquals(prepared_query, expected_query)
 
     def test_add_sub_document_root_to_and_or_query(self):
         # set query
@@ -100,7 +99,81 @@ class TestAddSubDocumentRoot(TestCase):
                                 {"$or": [{"root.dot.notation.2": {"$lt": 500}}, {"root.dot.notation.2": {"$lt": 500}}]}
                              ]
                          }
-        # compile regex
-        _add_sub_document_root(query, "root")
+        # prepare query
+        prepared_query = prepare_query(query, regex=False, sub_document_root="root")
+        # assert
+        self.assertEquals(prepared_query, expected_query)
+
+
+class TestPrepareQuery(TestCase):
+
+    def test_prepare_query_compiles_regex_and_adds_sub_document_root(self):
+        # set query
+        query = {"$and": [{"$or": [{"a": "/regex/"}, {"b": {"$in": ["/not_regex/"]}}]}, {"c": {"$lt": 500}}]}
+        # prepare query
+        prepared_query = prepare_query(query, regex=True, sub_document_root="root")
+        # assert
+        self.assertEquals(prepared_query["$and"][0]["$or"][0]["root.a"].pattern, "regex")
+        self.assertEquals(prepared_query["$and"][0]["$or"][1], {"root.b": {"$in": ["/not_regex/"]}})
+        self.assertEquals(prepared_query["$and"][1], {"root.c": {"$lt": 500}})
+
+    def test_prepare_query_does_not_modify_query(self):
+        # set query
+        query = {"$or": [{"a": "/regex/"}, {"b": {"c": "test"}}]}
+        expected_query = copy.deepcopy(query)
+        # prepare query
+        prepare_query(query, regex=True, sub_document_root="root")
         # assert
         self.assertEquals(query, expected_query)
+
+    def test_prepare_query_compiles_regex_of_operators_and_keeps_operator_keys(self):
+        # set query
+        query = {"$and": [{"a": "/regex/"}, {"b": {"$not": "/regex/", "$and": [{"c": "/regex/"}]}}],
+                 "$where": "test"}
+        # set expected query
+        expected_query = {"$and": [{"root.a": re.compile("regex")},
+                                   {"root.b": {"$not": re.compile("regex"), "$and": [{"c": re.compile("regex")}]}}],
+                          "$where": "test"}
+        # prepare query
+        prepared_query = prepare_query(query, regex=True, sub_document_root="root")
+        # assert
+        self.assertEquals(prepared_query, expected_query)
+
+
+class TestCompileQuery(TestCase):
+
+    def setUp(self):
+        prepared_query_cache.clear()
+
+    def test_compile_query_returns_shared_prepared_query(self):
+        # compile query twice
+        prepared_query_1 = compile_query('{"a": "/regex/"}', sub_document_root="root")
+        prepared_query_2 = compile_query('{"a": "/regex/"}', sub_document_root="root")
+        # assert
+        self.assertIs(prepared_query_1, prepared_query_2)
+        self.assertTrue(isinstance(prepared_query_1["root.a"], re._pattern_type))
+
+    def test_compile_query_with_other_sub_document_root_returns_other_query(self):
+        # compile query with two roots
+        prepared_query = compile_query('{"a": 1}', sub_document_root="other")
+        # assert
+        self.assertEquals(prepared_query, {"other.a": 1})
+
+    def test_compiled_query_can_not_be_modified(self):
+        # compile query
+        prepared_query = compile_query('{"$or": [{"a": 1}]}')
+        # assert
+        with self.assertRaises(TypeError):
+            prepared_query["b"] = 2
+        with self.assertRaises(TypeError):
+            prepared_query["$or"].append({"b": 2})
+
+    def test_deep_copy_of_compiled_query_can_be_modified(self):
+        # compile query
+        prepared_query = compile_query('{"$or": [{"a": "/regex/"}]}')
+        # copy and modify query
+        query = copy.deepcopy(prepared_query)
+        query["$or"].append({"b": 2})
+        # assert
+        self.assertEquals(len(prepared_query["$or"]), 1)
+        self.assertIs(query["$or"][0]["a"], prepared_query["$or"][0]["a"])
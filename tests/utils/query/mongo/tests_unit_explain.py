@@ -0,0 +1,50 @@
+"""Query explain unit tests
+"""
+from unittest import TestCase
+
+from core_main_app.utils.query.mongo.explain import get_execution_summary
+
+EXPLAIN_OUTPUT = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "FETCH",
+            "inputStage": {
+                "stage": "OR",
+                "inputStages": [
+                    {"stage": "IXSCAN", "indexName": "workspace_1"},
+                    {"stage": "IXSCAN", "indexName": "user_id_1"},
+                ]
+            }
+        }
+    },
+    "executionStats": {
+        "nReturned": 2,
+        "executionTimeMillis": 3,
+        "totalKeysExamined": 4,
+        "totalDocsExamined": 5,
+    }
+}
+
+
+class TestGetExecutionSummary(TestCase):
+
+    def test_summary_returns_indexes_of_all_input_stages(self):
+        # get summary
+        summary = get_execution_summary(EXPLAIN_OUTPUT)
+        # assert
+        self.assertEquals(summary["indexes"], ["user_id_1", "workspace_1"])
+        self.assertFalse(summary["collection_scan"])
+
+    def test_summary_returns_execution_statistics(self):
+        # get summary
+        summary = get_execution_summary(EXPLAIN_OUTPUT)
+        # assert
+        self.assertEquals((summary["keys_examined"], summary["documents_examined"], summary["documents_returned"]),
+                          (4, 5, 2))
+
+    def test_summary_of_collection_scan_returns_no_index(self):
+        # get summary
+        summary = get_execution_summary({"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}})
+        # assert
+        self.assertEquals(summary["indexes"], [])
+        self.assertTrue(summary["collection_scan"])
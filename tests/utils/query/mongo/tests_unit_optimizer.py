@@ -0,0 +1,135 @@
+"""Query optimizer unit tests
+"""
+import operator
+import re
+from unittest import TestCase
+
+from core_main_app.utils.query.mongo.optimizer import optimize_query, explain_query, get_regex_prefix, \
+    get_prefix_upper_bound
+
+
+class TestGetRegexPrefix(TestCase):
+
+    def test_anchored_literal_returns_prefix_only(self):
+        self.assertEquals(get_regex_prefix("^NIST-"), ("NIST-", True))
+
+    def test_anchored_literal_followed_by_any_characters_returns_prefix_only(self):
+        self.assertEquals(get_regex_prefix("^NIST.*"), ("NIST", True))
+
+    def test_escaped_characters_are_part_of_prefix(self):
+        self.assertEquals(get_regex_prefix("\\Aa\\.b"), ("a.b", True))
+
+    def test_anchored_pattern_returns_prefix_before_special_characters(self):
+        self.assertEquals(get_regex_prefix("^NIST-[0-9]+"), ("NIST-", False))
+
+    def test_optional_character_is_not_part_of_prefix(self):
+        self.assertEquals(get_regex_prefix("^abc?"), ("ab", False))
+
+    def test_unanchored_pattern_returns_no_prefix(self):
+        self.assertEquals(get_regex_prefix("NIST"), (None, False))
+
+    def test_top_level_alternation_returns_no_prefix(self):
+        self.assertEquals(get_regex_prefix("^a|b"), (None, False))
+
+    def test_group_alternation_returns_prefix(self):
+        self.assertEquals(get_regex_prefix("^a(b|c)"), ("a", False))
+
+
+class TestGetPrefixUpperBound(TestCase):
+
+    def test_upper_bound_increments_last_character(self):
+        self.assertEquals(get_prefix_upper_bound("NIST-"), u"NIST.")
+
+    def test_empty_prefix_has_no_upper_bound(self):
+        self.assertIsNone(get_prefix_upper_bound(""))
+
+
+class TestOptimizeQuery(TestCase):
+
+    def test_prefix_regex_is_completed_with_range(self):
+        # set query
+        regex = re.compile("^NIST-")
+        query = {"dict_content.root.id": regex}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertEquals(optimized_query, {"dict_content.root.id": {"$regex": regex, "$gte": "NIST-",
+                                                                     "$lt": u"NIST."}})
+
+    def test_prefix_regex_operator_is_completed_with_range(self):
+        # set query
+        query = {"$and": [{"$or": [{"root.id": {"$regex": "^ab", "$options": "s"}}]}]}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertEquals(optimized_query, {"$and": [{"$or": [{"root.id": {"$regex": "^ab", "$options": "s",
+                                                                           "$gte": "ab", "$lt": u"ac"}}]}]})
+
+    def test_prefix_regex_does_not_match_array_with_values_in_range_but_without_prefix(self):
+        # set query: "NIST." is greater than the range and "A" lower, each value satisfies one of the bounds
+        query = {"root.id": re.compile("^NIST-")}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertFalse(criteria_matches_array(optimized_query["root.id"], ["NIST.", "A"]))
+
+    def test_prefix_regex_matches_array_with_value_starting_with_prefix(self):
+        # set query
+        query = {"root.id": re.compile("^NIST-")}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertTrue(criteria_matches_array(optimized_query["root.id"], ["A", "NIST-1"]))
+
+    def test_case_insensitive_regex_is_not_rewritten(self):
+        # set query
+        query = {"root.id": {"$regex": "^ab", "$options": "i"}}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertEquals(optimized_query, query)
+
+    def test_unanchored_regex_is_not_rewritten(self):
+        # set query
+        query = {"root.id": re.compile("NIST")}
+        # optimize query
+        optimized_query = optimize_query(query)
+        # assert
+        self.assertEquals(optimized_query, query)
+
+    def test_optimize_query_does_not_modify_query(self):
+        # set query
+        query = {"$or": [{"root.id": re.compile("^NIST")}]}
+        # optimize query
+        optimize_query(query)
+        # assert
+        self.assertEquals(query["$or"][0]["root.id"].pattern, "^NIST")
+
+
+class TestExplainQuery(TestCase):
+
+    def test_explain_query_returns_status_of_each_regex(self):
+        # set query
+        query = {"$and": [{"a": re.compile("^NIST")}, {"b": re.compile("^NIST[0-9]")}, {"c": re.compile("NIST")},
+                          {"d": 1}]}
+        # explain query
+        report = explain_query(query)
+        # assert
+        self.assertEquals([(entry["path"], entry["status"]) for entry in report],
+                          [("a", "range"), ("b", "prefix"), ("c", "scan")])
+
+
+def criteria_matches_array(criteria, values):
+    """Returns True if the criteria on a field match an array, each operator being satisfied by any of its values.
+
+    Args:
+        criteria:
+        values:
+
+    Returns:
+
+    """
+    operators = {"$regex": lambda value, regex: re.search(regex, value) is not None,
+                 "$gte": operator.ge,
+                 "$lt": operator.lt}
+    return all(any(operators[name](value, argument) for value in values) for name, argument in criteria.items())
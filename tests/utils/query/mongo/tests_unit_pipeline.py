@@ -0,0 +1,75 @@
+"""Aggregation pipeline tools unit tests
+"""
+from unittest import TestCase
+
+from core_main_app.utils.query.mongo.pipeline import optimize_pipeline, limit_pipeline_results, \
+    get_pipeline_stage_names
+
+
+class TestOptimizePipeline(TestCase):
+
+    def test_match_is_moved_before_sort(self):
+        pipeline = [{"$sort": {"title": 1}}, {"$match": {"title": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline), [{"$match": {"title": "a"}}, {"$sort": {"title": 1}}])
+
+    def test_consecutive_matches_are_merged(self):
+        pipeline = [{"$match": {"title": "a"}}, {"$match": {"template": "b"}}]
+        self.assertEquals(optimize_pipeline(pipeline),
+                          [{"$match": {"$and": [{"title": "a"}, {"template": "b"}]}}])
+
+    def test_match_is_moved_before_inclusion_project_keeping_its_fields(self):
+        pipeline = [{"$project": {"dict_content.root": 1}}, {"$match": {"dict_content.root.a": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline),
+                          [{"$match": {"dict_content.root.a": "a"}}, {"$project": {"dict_content.root": 1}}])
+
+    def test_match_is_moved_before_exclusion_project_not_removing_its_fields(self):
+        pipeline = [{"$project": {"xml_file": 0}}, {"$match": {"title": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline), [{"$match": {"title": "a"}}, {"$project": {"xml_file": 0}}])
+
+    def test_match_is_not_moved_before_project_removing_its_fields(self):
+        pipeline = [{"$project": {"template": 1}}, {"$match": {"title": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline), pipeline)
+
+    def test_match_is_not_moved_before_project_computing_fields(self):
+        pipeline = [{"$project": {"title": {"$toLower": "$title"}}}, {"$match": {"title": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline), pipeline)
+
+    def test_match_is_not_moved_before_unwind(self):
+        pipeline = [{"$unwind": "$list"}, {"$match": {"list": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline), pipeline)
+
+    def test_match_with_expr_is_not_moved(self):
+        pipeline = [{"$sort": {"title": 1}}, {"$match": {"$expr": {"$eq": ["$title", "a"]}}}]
+        self.assertEquals(optimize_pipeline(pipeline), pipeline)
+
+    def test_match_is_merged_into_first_match_before_sort(self):
+        pipeline = [{"$match": {"user_id": "1"}}, {"$sort": {"title": 1}}, {"$match": {"title": "a"}}]
+        self.assertEquals(optimize_pipeline(pipeline),
+                          [{"$match": {"$and": [{"user_id": "1"}, {"title": "a"}]}}, {"$sort": {"title": 1}}])
+
+    def test_pipeline_is_not_modified(self):
+        pipeline = [{"$sort": {"title": 1}}, {"$match": {"title": "a"}}]
+        optimize_pipeline(pipeline)
+        self.assertEquals(pipeline, [{"$sort": {"title": 1}}, {"$match": {"title": "a"}}])
+
+
+class TestLimitPipelineResults(TestCase):
+
+    def test_limit_is_appended(self):
+        self.assertEquals(limit_pipeline_results([{"$match": {}}], 10), [{"$match": {}}, {"$limit": 10}])
+
+    def test_no_limit_when_max_results_is_none(self):
+        self.assertEquals(limit_pipeline_results([{"$match": {}}], None), [{"$match": {}}])
+
+    def test_no_limit_after_out(self):
+        self.assertEquals(limit_pipeline_results([{"$out": "collection"}], 10), [{"$out": "collection"}])
+
+
+class TestGetPipelineStageNames(TestCase):
+
+    def test_returns_stage_names(self):
+        self.assertEquals(get_pipeline_stage_names([{"$match": {}}, {"$limit": 1}]), {"$match", "$limit"})
+
+    def test_returns_stage_names_of_facets(self):
+        pipeline = [{"$facet": {"a": [{"$lookup": {}}], "b": [{"$count": "count"}]}}]
+        self.assertEquals(get_pipeline_stage_names(pipeline), {"$facet", "$lookup", "$count"})
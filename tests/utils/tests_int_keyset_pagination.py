@@ -0,0 +1,113 @@
+""" Integration tests of the keyset pagination
+"""
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core_main_app.components.data.models import Data
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import KeysetResultsSetPagination
+from tests.components.data.fixtures.fixtures import DataFixtures
+
+
+class KeysetDataFixtures(DataFixtures):
+    """ Data fixtures, with modification dates
+    """
+
+    def generate_data_collection(self):
+        """ Generate a Data collection.
+
+        Returns:
+
+        """
+        self.data_collection = [
+            Data(template=self.template, user_id='1', title='title', last_modification_date=date).save()
+            for date in [datetime(2018, 1, 2), None, datetime(2018, 1, 1), datetime(2018, 1, 2)]
+        ]
+
+
+class TestKeysetResultsSetPagination(MongoIntegrationBaseTestCase):
+    fixture = KeysetDataFixtures()
+
+    def test_pages_follow_id_ordering(self):
+        # Arrange
+        expected_ids = sorted(data.id for data in self.fixture.data_collection)
+        # Act
+        ids = [data.id for data in _get_all_pages({})]
+        # Assert
+        self.assertEqual(ids, expected_ids)
+
+    def test_pages_follow_last_modification_date_ordering(self):
+        # Arrange
+        expected_ids = [data.id for data in sorted(self.fixture.data_collection,
+                                                   key=lambda data: (data.last_modification_date is not None,
+                                                                  data.last_modification_date, data.id))]
+        # Act
+        ids = [data.id for data in _get_all_pages({'ordering': 'last_modification_date'})]
+        # Assert
+        self.assertEqual(ids, expected_ids)
+
+    def test_count_is_only_returned_when_requested(self):
+        # Arrange
+        paginator = KeysetResultsSetPagination()
+        # Act
+        paginator.paginate_queryset(Data.objects.all(), _get_request({}))
+        # Assert
+        self.assertNotIn('count', paginator.get_paginated_response([]).data)
+
+    def test_count_returns_total_number_of_documents(self):
+        # Arrange
+        paginator = KeysetResultsSetPagination()
+        # Act
+        paginator.paginate_queryset(Data.objects.all(), _get_request({'count': 'true'}))
+        # Assert
+        self.assertEqual(paginator.get_paginated_response([]).data['count'], 4)
+
+    def test_invalid_cursor_raises_validation_error(self):
+        # Arrange
+        paginator = KeysetResultsSetPagination()
+        # Act # Assert
+        with self.assertRaises(ValidationError):
+            paginator.paginate_queryset(Data.objects.all(), _get_request({'cursor': 'invalid'}))
+
+    def test_unknown_ordering_raises_validation_error(self):
+        # Arrange
+        paginator = KeysetResultsSetPagination()
+        # Act # Assert
+        with self.assertRaises(ValidationError):
+            paginator.paginate_queryset(Data.objects.all(), _get_request({'ordering': 'title'}))
+
+
+def _get_request(params):
+    """ Return a request with the given query parameters.
+
+    Args:
+        params:
+
+    Returns:
+
+    """
+    return Request(APIRequestFactory().get('/data/', params))
+
+
+def _get_all_pages(params):
+    """ Return the data of all the pages, following the next links, with one data per page.
+
+    Args:
+        params:
+
+    Returns:
+
+    """
+    results = []
+    request = _get_request(params)
+    while True:
+        paginator = KeysetResultsSetPagination()
+        paginator.page_size = 1
+        results.extend(paginator.paginate_queryset(Data.objects.all(), request))
+        next_link = paginator.get_next_link()
+        if next_link is None:
+            return results
+        request = Request(APIRequestFactory().get(next_link))
@@ -0,0 +1,85 @@
+"""
+    Events test class
+"""
+from unittest import TestCase
+
+from bson.objectid import ObjectId
+from mock import Mock, patch
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
+from core_main_app.utils import events
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestPublish(TestCase):
+    def setUp(self):
+        self.template = Template(id=ObjectId())
+        self.data = Data(id=ObjectId(), template=self.template, user_id='1')
+        self.user = create_mock_user('1')
+
+    def test_publish_dispatches_event_to_receivers_of_its_signal(self):
+        # Arrange
+        receiver = Mock()
+        events.data_created.connect(receiver, weak=False)
+        # Act
+        try:
+            events.publish(events.DATA_CREATED, self.data, self.user)
+        finally:
+            events.data_created.disconnect(receiver)
+        # Assert
+        receiver.assert_called_once_with(signal=events.data_created, sender=Data, instance=self.data, user=self.user)
+
+    def test_publish_does_not_dispatch_event_to_receivers_of_other_signals(self):
+        # Arrange
+        receiver = Mock()
+        events.data_deleted.connect(receiver, weak=False)
+        # Act
+        try:
+            events.publish(events.DATA_CREATED, self.data, self.user)
+        finally:
+            events.data_deleted.disconnect(receiver)
+        # Assert
+        self.assertFalse(receiver.called)
+
+    def test_publish_does_not_raise_errors_of_receivers(self):
+        # Arrange
+        receiver = Mock(side_effect=ValueError('error'))
+        events.data_updated.connect(receiver, weak=False)
+        # Act
+        try:
+            events.publish(events.DATA_UPDATED, self.data, self.user)
+        finally:
+            events.data_updated.disconnect(receiver)
+        # Assert
+        self.assertTrue(receiver.called)
+
+    @patch('core_main_app.components.event.api.insert')
+    def test_publish_does_not_store_event_if_outbox_disabled(self, mock_insert):
+        # Act
+        with patch.object(events, 'EVENT_OUTBOX_ENABLED', False):
+            events.publish(events.DATA_CREATED, self.data, self.user)
+        # Assert
+        self.assertFalse(mock_insert.called)
+
+    @patch('core_main_app.components.event.api.insert')
+    def test_publish_stores_event_with_ids_if_outbox_enabled(self, mock_insert):
+        # Act
+        with patch.object(events, 'EVENT_OUTBOX_ENABLED', True):
+            events.publish(events.DATA_CREATED, self.data, self.user)
+        # Assert
+        event = mock_insert.call_args[0][0]
+        self.assertEqual(event.event_type, events.DATA_CREATED)
+        self.assertEqual(event.object_id, self.data.id)
+        self.assertEqual(event.template, self.template.id)
+        self.assertEqual(event.user_id, '1')
+
+    @patch('core_main_app.components.event.api.insert')
+    def test_publish_does_not_raise_errors_of_outbox(self, mock_insert):
+        # Arrange
+        mock_insert.side_effect = Exception('error')
+        # Act
+        with patch.object(events, 'EVENT_OUTBOX_ENABLED', True):
+            events.publish(events.TEMPLATE_ADDED, self.template)
+        # Assert
+        self.assertTrue(mock_insert.called)
@@ -0,0 +1,146 @@
+"""
+    Index management test class
+"""
+from unittest import TestCase
+
+from mock import Mock
+from pymongo.errors import OperationFailure
+
+from core_main_app.utils.databases import indexes
+
+
+class TestGetIndexDrift(TestCase):
+    def setUp(self):
+        self.document_class = Mock()
+        self.document_class._get_collection.return_value.index_information.return_value = {
+            '_id_': {'key': [(u'_id', 1)]},
+            'user_id_1': {'key': [(u'user_id', 1)]},
+            'dict_content.root.element_1': {'key': [(u'dict_content.root.element', 1)]},
+        }
+
+    def test_get_index_drift_returns_declared_missing_indexes(self):
+        # Arrange
+        self.document_class.compare_indexes.return_value = {'missing': [[('template', 1)]], 'extra': []}
+        # Act
+        drift = indexes.get_index_drift(self.document_class)
+        # Assert
+        self.assertEqual(drift, {'missing': [[('template', 1)]], 'extra': []})
+
+    def test_get_index_drift_does_not_return_managed_indexes_as_extra(self):
+        # Arrange
+        managed_index_key = indexes.get_dict_content_index_key('root.element')
+        self.document_class.compare_indexes.return_value = {'missing': [],
+                                                            'extra': [[(u'dict_content.root.element', 1)]]}
+        # Act
+        drift = indexes.get_index_drift(self.document_class, [managed_index_key])
+        # Assert
+        self.assertEqual(drift, {'missing': [], 'extra': []})
+
+    def test_get_index_drift_returns_managed_missing_indexes(self):
+        # Arrange
+        managed_index_key = indexes.get_dict_content_index_key('root.other')
+        self.document_class.compare_indexes.return_value = {'missing': [], 'extra': []}
+        # Act
+        drift = indexes.get_index_drift(self.document_class, [managed_index_key])
+        # Assert
+        self.assertEqual(drift['missing'], [managed_index_key])
+
+
+class TestCreateDictContentIndexes(TestCase):
+    def test_create_dict_content_indexes_creates_one_index_per_path(self):
+        # Arrange
+        document_class = Mock()
+        # Act
+        indexes.create_dict_content_indexes(document_class, ['root.element', 'root.other'])
+        # Assert
+        document_class._get_collection.return_value.create_index.assert_any_call(
+            [('dict_content.root.element', 1)], background=True)
+        document_class._get_collection.return_value.create_index.assert_any_call(
+            [('dict_content.root.other', 1)], background=True)
+
+
+class TestGetTextIndexWeights(TestCase):
+    def test_get_text_index_weights_returns_paths_of_all_templates(self):
+        # Act
+        weights = indexes.get_text_index_weights({'a': {'root.title.#text': 10}, 'b': {'other.name': 2}})
+        # Assert
+        self.assertEqual(weights, {'dict_content.root.title.#text': 10, 'dict_content.other.name': 2})
+
+    def test_get_text_index_weights_keeps_highest_weight_of_path(self):
+        # Act
+        weights = indexes.get_text_index_weights({'a': {'root.title': 10}, 'b': {'root.title': 5}})
+        # Assert
+        self.assertEqual(weights, {'dict_content.root.title': 10})
+
+    def test_get_text_index_weights_returns_wildcard_if_no_path(self):
+        # Act # Assert
+        self.assertEqual(indexes.get_text_index_weights({}), {'$**': 1})
+
+
+class TestCreateTextIndex(TestCase):
+    def setUp(self):
+        self.document_class = Mock()
+        self.collection = self.document_class._get_collection.return_value
+        self.collection.index_information.return_value = {
+            '_id_': {'key': [(u'_id', 1)]},
+            '$**_text': {'key': [(u'_fts', u'text'), (u'_ftsx', 1)], 'weights': {u'$**': 1}},
+        }
+
+    def test_create_text_index_keeps_text_index_with_same_weights(self):
+        # Act
+        name = indexes.create_text_index(self.document_class, {'$**': 1})
+        # Assert
+        self.assertEqual(name, '$**_text')
+        self.assertFalse(self.collection.drop_index.called)
+        self.assertFalse(self.collection.create_index.called)
+
+    def test_create_text_index_replaces_text_index_with_other_weights(self):
+        # Act
+        indexes.create_text_index(self.document_class, {'dict_content.root.title': 10})
+        # Assert
+        self.collection.drop_index.assert_called_with('$**_text')
+        self.collection.create_index.assert_called_with([('dict_content.root.title', 'text')],
+                                                        weights={'dict_content.root.title': 10},
+                                                        default_language="en", language_override="en",
+                                                        background=True)
+
+
+class TestGetDictContentIndexes(TestCase):
+    def setUp(self):
+        self.document_class = Mock()
+        self.collection = self.document_class._get_collection.return_value
+        self.collection.index_information.return_value = {
+            '_id_': {'key': [(u'_id', 1)]},
+            'dict_content.root.element_1': {'key': [(u'dict_content.root.element', 1)]},
+        }
+
+    def test_get_dict_content_indexes_returns_only_dict_content_indexes_with_stats(self):
+        # Arrange
+        self.collection.aggregate.return_value = [
+            {'name': 'dict_content.root.element_1', 'accesses': {'ops': 3, 'since': None}},
+            {'name': '_id_', 'accesses': {'ops': 5, 'since': None}},
+        ]
+        # Act
+        result = indexes.get_dict_content_indexes(self.document_class)
+        # Assert
+        self.assertEqual(result, [{'name': 'dict_content.root.element_1', 'path': 'root.element',
+                                   'ops': 3, 'since': None}])
+
+    def test_get_dict_content_indexes_returns_indexes_when_stats_not_supported(self):
+        # Arrange
+        self.collection.aggregate.side_effect = OperationFailure('unrecognized pipeline stage')
+        # Act
+        result = indexes.get_dict_content_indexes(self.document_class)
+        # Assert
+        self.assertEqual(result[0]['ops'], None)
+
+
+class TestDropDictContentIndex(TestCase):
+    def test_drop_dict_content_index_drops_index_of_path(self):
+        # Arrange
+        document_class = Mock()
+        # Act
+        indexes.drop_dict_content_index(document_class, 'root.element')
+        # Assert
+        document_class._get_collection.return_value.drop_index.assert_called_with(
+            [('dict_content.root.element', 1)])
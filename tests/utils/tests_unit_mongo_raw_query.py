@@ -0,0 +1,61 @@
+"""
+    Mongo raw query test class
+"""
+from unittest import TestCase
+
+from bson.objectid import ObjectId
+
+from core_main_app.utils.raw_query.mongo_raw_query import add_aggregate_access_criteria
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestAddAggregateAccessCriteria(TestCase):
+    def setUp(self):
+        self.user = create_mock_user('1')
+        self.workspace_id = ObjectId()
+        self.access_criteria = [{'workspace': {'$in': [self.workspace_id]}}, {'user_id': '1'}]
+
+    def test_access_criteria_are_prepended_before_unwind(self):
+        # Arrange
+        pipeline = [{'$unwind': '$list'}, {'$match': {'title': 'title'}}]
+        # Act
+        result = add_aggregate_access_criteria(pipeline, [self.workspace_id], self.user)
+        # Assert
+        self.assertEqual(result[0].keys(), ['$match'])
+        self.assertEqual(result[0]['$match']['$or'], self.access_criteria)
+        self.assertEqual(result[1:], pipeline)
+
+    def test_access_criteria_are_merged_into_first_match(self):
+        # Arrange
+        pipeline = [{'$match': {'title': 'title'}}, {'$group': {'_id': '$template'}}]
+        # Act
+        result = add_aggregate_access_criteria(pipeline, [self.workspace_id], self.user)
+        # Assert
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['$match']['title'], 'title')
+        self.assertEqual(result[0]['$match']['$or'], self.access_criteria)
+
+    def test_access_criteria_are_not_merged_into_first_match_with_same_keys(self):
+        # Arrange
+        pipeline = [{'$match': {'$or': [{'title': 'a'}, {'title': 'b'}]}}]
+        # Act
+        result = add_aggregate_access_criteria(pipeline, [self.workspace_id], self.user)
+        # Assert
+        self.assertEqual(result[0]['$match']['$and'][0], pipeline[0]['$match'])
+
+    def test_access_criteria_are_merged_into_geo_near_query(self):
+        # Arrange
+        pipeline = [{'$geoNear': {'near': [0, 0], 'distanceField': 'distance'}}]
+        # Act
+        result = add_aggregate_access_criteria(pipeline, [self.workspace_id], self.user)
+        # Assert
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['$geoNear']['query']['$or'], self.access_criteria)
+
+    def test_pipeline_is_not_modified(self):
+        # Arrange
+        pipeline = [{'$match': {'title': 'title'}}]
+        # Act
+        add_aggregate_access_criteria(pipeline, [self.workspace_id], self.user)
+        # Assert
+        self.assertEqual(pipeline, [{'$match': {'title': 'title'}}])
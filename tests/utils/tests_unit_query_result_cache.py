@@ -0,0 +1,154 @@
+"""
+    Query result cache test class
+"""
+from unittest import TestCase
+
+from bson.objectid import ObjectId
+from django.core.cache import caches
+from mock import Mock, patch
+
+from core_main_app.utils.query import result_cache
+
+TEMPLATE_ID_1 = ObjectId('5a8d5f6e9a4b1f0b3c000001')
+TEMPLATE_ID_2 = ObjectId('5a8d5f6e9a4b1f0b3c000002')
+
+
+class TestQueryResultCacheGetOrSet(TestCase):
+    def setUp(self):
+        self.patcher = patch.object(result_cache, 'QUERY_RESULT_CACHE', 'default')
+        self.patcher.start()
+        self.query = {'$and': [{'root.element': 'value'}, {'template': {'$in': [TEMPLATE_ID_1]}}]}
+
+    def tearDown(self):
+        caches['default'].clear()
+        self.patcher.stop()
+
+    def test_get_or_set_returns_cached_ids(self):
+        # Arrange
+        get_ids = Mock(return_value=['1', '2'])
+        # Act
+        result_cache.get_or_set(self.query, None, get_ids)
+        ids = result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertEqual(ids, ['1', '2'])
+        self.assertEqual(get_ids.call_count, 1)
+
+    def test_get_or_set_does_not_share_ids_between_orderings(self):
+        # Arrange
+        get_ids = Mock(return_value=['1', '2'])
+        # Act
+        result_cache.get_or_set(self.query, None, get_ids)
+        result_cache.get_or_set(self.query, 'title', get_ids)
+        # Assert
+        self.assertEqual(get_ids.call_count, 2)
+
+    def test_get_or_set_returns_none_when_too_many_results(self):
+        # Arrange
+        get_ids = Mock(return_value=['1', '2', '3'])
+        # Act
+        with patch.object(result_cache, 'QUERY_RESULT_CACHE_MAX_SIZE', 2):
+            ids = result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertIsNone(ids)
+
+    def test_get_or_set_does_not_get_ids_again_when_too_many_results(self):
+        # Arrange
+        get_ids = Mock(return_value=['1', '2', '3'])
+        # Act
+        with patch.object(result_cache, 'QUERY_RESULT_CACHE_MAX_SIZE', 2):
+            result_cache.get_or_set(self.query, None, get_ids)
+            ids = result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertIsNone(ids)
+        self.assertEqual(get_ids.call_count, 1)
+
+    def test_invalidate_template_removes_ids_of_queries_on_template(self):
+        # Arrange
+        get_ids = Mock(return_value=['1'])
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Act
+        result_cache.invalidate([TEMPLATE_ID_1])
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertEqual(get_ids.call_count, 2)
+
+    def test_invalidate_other_template_keeps_ids_of_queries_on_template(self):
+        # Arrange
+        get_ids = Mock(return_value=['1'])
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Act
+        result_cache.invalidate([TEMPLATE_ID_2])
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertEqual(get_ids.call_count, 1)
+
+    def test_invalidate_template_removes_ids_of_queries_on_all_templates(self):
+        # Arrange
+        get_ids = Mock(return_value=['1'])
+        query = {'root.element': 'value'}
+        result_cache.get_or_set(query, None, get_ids)
+        # Act
+        result_cache.invalidate([TEMPLATE_ID_2])
+        result_cache.get_or_set(query, None, get_ids)
+        # Assert
+        self.assertEqual(get_ids.call_count, 2)
+
+    def test_invalidate_all_removes_ids_of_queries_on_template(self):
+        # Arrange
+        get_ids = Mock(return_value=['1'])
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Act
+        result_cache.invalidate(None)
+        result_cache.get_or_set(self.query, None, get_ids)
+        # Assert
+        self.assertEqual(get_ids.call_count, 2)
+
+    def test_get_or_set_value_returns_cached_value(self):
+        # Arrange
+        get_value = Mock(return_value={'root.element': [{'value': 'value', 'count': 1}]})
+        # Act
+        result_cache.get_or_set_value(self.query, ['facets', ['root.element'], 10], get_value)
+        value = result_cache.get_or_set_value(self.query, ['facets', ['root.element'], 10], get_value)
+        # Assert
+        self.assertEqual(value, {'root.element': [{'value': 'value', 'count': 1}]})
+        self.assertEqual(get_value.call_count, 1)
+
+    def test_invalidate_template_removes_values_of_queries_on_template(self):
+        # Arrange
+        get_value = Mock(return_value={})
+        result_cache.get_or_set_value(self.query, 'facets', get_value)
+        # Act
+        result_cache.invalidate([TEMPLATE_ID_1])
+        result_cache.get_or_set_value(self.query, 'facets', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+
+class TestGetQueryFingerprint(TestCase):
+    def test_get_query_fingerprint_does_not_depend_on_order_of_in_values(self):
+        # Arrange
+        query_1 = {'workspace': {'$in': [TEMPLATE_ID_1, TEMPLATE_ID_2]}, 'user_id': '1'}
+        query_2 = {'user_id': '1', 'workspace': {'$in': [TEMPLATE_ID_2, TEMPLATE_ID_1]}}
+        # Act # Assert
+        self.assertEqual(result_cache.get_query_fingerprint(query_1, None),
+                         result_cache.get_query_fingerprint(query_2, None))
+
+    def test_get_query_fingerprint_depends_on_values(self):
+        # Act # Assert
+        self.assertNotEqual(result_cache.get_query_fingerprint({'user_id': '1'}, None),
+                            result_cache.get_query_fingerprint({'user_id': '2'}, None))
+
+
+class TestGetQueryTemplateIds(TestCase):
+    def test_get_query_template_ids_returns_templates_of_and_criteria(self):
+        # Arrange
+        query = {'$and': [{'$and': [{'root': 'value'}, {'template': {'$in': [TEMPLATE_ID_1]}}]},
+                          {'$or': [{'workspace': {'$in': []}}, {'user_id': '1'}]}]}
+        # Act # Assert
+        self.assertEqual(result_cache.get_query_template_ids(query), [TEMPLATE_ID_1])
+
+    def test_get_query_template_ids_returns_none_for_templates_of_or_criteria(self):
+        # Arrange
+        query = {'$or': [{'template': TEMPLATE_ID_1}, {'root': 'value'}]}
+        # Act # Assert
+        self.assertIsNone(result_cache.get_query_template_ids(query))
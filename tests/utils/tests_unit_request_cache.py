@@ -0,0 +1,59 @@
+"""
+    Access control request cache test class
+"""
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from core_main_app.components.workspace import api as workspace_api
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.utils.access_control import request_cache
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestRequestCacheGetOrSet(TestCase):
+    def test_get_or_set_computes_value_once_per_user(self):
+        # Arrange
+        user = create_mock_user('1')
+        get_value = Mock(return_value='value')
+        # Act
+        request_cache.get_or_set(user, 'key', get_value)
+        value = request_cache.get_or_set(user, 'key', get_value)
+        # Assert
+        self.assertEqual(value, 'value')
+        self.assertEqual(get_value.call_count, 1)
+
+    def test_get_or_set_does_not_share_values_between_users(self):
+        # Arrange
+        get_value = Mock(return_value='value')
+        # Act
+        request_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        request_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+    def test_clear_removes_cached_values(self):
+        # Arrange
+        user = create_mock_user('1')
+        get_value = Mock(return_value='value')
+        request_cache.get_or_set(user, 'key', get_value)
+        # Act
+        request_cache.clear(user)
+        request_cache.get_or_set(user, 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+
+class TestGetAllWorkspaceIdsWithReadAccessByUser(TestCase):
+    @patch.object(workspace_api, 'get_all_workspaces_with_read_access_by_user')
+    def test_workspace_ids_are_read_once_per_request(self, mock_get_all_workspaces):
+        # Arrange
+        user = create_mock_user('1')
+        workspace = Workspace(id='5a0d7e3b1a1b2c3d4e5f6a7b')
+        mock_get_all_workspaces.return_value = [workspace]
+        # Act
+        workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
+        workspace_ids = workspace_api.get_all_workspace_ids_with_read_access_by_user(user)
+        # Assert
+        self.assertEqual(workspace_ids, {workspace.id})
+        self.assertEqual(mock_get_all_workspaces.call_count, 1)
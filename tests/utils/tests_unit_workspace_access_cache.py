@@ -0,0 +1,97 @@
+"""
+    Workspace access cache test class
+"""
+from unittest import TestCase
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import m2m_changed
+from mock import Mock, patch
+
+from core_main_app.utils.access_control import workspace_access_cache
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestWorkspaceAccessCacheGetOrSet(TestCase):
+    def setUp(self):
+        self.patcher = patch.object(workspace_access_cache, 'WORKSPACE_ACCESS_CACHE', 'default')
+        self.patcher.start()
+        # the default test cache is process-local: accept it to test the shared cache
+        self.backends_patcher = patch.object(workspace_access_cache, 'PROCESS_LOCAL_CACHE_BACKENDS', ())
+        self.backends_patcher.start()
+
+    def tearDown(self):
+        caches['default'].clear()
+        self.backends_patcher.stop()
+        self.patcher.stop()
+
+    def test_get_or_set_shares_values_between_requests(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        # Act
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        value = workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(value, ['1'])
+        self.assertEqual(get_value.call_count, 1)
+
+    def test_get_or_set_does_not_share_values_between_user_and_superuser(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        # Act
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        workspace_access_cache.get_or_set(create_mock_user('1', is_superuser=True), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+    def test_get_or_set_does_not_cache_values_in_process_local_cache(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        # Act
+        with patch.object(workspace_access_cache, 'PROCESS_LOCAL_CACHE_BACKENDS', (LocMemCache,)):
+            workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+            workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+    def test_get_or_set_does_not_share_values_between_users(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        # Act
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        workspace_access_cache.get_or_set(create_mock_user('2'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+    def test_invalidate_removes_values_of_all_users(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Act
+        workspace_access_cache.invalidate()
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+    def test_group_membership_change_removes_values(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Act
+        m2m_changed.send(sender=User.groups.through, instance=None, action='post_add', reverse=False,
+                         model=None, pk_set=None, using=None)
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
+
+
+class TestWorkspaceAccessCacheDisabled(TestCase):
+    def test_get_or_set_does_not_share_values_between_requests(self):
+        # Arrange
+        get_value = Mock(return_value=['1'])
+        # Act
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        workspace_access_cache.get_or_set(create_mock_user('1'), 'key', get_value)
+        # Assert
+        self.assertEqual(get_value.call_count, 2)
@@ -3,7 +3,8 @@
 """
 import core_main_app.commons.exceptions as exceptions
 from unittest import TestCase
-from core_main_app.utils.xml import raw_xml_to_dict, remove_lists_from_xml_dict
+from core_main_app.utils.xml import raw_xml_to_dict, remove_lists_from_xml_dict, stream_raw_xml_to_dict, \
+    post_processor, get_element_paths
 from collections import OrderedDict
 
 
@@ -28,6 +29,59 @@ class TestRawToDict(TestCase):
             raw_xml_to_dict(raw_xml)
 
 
+class TestStreamRawXmlToDict(TestCase):
+    def test_stream_raw_xml_to_dict_returns_same_dict_as_raw_xml_to_dict(self):
+        # Arrange
+        raw_xml = '<root a="1"><list>1</list><list>2.5</list><el b="x">text<child/></el></root>'
+
+        # Act
+        xml_dict = stream_raw_xml_to_dict(raw_xml, post_processor)
+
+        # Assert
+        self.assertEquals(raw_xml_to_dict(raw_xml, post_processor), xml_dict)
+
+    def test_stream_raw_xml_to_dict_removes_lists_exceeding_max_list_size(self):
+        # Arrange
+        raw_xml = '<root><list>1</list><list>2</list><list>3</list><el>value</el></root>'
+        expected_dict = OrderedDict([(u'root', OrderedDict([(u'el', u'value')]))])
+
+        # Act
+        xml_dict = stream_raw_xml_to_dict(raw_xml, max_list_size=2)
+
+        # Assert
+        self.assertEquals(expected_dict, xml_dict)
+
+    def test_stream_raw_xml_to_dict_keeps_lists_not_exceeding_max_list_size(self):
+        # Arrange
+        raw_xml = '<root><list>1</list><list>2</list></root>'
+        expected_dict = OrderedDict([(u'root', OrderedDict([(u'list', [u'1', u'2'])]))])
+
+        # Act
+        xml_dict = stream_raw_xml_to_dict(raw_xml, max_list_size=2)
+
+        # Assert
+        self.assertEquals(expected_dict, xml_dict)
+
+    def test_stream_raw_xml_to_dict_removes_nested_lists_exceeding_max_list_size(self):
+        # Arrange
+        raw_xml = '<root><el><list>1</list><list>2</list></el><list>3</list></root>'
+        expected_dict = OrderedDict([(u'root', OrderedDict([(u'el', OrderedDict()), (u'list', u'3')]))])
+
+        # Act
+        xml_dict = stream_raw_xml_to_dict(raw_xml, max_list_size=0)
+
+        # Assert
+        self.assertEquals(expected_dict, xml_dict)
+
+    def test_stream_raw_xml_to_dict_throws_exception_when_invalid_xml(self):
+        # Arrange
+        raw_xml = '<root><test>Hello</test?</root>'
+
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            stream_raw_xml_to_dict(raw_xml)
+
+
 class TestRemoveListsFromXmlDict(TestCase):
     def test_remove_lists_from_xml_dict_empty_dict_does_nothing(self):
         # Arrange
@@ -115,3 +169,75 @@ class TestRemoveListsFromXmlDict(TestCase):
             }
         })
 
+
+class TestGetElementPaths(TestCase):
+    def test_get_element_paths_returns_paths_of_simple_elements_and_attributes(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                     '<xs:element name="root"><xs:complexType><xs:sequence>' \
+                     '<xs:element name="name" type="xs:string"/>' \
+                     '</xs:sequence><xs:attribute name="version" type="xs:string"/>' \
+                     '</xs:complexType></xs:element></xs:schema>'
+        # Act
+        paths = get_element_paths(xsd_string)
+        # Assert
+        self.assertEquals(paths, ['root.name', 'root.@version'])
+
+    def test_get_element_paths_follows_global_types(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                     '<xs:element name="root" type="rootType"/>' \
+                     '<xs:complexType name="rootType"><xs:sequence>' \
+                     '<xs:element name="value" type="valueType"/>' \
+                     '</xs:sequence></xs:complexType>' \
+                     '<xs:complexType name="valueType"><xs:simpleContent><xs:extension base="xs:double">' \
+                     '<xs:attribute name="unit" type="xs:string"/>' \
+                     '</xs:extension></xs:simpleContent></xs:complexType></xs:schema>'
+        # Act
+        paths = get_element_paths(xsd_string)
+        # Assert
+        self.assertEquals(paths, ['root.value.#text', 'root.value.@unit'])
+
+    def test_get_element_paths_stops_on_recursive_types(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                     '<xs:element name="root" type="nodeType"/>' \
+                     '<xs:complexType name="nodeType"><xs:sequence>' \
+                     '<xs:element name="name" type="xs:string"/>' \
+                     '<xs:element name="node" type="nodeType"/>' \
+                     '</xs:sequence></xs:complexType></xs:schema>'
+        # Act
+        paths = get_element_paths(xsd_string)
+        # Assert
+        self.assertEquals(paths, ['root.name'])
+
+    def test_get_element_paths_follows_group_references(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                     '<xs:element name="root"><xs:complexType><xs:sequence>' \
+                     '<xs:group ref="nameGroup"/>' \
+                     '</xs:sequence><xs:attributeGroup ref="versionGroup"/></xs:complexType></xs:element>' \
+                     '<xs:group name="nameGroup"><xs:sequence>' \
+                     '<xs:element name="name" type="xs:string"/>' \
+                     '</xs:sequence></xs:group>' \
+                     '<xs:attributeGroup name="versionGroup">' \
+                     '<xs:attribute name="version" type="xs:string"/>' \
+                     '</xs:attributeGroup></xs:schema>'
+        # Act
+        paths = get_element_paths(xsd_string)
+        # Assert
+        self.assertEquals(paths, ['root.name', 'root.@version'])
+
+    def test_get_element_paths_stops_on_recursive_groups(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                     '<xs:element name="root"><xs:complexType><xs:group ref="nodeGroup"/></xs:complexType>' \
+                     '</xs:element>' \
+                     '<xs:group name="nodeGroup"><xs:sequence>' \
+                     '<xs:element name="name" type="xs:string"/>' \
+                     '<xs:element name="node"><xs:complexType><xs:group ref="nodeGroup"/></xs:complexType>' \
+                     '</xs:element></xs:sequence></xs:group></xs:schema>'
+        # Act
+        paths = get_element_paths(xsd_string)
+        # Assert
+        self.assertEquals(paths, ['root.name'])
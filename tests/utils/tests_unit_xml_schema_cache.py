@@ -0,0 +1,197 @@
+"""
+    XML schema cache test class
+"""
+import threading
+from unittest import TestCase
+
+from bson.objectid import ObjectId
+
+from core_main_app.components.template.models import Template
+from core_main_app.utils.xml_schema_cache import XMLSchemaCache, get_template_xml_schema, \
+    invalidate_template_xml_schema, xml_schema_cache
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+XSD = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+      '<xs:element name="tag"></xs:element></xs:schema>'
+OTHER_XSD = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+            '<xs:element name="other"></xs:element></xs:schema>'
+
+
+class TestXMLSchemaCacheGet(TestCase):
+    def test_get_returns_same_entry_for_same_version(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        # Act
+        entry_1 = cache.get('1', XSD, 'hash')
+        entry_2 = cache.get('1', XSD, 'hash')
+        # Assert
+        self.assertIs(entry_1, entry_2)
+
+    def test_get_recompiles_schema_when_version_changes(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        entry_1 = cache.get('1', XSD, 'hash')
+        # Act
+        entry_2 = cache.get('1', OTHER_XSD, 'new_hash')
+        # Assert
+        self.assertIsNot(entry_1, entry_2)
+        self.assertIsNone(entry_2.validate(XSDTree.build_tree('<other/>')))
+
+    def test_get_evicts_least_recently_used_entry_when_max_entries_exceeded(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        cache.get('1', XSD)
+        cache.get('2', XSD)
+        cache.get('1', XSD)
+        # Act
+        cache.get('3', XSD)
+        # Assert
+        self.assertTrue('1' in cache)
+        self.assertFalse('2' in cache)
+        self.assertTrue('3' in cache)
+
+    def test_get_evicts_entries_when_max_size_exceeded(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=10, max_size=len(XSD) + len(OTHER_XSD))
+        cache.get('1', XSD)
+        cache.get('2', OTHER_XSD)
+        # Act
+        cache.get('3', XSD)
+        # Assert
+        self.assertEqual(len(cache), 2)
+        self.assertFalse('1' in cache)
+
+    def test_get_does_not_store_entry_larger_than_max_size(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=10, max_size=10)
+        # Act
+        entry = cache.get('1', XSD)
+        # Assert
+        self.assertIsNotNone(entry.schema)
+        self.assertEqual(len(cache), 0)
+
+    def test_get_does_not_store_entry_when_cache_disabled(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=0, max_size=10000)
+        # Act
+        cache.get('1', XSD)
+        # Assert
+        self.assertEqual(len(cache), 0)
+
+    def test_get_raises_exception_when_xsd_is_not_well_formed(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        # Act # Assert
+        with self.assertRaises(Exception):
+            cache.get('1', XSD + '<')
+
+
+class TestXMLSchemaCacheFind(TestCase):
+    def test_find_returns_entry_of_same_version(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        entry = cache.get('1', XSD, 'hash')
+        # Act
+        result = cache.find('1', 'hash')
+        # Assert
+        self.assertIs(result, entry)
+
+    def test_find_returns_none_when_missing(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        # Act
+        result = cache.find('1', 'hash')
+        # Assert
+        self.assertIsNone(result)
+
+    def test_find_removes_outdated_entry(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        cache.get('1', XSD, 'hash')
+        # Act
+        result = cache.find('1', 'other_hash')
+        # Assert
+        self.assertIsNone(result)
+        self.assertNotIn('1', cache)
+
+
+class TestXMLSchemaCacheInvalidate(TestCase):
+    def test_invalidate_increments_generation(self):
+        # Arrange
+        cache = XMLSchemaCache(max_entries=2, max_size=10000)
+        cache.get('1', XSD)
+        # Act
+        cache.invalidate('1')
+        # Assert
+        self.assertEqual(cache.generation, 1)
+        self.assertNotIn('1', cache)
+
+
+class TestXMLSchemaCacheEntryValidate(TestCase):
+    def test_validate_returns_none_if_xml_is_valid(self):
+        # Arrange
+        entry = XMLSchemaCache(max_entries=2, max_size=10000).get('1', XSD)
+        # Act
+        error = entry.validate(XSDTree.build_tree('<tag>value</tag>'))
+        # Assert
+        self.assertIsNone(error)
+
+    def test_validate_returns_error_if_xml_is_invalid(self):
+        # Arrange
+        entry = XMLSchemaCache(max_entries=2, max_size=10000).get('1', XSD)
+        # Act
+        error = entry.validate(XSDTree.build_tree('<other>value</other>'))
+        # Assert
+        self.assertIsNotNone(error)
+
+
+class TestXMLSchemaCacheEntryGetThreadSchema(TestCase):
+    def test_get_thread_schema_returns_same_schema_in_same_thread(self):
+        # Arrange
+        entry = XMLSchemaCache(max_entries=2, max_size=10000).get('1', XSD)
+        # Act
+        schema = entry.get_thread_schema()
+        # Assert
+        self.assertIs(schema, entry.schema)
+
+    def test_get_thread_schema_compiles_schema_of_other_thread(self):
+        # Arrange
+        entry = XMLSchemaCache(max_entries=2, max_size=10000).get('1', XSD)
+        thread_schemas = []
+        thread = threading.Thread(target=lambda: thread_schemas.append(entry.get_thread_schema()))
+        # Act
+        thread.start()
+        thread.join()
+        # Assert
+        self.assertIsNot(thread_schemas[0], entry.schema)
+        self.assertIsNone(entry.validate(XSDTree.build_tree('<tag>value</tag>')))
+
+
+class TestTemplateXMLSchema(TestCase):
+    def tearDown(self):
+        xml_schema_cache.clear()
+
+    def test_get_template_xml_schema_caches_saved_template(self):
+        # Arrange
+        template = Template(id=ObjectId(), content=XSD, hash='hash')
+        # Act
+        get_template_xml_schema(template)
+        # Assert
+        self.assertTrue(str(template.id) in xml_schema_cache)
+
+    def test_get_template_xml_schema_does_not_cache_unsaved_template(self):
+        # Arrange
+        template = Template(content=XSD)
+        # Act
+        get_template_xml_schema(template)
+        # Assert
+        self.assertEqual(len(xml_schema_cache), 0)
+
+    def test_invalidate_template_xml_schema_removes_entry(self):
+        # Arrange
+        template = Template(id=ObjectId(), content=XSD, hash='hash')
+        get_template_xml_schema(template)
+        # Act
+        invalidate_template_xml_schema(template)
+        # Assert
+        self.assertFalse(str(template.id) in xml_schema_cache)
@@ -0,0 +1,152 @@
+"""
+    XML validation pool test class
+"""
+from unittest import TestCase
+
+from mock import patch
+
+import core_main_app.commons.exceptions as exceptions
+from core_main_app.utils import xml_validation_pool
+from core_main_app.utils.xml_schema_cache import xml_schema_cache
+from core_main_app.utils.xml_validation_pool import _validate_xml_string, XML_ERROR, XSD_ERROR, XSD_MISSING
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+XSD = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+      '<xs:element name="tag"></xs:element></xs:schema>'
+
+
+class TestValidateXmlStringInWorker(TestCase):
+    def test_valid_xml_returns_no_error(self):
+        # Act
+        result = _validate_xml_string('<tag>value</tag>', XSD, None, None)
+        # Assert
+        self.assertEqual(result, (None, None))
+
+    def test_invalid_xml_returns_xml_error(self):
+        # Act
+        error_type, error = _validate_xml_string('<other>value</other>', XSD, None, None)
+        # Assert
+        self.assertEqual(error_type, XML_ERROR)
+        self.assertIsNotNone(error)
+
+    def test_not_well_formed_xml_returns_xml_error(self):
+        # Act
+        error_type, error = _validate_xml_string('<tag>', XSD, None, None)
+        # Assert
+        self.assertEqual(error_type, XML_ERROR)
+
+    def test_not_well_formed_xsd_returns_xsd_error(self):
+        # Act
+        error_type, error = _validate_xml_string('<tag>value</tag>', XSD + '<', None, None)
+        # Assert
+        self.assertEqual(error_type, XSD_ERROR)
+
+
+class TestValidateXmlStringInWorkerCache(TestCase):
+    def tearDown(self):
+        xml_schema_cache.clear()
+
+    def test_missing_schema_without_xsd_returns_xsd_missing(self):
+        # Act
+        result = _validate_xml_string('<tag>value</tag>', None, 'key', 'hash')
+        # Assert
+        self.assertEqual(result, (XSD_MISSING, None))
+
+    def test_cached_schema_validates_without_xsd(self):
+        # Arrange
+        _validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash')
+        # Act
+        result = _validate_xml_string('<other>value</other>', None, 'key', 'hash')
+        # Assert
+        self.assertEqual(result[0], XML_ERROR)
+
+    def test_schema_of_other_version_without_xsd_returns_xsd_missing(self):
+        # Arrange
+        _validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash')
+        # Act
+        result = _validate_xml_string('<tag>value</tag>', None, 'key', 'other_hash')
+        # Assert
+        self.assertEqual(result, (XSD_MISSING, None))
+
+    def test_new_generation_clears_cached_schemas(self):
+        # Arrange
+        _validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash', 1)
+        # Act
+        result = _validate_xml_string('<tag>value</tag>', None, 'key', 'hash', 2)
+        # Assert
+        self.assertEqual(result, (XSD_MISSING, None))
+
+
+class _InlinePool(object):
+    """ Pool executing the functions in the calling process, recording the arguments.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def apply(self, func, args):
+        self.calls.append(args)
+        return func(*args)
+
+
+class TestValidationPoolSendsXsdOnMiss(TestCase):
+    def setUp(self):
+        self.pool = _InlinePool()
+        self.patcher = patch.object(xml_validation_pool, 'get_pool', return_value=self.pool)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        xml_schema_cache.clear()
+
+    def test_validate_xml_string_sends_xsd_when_worker_misses_schema(self):
+        # Act
+        xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash')
+        # Assert
+        self.assertEqual([args[1] for args in self.pool.calls], [None, XSD])
+
+    def test_validate_xml_string_does_not_send_xsd_when_worker_has_schema(self):
+        # Arrange
+        xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash')
+        self.pool.calls = []
+        # Act
+        xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD, 'key', 'hash')
+        # Assert
+        self.assertEqual([args[1] for args in self.pool.calls], [None])
+
+    def test_validate_xml_string_sends_xsd_when_schema_is_not_cached(self):
+        # Act
+        xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD)
+        # Assert
+        self.assertEqual([args[1] for args in self.pool.calls], [XSD])
+
+
+class TestValidationPool(TestCase):
+    def setUp(self):
+        self.patcher = patch.object(xml_validation_pool, 'XML_VALIDATION_POOL_SIZE', 1)
+        self.patcher.start()
+
+    def tearDown(self):
+        xml_validation_pool.close_pool()
+        self.patcher.stop()
+
+    def test_validate_xml_string_does_not_raise_if_xml_is_valid(self):
+        # Act # Assert
+        xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD, 'key')
+
+    def test_validate_xml_string_raises_xml_error_if_xml_is_invalid(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            xml_validation_pool.validate_xml_string('<other>value</other>', XSD, 'key')
+
+    def test_validate_xml_string_raises_xsd_error_if_xsd_is_not_well_formed(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XSDError):
+            xml_validation_pool.validate_xml_string('<tag>value</tag>', XSD + '<')
+
+    def test_validate_xml_tree_returns_error_if_xml_is_invalid(self):
+        # Act
+        error = xml_validation_pool.validate_xml_tree(XSDTree.build_tree(XSD),
+                                                      XSDTree.build_tree('<other>value</other>'))
+        # Assert
+        self.assertIsNotNone(error)